@@ -1,6 +1,7 @@
 # Neo UMG Core Package
 
+__version__ = "0.1.0"
+
 from .build_site import StaticSiteBuilder
 
-__version__ = "0.1.0"
 __all__ = ["StaticSiteBuilder"]
\ No newline at end of file
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Asset Sync Engine
+Change-aware copying of static assets into the build directory
+"""
+
+import os
+import shutil
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+
+from .compress import SIBLING_SUFFIXES
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# ioctl request number for FICLONE (copy-on-write clone on btrfs/xfs)
+FICLONE = 0x40049409
+
+# auto clones where the filesystem allows and copies otherwise; hardlinks are
+# opt-in because anything writing through one would change the public/ source
+LINK_MODES = ("auto", "reflink", "hardlink", "copy")
+
+# Files at or above this size are copied on the worker pool
+LARGE_FILE_THRESHOLD = 4 * 1024 * 1024
+
+
+def file_digest(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """Return the SHA-256 hex digest of a file, read in chunks"""
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def reflink(src: Path, dst: Path) -> bool:
+    """Clone src to dst with copy-on-write; False when unsupported"""
+    if fcntl is None:
+        return False
+    try:
+        with open(src, 'rb') as s, open(dst, 'wb') as d:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+    except OSError:
+        dst.unlink(missing_ok=True)
+        return False
+    shutil.copystat(src, dst)
+    return True
+
+
+class AssetSync:
+    """Mirror a source tree into a destination, skipping unchanged files"""
+
+    def __init__(self, source_dir: Path, dest_dir: Path, link_mode: str = "auto",
+                 verify_hash: bool = False, max_workers: Optional[int] = None,
+                 large_file_threshold: int = LARGE_FILE_THRESHOLD):
+        if link_mode not in LINK_MODES:
+            raise ValueError(f"Unknown link mode '{link_mode}', expected one of {LINK_MODES}")
+        self.source_dir = source_dir
+        self.dest_dir = dest_dir
+        self.link_mode = link_mode
+        self.verify_hash = verify_hash
+        self.max_workers = max_workers or min(8, (os.cpu_count() or 1) + 2)
+        self.large_file_threshold = large_file_threshold
+        self._reflink_ok = link_mode in ("auto", "reflink")
+        self._hardlink_ok = link_mode == "hardlink"
+        # Destination-relative posix paths of every file seen by the last sync
+        self.files: List[str] = []
+
+    def scan(self) -> List[Tuple[Path, os.stat_result]]:
+        """List every regular file under the source directory with its stat"""
+        files = []
+        stack = [self.source_dir]
+        while stack:
+            current = stack.pop()
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(Path(entry.path))
+                    elif entry.is_file():
+                        files.append((Path(entry.path), entry.stat()))
+        return files
+
+    def is_unchanged(self, src: Path, src_stat: os.stat_result, dst: Path) -> bool:
+        """Check whether dst already holds the same content as src"""
+        try:
+            dst_stat = dst.stat()
+        except FileNotFoundError:
+            return False
+        if (dst_stat.st_dev, dst_stat.st_ino) == (src_stat.st_dev, src_stat.st_ino):
+            return True
+        if dst_stat.st_size != src_stat.st_size:
+            return False
+        if dst_stat.st_mtime_ns == src_stat.st_mtime_ns:
+            return True
+        return self.verify_hash and file_digest(src) == file_digest(dst)
+
+    def transfer(self, src: Path, dst: Path) -> str:
+        """Place src at dst using the cheapest method available"""
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        if dst.exists() or dst.is_symlink():
+            dst.unlink()
+
+        if self._reflink_ok:
+            if reflink(src, dst):
+                return "cloned"
+            if self.link_mode == "auto":
+                self._reflink_ok = False
+
+        if self._hardlink_ok:
+            try:
+                os.link(src, dst)
+                return "linked"
+            except OSError:
+                if self.link_mode == "auto":
+                    self._hardlink_ok = False
+
+        shutil.copy2(src, dst)
+        return "copied"
+
+    def sync(self) -> Dict[str, int]:
+        """Sync the source tree and return transfer statistics"""
+        stats = {
+            "files": 0,
+            "skipped": 0,
+            "copied": 0,
+            "linked": 0,
+            "cloned": 0,
+            "bytes_total": 0,
+            "bytes_copied": 0,
+            "bytes_saved": 0,
+        }
+        self.files = []
+        if not self.source_dir.exists():
+            return stats
+
+        pending = []
+        for src, src_stat in self.scan():
+            rel = src.relative_to(self.source_dir)
+            self.files.append(rel.as_posix())
+            dst = self.dest_dir / rel
+            stats["files"] += 1
+            stats["bytes_total"] += src_stat.st_size
+            if self.is_unchanged(src, src_stat, dst):
+                stats["skipped"] += 1
+                stats["bytes_saved"] += src_stat.st_size
+            else:
+                pending.append((src, dst, src_stat.st_size))
+
+        small = [p for p in pending if p[2] < self.large_file_threshold]
+        large = [p for p in pending if p[2] >= self.large_file_threshold]
+
+        def record(method: str, size: int):
+            stats[method] += 1
+            if method == "copied":
+                stats["bytes_copied"] += size
+            else:
+                stats["bytes_saved"] += size
+
+        # Large files go to the pool first so they overlap with small ones
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = [(pool.submit(self.transfer, src, dst), size) for src, dst, size in large]
+            for src, dst, size in small:
+                record(self.transfer(src, dst), size)
+            for future, size in futures:
+                record(future.result(), size)
+
+        return stats
+
+    def remove_stale(self, previous: List[str]) -> int:
+        """Delete destination files an earlier sync placed whose source is gone"""
+        current = set(self.files)
+        removed = 0
+        for rel in previous:
+            if rel not in current:
+                stale = self.dest_dir / rel
+                # Precompressed siblings would otherwise keep serving the deleted file
+                for sibling in SIBLING_SUFFIXES:
+                    stale.with_name(stale.name + sibling).unlink(missing_ok=True)
+                try:
+                    stale.unlink()
+                except FileNotFoundError:
+                    continue
+                removed += 1
+        return removed
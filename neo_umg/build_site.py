@@ -5,32 +5,176 @@ Uses Mojo kernels to build a static website
 """
 
 import os
+import copy
 import json
 import shutil
+import re
+import hashlib
+import posixpath
+import threading
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Set, Tuple
+
+from . import __version__
+from .asset_sync import AssetSync, LINK_MODES
+from .critical_css import CriticalCSS
+from .compress import Precompressor, DEFAULT_MIN_SIZE, SIBLING_SUFFIXES
+from .minify import minify_css, minify_html
+from .manifest import PageWriter, content_hash, load_manifest, new_manifest, save_manifest
+from .shards import shard_for, parse_shard, merge_shards, ShardCollisionError
+from .profiler import BuildProfiler, NullProfiler
+from .preview import PreviewStore, create_server, snapshot_sources
+from .render_cache import DEFAULT_MAX_BYTES, RenderCache, render_key
+from .depgraph import DependencyGraph, ASSETS_NODE, TEMPLATE_NODE, data_node, fragment_node
+from .fingerprint import (
+    ASSET_MANIFEST_NAME, HEADERS_NAME, AssetFingerprinter, render_headers, rewrite_asset_urls,
+)
+from .images import ImageOptimizer, images_available, rewrite_img_tags
+from .indexes import (
+    SEARCH_INDEX_NAME, build_search_index, dump_search_index, extract_images,
+    extract_links, extract_terms, find_broken_links, render_sitemaps,
+)
+
+# Placeholder splitting the page template around the rendered content
+CONTENT_MARKER = "\x00content\x00"
+
+# Pages and fragments pull in shared fragments with {% include "name.md" %}
+INCLUDE_RE = re.compile(r'\{%\s*include\s+"([^"]+)"\s*%\}')
+
+DEFAULT_NAV = [
+    {"href": "/", "label": "Home"},
+    {"href": "/about.html", "label": "About"},
+    {"href": "/docs.html", "label": "Documentation"},
+]
+
+# Site-level data every page is rendered from
+PAGE_DATA_KEYS = ("title", "nav")
+
+# Per-locale site.json settings that replace the site-wide ones
+LOCALE_KEYS = ("title", "nav")
+
+SITE_STYLESHEET = """\
+        body {
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
+            line-height: 1.6;
+            max-width: 800px;
+            margin: 0 auto;
+            padding: 2rem;
+            color: #333;
+        }
+        h1, h2, h3 { color: #2c3e50; }
+        nav {
+            background: #ecf0f1;
+            padding: 1rem;
+            margin-bottom: 2rem;
+            border-radius: 8px;
+        }
+        nav a {
+            margin-right: 1rem;
+            text-decoration: none;
+            color: #3498db;
+        }
+        nav a:hover { text-decoration: underline; }
+        .footer {
+            margin-top: 3rem;
+            padding-top: 2rem;
+            border-top: 1px solid #ecf0f1;
+            text-align: center;
+            color: #7f8c8d;
+        }
+"""
+
+def localize_href(href: str, locale: str) -> str:
+    """Point a site-absolute link at the same page in another locale"""
+    if href.startswith("/") and not href.startswith("//"):
+        return f"/{locale}{href}"
+    return href
 
 class StaticSiteBuilder:
-    def __init__(self, project_root: Path):
+    def __init__(self, project_root: Path, incremental: bool = False, link_mode: str = "auto",
+                 compress: bool = False, compress_min_size: int = DEFAULT_MIN_SIZE,
+                 minify: bool = False, extract_css: bool = False,
+                 build_dir: Optional[Path] = None, shard_index: int = 0, shard_count: int = 1,
+                 profiler: Optional[BuildProfiler] = None, quiet: bool = False,
+                 streaming: bool = False, indexes: bool = False, fingerprint: bool = False,
+                 optimize_images: bool = False, critical_css: bool = False,
+                 cache_dir: Optional[Path] = None, render_cache: bool = False,
+                 cache_max_bytes: int = DEFAULT_MAX_BYTES):
+        if streaming and minify:
+            raise ValueError("Streaming builds cannot minify; minification needs the whole page")
+        if streaming and critical_css:
+            raise ValueError("Streaming builds cannot inline critical CSS; it needs the whole page")
         self.project_root = project_root
-        self.build_dir = project_root / "build"
+        self.build_dir = build_dir or project_root / "build"
         self.public_dir = project_root / "public"
         self.pages_dir = project_root / "pages"
+        self.fragments_dir = project_root / "fragments"
+        self.cache_dir = cache_dir or project_root / ".neo_cache"
+        self.incremental = incremental
+        self.link_mode = link_mode
+        self.compress = compress
+        self.compress_min_size = compress_min_size
+        self.asset_stats: Dict[str, int] = {}
+        self.public_files: List[str] = []
+        self.compress_stats: Dict[str, int] = {}
+        self.minify = minify
+        self.extract_css = extract_css
+        self.stylesheet_href: str = ""
+        self.size_stats = {"pages": 0, "bytes_before": 0, "bytes_after": 0}
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+        self.manifest: Dict[str, Any] = new_manifest()
+        self.profiler = profiler or NullProfiler()
+        self.quiet = quiet
+        self.streaming = streaming
+        self.previous_manifest: Dict[str, Any] = new_manifest()
+        self.indexes = indexes
+        self.site_config: Dict[str, Any] = {}
+        self.broken_links: List[Dict[str, str]] = []
+        self.graph = DependencyGraph()
+        self.dirty: Set[str] = set()
+        # Graph nodes the pages of this build depend on; pages keep their own deps
+        self.used_nodes: Set[str] = set()
+        self.skipped_pages = 0
+        self._fragment_cache: Dict[str, Tuple[str, Set[str]]] = {}
+        self._node_hashes: Dict[str, str] = {}
+        self.fingerprint = fingerprint
+        self.asset_records: Dict[str, Dict[str, Any]] = {}
+        self.asset_map: Dict[str, str] = {}
+        self.optimize_images = optimize_images
+        self.image_records: Dict[str, Dict[str, Any]] = {}
+        self.image_stats: Dict[str, int] = {}
+        self.critical_css = critical_css
+        self.critical: Optional[CriticalCSS] = None
+        self.render_cache: Optional[RenderCache] = None
+        if render_cache:
+            self.render_cache = RenderCache(self.cache_dir / "render", max_bytes=cache_max_bytes)
+        self.locale: Optional[str] = None
+        # Fragment file -> text split around includes, shared by every locale
+        self.parsed_fragments: Dict[Path, Optional[List[str]]] = {}
+        self.locale_builders: Dict[str, "StaticSiteBuilder"] = {}
         
     def clean_build(self):
         """Remove existing build directory"""
         if self.build_dir.exists():
             shutil.rmtree(self.build_dir)
-        self.build_dir.mkdir(exist_ok=True)
+        self.build_dir.mkdir(parents=True, exist_ok=True)
         
     def copy_static_assets(self):
-        """Copy static assets from public to build"""
-        if self.public_dir.exists():
-            for item in self.public_dir.iterdir():
-                if item.is_file():
-                    shutil.copy2(item, self.build_dir)
-                elif item.is_dir():
-                    shutil.copytree(item, self.build_dir / item.name)
+        """Sync static assets from public to build, skipping unchanged files"""
+        sync = AssetSync(self.public_dir, self.build_dir, link_mode=self.link_mode)
+        self.asset_stats = sync.sync()
+        self.public_files = sorted(sync.files)
+        if self.incremental:
+            removed = sync.remove_stale(self.previous_manifest.get("public", []))
+            if removed:
+                self.log(f"Assets: removed {removed} files no longer in public/")
+        stats = self.asset_stats
+        self.profiler.add_bytes(stats["bytes_copied"])
+        if stats["files"]:
+            self.log(f"Assets: {stats['files']} files, {stats['skipped']} unchanged, "
+                  f"{stats['copied']} copied, {stats['linked']} linked, {stats['cloned']} cloned "
+                  f"({stats['bytes_saved']} of {stats['bytes_total']} bytes not copied)")
                     
     def load_page_config(self) -> Dict[str, Any]:
         """Load page configuration"""
@@ -49,63 +193,99 @@ class StaticSiteBuilder:
             ]
         }
     
-    def render_page(self, markdown_content: str, page_title: str, site_title: str) -> str:
-        """Render a page using Mojo kernels (simulated for now)"""
-        # In a real implementation, this would call the Mojo kernels
-        # For now, we'll create a simple HTML template
-        
-        # Simulate markdown to HTML conversion
+    def write_stylesheet(self):
+        """Write the shared stylesheet to a fingerprinted file referenced by every page"""
+        css = minify_css(SITE_STYLESHEET) if self.minify else SITE_STYLESHEET
+        digest = hashlib.sha256(css.encode("utf-8")).hexdigest()[:10]
+        relative = f"assets/site.{digest}.css"
+        self.write_if_changed(self.build_dir / relative, css)
+        self.stylesheet_href = "/" + relative
+        if self.critical_css:
+            self.critical = CriticalCSS(SITE_STYLESHEET)
+    
+    def fingerprint_assets(self):
+        """Publish content-hashed copies of static assets for long-lived caching"""
+        fingerprinter = AssetFingerprinter(
+            self.public_dir, self.build_dir,
+            previous=self.previous_manifest.get("assets"),
+            publish=self.shard_index == 0,
+        )
+        self.asset_records = fingerprinter.run()
+        self.asset_map = fingerprinter.mapping
+        stats = fingerprinter.stats
+        if stats["assets"]:
+            self.log(f"Fingerprinted: {stats['assets']} assets, {stats['hashed']} hashed, "
+                     f"{stats['reused']} reused, {stats['published']} published, {stats['removed']} removed")
+    
+    def process_images(self):
+        """Create resized image variants, reusing cached ones by source hash"""
+        if not images_available():
+            self.log("Images: Pillow not installed, only adding loading=\"lazy\"")
+            return
+        optimizer = ImageOptimizer(
+            self.public_dir, self.build_dir, self.cache_dir / "images",
+            previous=self.previous_manifest.get("images"),
+            publish=self.shard_index == 0,
+        )
+        self.image_records = optimizer.run()
+        self.image_stats = stats = optimizer.stats
+        if stats["images"]:
+            self.log(f"Images: {stats['images']} images, {stats['processed']} processed, "
+                     f"{stats['cached']} from cache, {stats['variants']} variants")
+    
+    def rewrite_assets(self, html: str, output_rel: str) -> str:
+        """Apply image and fingerprint rewrites to rendered HTML"""
+        if self.optimize_images:
+            html = rewrite_img_tags(html, output_rel, self.image_records, assets=self.asset_map)
+        return rewrite_asset_urls(html, output_rel, self.asset_map)
+    
+    def write_cache_manifests(self):
+        """Write the asset manifest and a _headers file marking hashed files immutable"""
+        mapping = {"/" + rel: "/" + hashed for rel, hashed in sorted(self.asset_map.items())}
+        self.write_if_changed(self.build_dir / ASSET_MANIFEST_NAME, json.dumps(mapping, indent=2))
+        immutable = set(self.asset_map.values())
+        if self.stylesheet_href:
+            immutable.add(self.stylesheet_href.lstrip("/"))
+        revalidate = ("", "index.html", ASSET_MANIFEST_NAME)
+        self.write_if_changed(self.build_dir / HEADERS_NAME, render_headers(immutable, revalidate))
+    
+    def style_html(self, critical: Optional[str] = None) -> str:
+        """Return the head markup that loads the site stylesheet"""
+        if self.stylesheet_href and critical is not None:
+            # Inline what the page needs now, load the rest without blocking render
+            return (f"    <style>\n{critical}\n    </style>\n"
+                    f'    <link rel="preload" href="{self.stylesheet_href}" as="style" '
+                    f'onload="this.onload=null;this.rel=\'stylesheet\'">\n'
+                    f'    <noscript><link rel="stylesheet" href="{self.stylesheet_href}"></noscript>')
+        if self.stylesheet_href:
+            return f'    <link rel="stylesheet" href="{self.stylesheet_href}">'
+        return f"    <style>\n{SITE_STYLESHEET}    </style>"
+    
+    def convert_markdown(self, markdown_content: str) -> str:
+        """Simulate markdown to HTML conversion"""
+        # Every substitution is line-local, so this also works line by line
         html_content = markdown_content.replace("# ", "<h1>").replace("</h1>", "</h1>\n")
         html_content = html_content.replace("## ", "<h2>").replace("</h2>", "</h2>\n")
         html_content = html_content.replace("**", "<strong>").replace("</strong>", "</strong>")
-        
-        # Create full HTML page
-        return f"""<!DOCTYPE html>
-<html lang="en">
+        return html_content
+    
+    def page_shell(self, page_title: str, site_title: str, critical: Optional[str] = None) -> List[str]:
+        """Return the page HTML before and after the content"""
+        page = f"""<!DOCTYPE html>
+<html lang="{self.html_lang()}">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>{page_title} - {site_title}</title>
-    <style>
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            line-height: 1.6;
-            max-width: 800px;
-            margin: 0 auto;
-            padding: 2rem;
-            color: #333;
-        }}
-        h1, h2, h3 {{ color: #2c3e50; }}
-        nav {{
-            background: #ecf0f1;
-            padding: 1rem;
-            margin-bottom: 2rem;
-            border-radius: 8px;
-        }}
-        nav a {{
-            margin-right: 1rem;
-            text-decoration: none;
-            color: #3498db;
-        }}
-        nav a:hover {{ text-decoration: underline; }}
-        .footer {{
-            margin-top: 3rem;
-            padding-top: 2rem;
-            border-top: 1px solid #ecf0f1;
-            text-align: center;
-            color: #7f8c8d;
-        }}
-    </style>
+{self.style_html(critical)}
 </head>
 <body>
     <nav>
-        <a href="/">Home</a>
-        <a href="/about.html">About</a>
-        <a href="/docs.html">Documentation</a>
+{self.nav_html()}
     </nav>
     
     <main>
-        {html_content}
+        {CONTENT_MARKER}
     </main>
     
     <footer class="footer">
@@ -113,10 +293,100 @@ class StaticSiteBuilder:
     </footer>
 </body>
 </html>"""
+        return page.split(CONTENT_MARKER)
+    
+    def html_lang(self) -> str:
+        return self.locale or self.site_config.get("default_locale") or "en"
+    
+    def nav_html(self) -> str:
+        """Render the navigation links from site.json, or the default links"""
+        nav = self.site_config.get("nav") or DEFAULT_NAV
+        return "\n".join(f'        <a href="{item["href"]}">{item["label"]}</a>' for item in nav)
+    
+    def load_fragment(self, name: str, stack: Tuple[str, ...] = ()) -> Tuple[str, Set[str]]:
+        """Return a fragment with its includes expanded; parsed once per build"""
+        if name in self._fragment_cache:
+            return self._fragment_cache[name]
+        if name in stack:
+            raise ValueError(f"Include cycle: {' -> '.join(stack + (name,))}")
+        
+        parts = self.parse_fragment(self.fragment_file(name))
+        if parts is None:
+            self.log(f"Missing fragment: {name}")
+            parts = [""]
+        expanded, deps = self.expand_parts(parts, stack + (name,))
+        self.graph.set(fragment_node(name), deps)
+        self._fragment_cache[name] = (expanded, deps)
+        return expanded, deps
+    
+    def fragment_file(self, name: str) -> Path:
+        """Locate a fragment, preferring fragments/<locale>/ over the shared one"""
+        if self.locale:
+            localized = self.fragments_dir / self.locale / name
+            if localized.is_file():
+                return localized
+        return self.fragments_dir / name
+    
+    def parse_fragment(self, fragment_file: Path) -> Optional[List[str]]:
+        """Read and split a fragment file once, however many locales use it"""
+        if fragment_file not in self.parsed_fragments:
+            parts = None
+            if fragment_file.is_file():
+                parts = INCLUDE_RE.split(fragment_file.read_text())
+            self.parsed_fragments[fragment_file] = parts
+        return self.parsed_fragments[fragment_file]
+    
+    def expand_includes(self, text: str, stack: Tuple[str, ...] = ()) -> Tuple[str, Set[str]]:
+        """Replace include directives with fragment text, returning the fragments used"""
+        if "{%" not in text:
+            return text, set()
+        return self.expand_parts(INCLUDE_RE.split(text), stack)
+    
+    def expand_parts(self, parts: List[str], stack: Tuple[str, ...]) -> Tuple[str, Set[str]]:
+        # Odd indices are the names captured by INCLUDE_RE
+        deps: Set[str] = set()
+        out = []
+        for i, part in enumerate(parts):
+            if i % 2:
+                deps.add(fragment_node(part))
+                part = self.load_fragment(part, stack)[0]
+            out.append(part)
+        return "".join(out), deps
+    
+    def render_page(self, markdown_content: str, page_title: str, site_title: str) -> str:
+        """Render a page using Mojo kernels (simulated for now)"""
+        # In a real implementation, this would call the Mojo kernels
+        # For now, we'll create a simple HTML template
+        content = self.convert_markdown(markdown_content)
+        critical = self.critical_subset(content) if self.critical else None
+        head, tail = self.page_shell(page_title, site_title, critical)
+        return head + content + tail
     
-    def build_pages(self):
+    def critical_subset(self, content_html: str) -> str:
+        """Return the stylesheet rules this page's DOM can match"""
+        return self.critical.for_page(
+            self.node_hash(TEMPLATE_NODE),
+            lambda: "".join(self.page_shell("", "")),
+            content_html,
+        )
+    
+    def render_page_chunks(self, lines: Iterable[str], page_title: str, site_title: str) -> Iterator[str]:
+        """Render a page as a stream of chunks without holding it in memory"""
+        head, tail = self.page_shell(page_title, site_title)
+        yield head
+        for line in lines:
+            yield self.convert_markdown(line)
+        yield tail
+    
+    def build_pages(self, config: Optional[Dict[str, Any]] = None):
         """Build all pages"""
-        config = self.load_page_config()
+        if config is None:
+            with self.profiler.stage("load_page_config"):
+                config = self.load_page_config()
+        if config.get("locales") and self.locale is None:
+            self.build_locales(config)
+            return
+        self.site_config = config
         site_title = config.get("title", "UMG NeoCore")
         
         # Create sample pages if they don't exist
@@ -124,21 +394,467 @@ class StaticSiteBuilder:
             self.pages_dir.mkdir()
             self.create_sample_pages()
         
-        # Build each page
-        for page in config.get("pages", []):
-            page_file = self.pages_dir / page["file"]
-            if page_file.exists():
-                content = page_file.read_text()
-                html = self.render_page(content, page["title"], site_title)
-                
-                # Determine output filename
-                if page["path"] == "/":
-                    output_file = self.build_dir / "index.html"
+        shard = None
+        if self.shard_count > 1:
+            shard = {"index": self.shard_index, "count": self.shard_count}
+        self.manifest = new_manifest(shard)
+        if self.public_files:
+            self.manifest["public"] = self.public_files
+        if self.asset_records:
+            self.manifest["assets"] = self.asset_records
+        if self.image_records:
+            self.manifest["images"] = self.image_records
+        self.prepare_dependencies()
+        
+        # Build each page; streaming builds append entries to disk instead of keeping them
+        build_page = self.stream_page if self.streaming else self.build_page
+        writer = PageWriter(self.build_dir) if self.streaming else None
+        outputs: Set[str] = set()
+        for page in self.select_pages(self.iter_pages(config)):
+            entry = self.reusable_entry(page)
+            if entry:
+                self.skipped_pages += 1
+            else:
+                entry = build_page(page, site_title)
+            if entry:
+                self.used_nodes.update(entry["deps"])
+                outputs.add(entry["output"])
+                if writer:
+                    writer.add(page["path"], entry)
                 else:
-                    output_file = self.build_dir / (page["path"].strip("/") + ".html")
-                
-                output_file.write_text(html)
-                print(f"Built: {output_file.relative_to(self.project_root)}")
+                    self.manifest["pages"][page["path"]] = entry
+        
+        self.remove_stale_pages(outputs)
+        self.graph.prune(self.used_nodes)
+        self.manifest["graph"] = self.graph.to_dict()
+        self.manifest["node_hashes"] = {
+            node: self.node_hash(node) for node in sorted(self.used_nodes | self.graph.nodes())
+        }
+        if self.skipped_pages:
+            self.log(f"Skipped {self.skipped_pages} pages with no changed dependencies")
+        if writer:
+            close = getattr(self.previous_manifest["pages"], "close", None)
+            if close:
+                close()
+            self.manifest["pages"] = writer.commit()
+        save_manifest(self.build_dir, self.manifest)
+    
+    def remove_stale_pages(self, outputs: Set[str]):
+        """Delete outputs of previously built pages that are no longer part of the site"""
+        removed = 0
+        for entry in self.previous_manifest["pages"].values():
+            if entry.get("output") in outputs:
+                continue
+            output_file = self.build_dir / entry["output"]
+            for stale in [output_file] + [output_file.with_name(output_file.name + s) for s in SIBLING_SUFFIXES]:
+                try:
+                    stale.unlink()
+                except FileNotFoundError:
+                    continue
+                if stale == output_file:
+                    removed += 1
+        if removed:
+            self.log(f"Removed {removed} pages no longer in the site")
+    
+    def build_locales(self, config: Dict[str, Any]):
+        """Render every locale in its own process from the shared assets and parsed fragments"""
+        from concurrent.futures import ProcessPoolExecutor
+        
+        if self.shard_count > 1:
+            raise ValueError("Localized sites cannot be built in shards")
+        locales = config["locales"]
+        if isinstance(locales, list):
+            locales = {locale: {} for locale in locales}
+        default = config.get("default_locale") or next(iter(locales))
+        self.site_config = config
+        if not self.pages_dir.exists():
+            self.pages_dir.mkdir()
+            self.create_sample_pages()
+        
+        # Split every fragment once here; each worker receives the parsed table
+        if self.fragments_dir.is_dir():
+            for fragment_file in sorted(self.fragments_dir.rglob("*")):
+                if fragment_file.is_file():
+                    self.parse_fragment(fragment_file)
+        with ProcessPoolExecutor(max_workers=len(locales)) as pool:
+            futures = {
+                locale: pool.submit(_build_locale, self.locale_builder(locale, locale == default),
+                                    self.locale_config(config, locale, locales[locale], default))
+                for locale in locales
+            }
+            self.locale_builders = {locale: future.result() for locale, future in futures.items()}
+        
+        # Site-wide view of every locale for indexes and size reporting
+        self.manifest = new_manifest()
+        for locale, builder in self.locale_builders.items():
+            prefix = "" if locale == default else locale
+            for path, entry in builder.manifest["pages"].items():
+                key = "/" + posixpath.join(prefix, path.lstrip("/")) if prefix else path
+                self.manifest["pages"][key] = dict(entry, output=posixpath.join(prefix, entry["output"]))
+            for key in self.size_stats:
+                self.size_stats[key] += builder.size_stats[key]
+            self.skipped_pages += builder.skipped_pages
+            # Counters the workers kept on their own copies
+            self.profiler.merge(builder.profiler)
+            if self.critical:
+                for key in self.critical.stats:
+                    self.critical.stats[key] += builder.critical.stats[key]
+            if self.render_cache:
+                for key in self.render_cache.stats:
+                    self.render_cache.stats[key] += builder.render_cache.stats[key]
+        self.log(f"Locales: {', '.join(locales)} ({len(self.manifest['pages'])} pages)")
+    
+    def locale_builder(self, locale: str, is_default: bool) -> "StaticSiteBuilder":
+        """Builder for one locale starting from this builder's assets, caches and parsed fragments"""
+        builder = copy.copy(self)
+        builder.locale = locale
+        builder.locale_builders = {}
+        # Runs in a worker process; its profile is merged back afterwards
+        builder.profiler = self.profiler.for_worker()
+        builder.size_stats = {"pages": 0, "bytes_before": 0, "bytes_after": 0}
+        if not is_default:
+            builder.build_dir = self.build_dir / locale
+            builder.previous_manifest = load_manifest(builder.build_dir)
+            builder.public_files = []
+        return builder
+    
+    def locale_config(self, config: Dict[str, Any], locale: str, overrides: Dict[str, Any],
+                      default: str) -> Dict[str, Any]:
+        """Site configuration as seen by one locale"""
+        localized = {key: value for key, value in config.items() if key != "locales"}
+        for key in LOCALE_KEYS:
+            if key in overrides:
+                localized[key] = overrides[key]
+        if locale != default and "nav" not in overrides:
+            localized["nav"] = [
+                dict(item, href=localize_href(item["href"], locale))
+                for item in config.get("nav") or DEFAULT_NAV
+            ]
+        titles = overrides.get("titles")
+        if titles:
+            localized["pages"] = [
+                dict(page, title=titles.get(page["path"], page["title"]))
+                for page in config.get("pages", [])
+            ]
+        return localized
+    
+    def prepare_dependencies(self):
+        """Load the previous dependency graph and find what changed since then"""
+        self._fragment_cache = {}
+        self._node_hashes = {}
+        self.skipped_pages = 0
+        self.used_nodes = set()
+        self.graph = DependencyGraph(self.previous_manifest.get("graph"))
+        previous_hashes = self.previous_manifest.get("node_hashes", {})
+        changed = {node for node, digest in previous_hashes.items() if self.node_hash(node) != digest}
+        self.dirty = self.graph.invalidated(changed)
+    
+    def node_hash(self, node: str) -> str:
+        """Hash the current state of a fragment, data or template node"""
+        if node in self._node_hashes:
+            return self._node_hashes[node]
+        kind, _, key = node.partition(":")
+        if node == TEMPLATE_NODE:
+            shell = "".join(self.page_shell("\x01", "\x02"))
+            data = (f"{shell}|minify={self.minify}|critical={self.critical_css}"
+                    f"|fingerprint={self.fingerprint}|images={self.optimize_images}").encode("utf-8")
+        elif node == ASSETS_NODE:
+            images = {rel: record["variants"] for rel, record in self.image_records.items()}
+            data = json.dumps([self.asset_map, images, self.optimize_images], sort_keys=True).encode("utf-8")
+        elif kind == "fragment":
+            fragment_file = self.fragment_file(key)
+            data = fragment_file.read_bytes() if fragment_file.is_file() else b"\x00missing"
+        elif kind == "data":
+            value = self.site_config.get(key.split("#", 1)[1])
+            data = json.dumps(value, sort_keys=True).encode("utf-8")
+        else:
+            data = node.encode("utf-8")
+        self._node_hashes[node] = content_hash(data)
+        return self._node_hashes[node]
+    
+    def page_dependencies(self, fragments: Set[str]) -> List[str]:
+        """Return the graph nodes a page rendered from these fragments depends on"""
+        deps = {TEMPLATE_NODE} | {data_node(f"site.json#{key}") for key in PAGE_DATA_KEYS}
+        if self.fingerprint or self.optimize_images:
+            deps.add(ASSETS_NODE)
+        return sorted(deps | fragments)
+    
+    def page_config_hash(self, page: Dict[str, Any]) -> str:
+        return content_hash(json.dumps(page, sort_keys=True).encode("utf-8"))
+    
+    def reusable_entry(self, page: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return the previous manifest entry if nothing the page depends on changed"""
+        previous = self.previous_manifest["pages"].get(page["path"])
+        if not previous or "deps" not in previous or self.dirty.intersection(previous["deps"]):
+            return None
+        if previous.get("config_hash") != self.page_config_hash(page):
+            return None
+        if self.indexes and "terms" not in previous:
+            return None
+        if not (self.build_dir / previous["output"]).exists():
+            return None
+        try:
+            stat = self.page_source(page).stat()
+        except FileNotFoundError:
+            return None
+        if previous.get("source_stat") != [stat.st_size, stat.st_mtime_ns]:
+            return None
+        return previous
+    
+    def iter_pages(self, config: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Yield page entries, reading a JSON Lines pages_file lazily when configured"""
+        yield from config.get("pages", [])
+        pages_file = config.get("pages_file")
+        if pages_file:
+            with open(self.project_root / pages_file, 'r') as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+    
+    def select_pages(self, pages: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Yield the pages that belong to this builder's shard"""
+        for page in pages:
+            if self.shard_count <= 1 or shard_for(page["path"], self.shard_count) == self.shard_index:
+                yield page
+    
+    def page_source(self, page: Dict[str, Any]) -> Path:
+        """Locate a page's markdown, preferring pages/<locale>/ over the shared one"""
+        if self.locale:
+            localized = self.pages_dir / self.locale / page["file"]
+            if localized.is_file():
+                return localized
+        return self.pages_dir / page["file"]
+    
+    def output_path(self, page: Dict[str, Any]) -> Path:
+        """Determine the output file for a page"""
+        if page["path"] == "/":
+            return self.build_dir / "index.html"
+        return self.build_dir / (page["path"].strip("/") + ".html")
+    
+    def build_page(self, page: Dict[str, Any], site_title: str) -> Optional[Dict[str, Any]]:
+        """Render and write a single page, returning its manifest entry"""
+        page_file = self.page_source(page)
+        if not page_file.exists():
+            return None
+        
+        stat = page_file.stat()
+        content = page_file.read_text()
+        output_file = self.output_path(page)
+        output_rel = output_file.relative_to(self.build_dir).as_posix()
+        with self.profiler.stage("render_page", page=page["path"]):
+            content, fragments = self.expand_includes(content)
+            data = None
+            if self.render_cache:
+                key = self.render_key(page, output_rel, site_title, content)
+                data = self.render_cache.get(key)
+            if data is None:
+                html = self.render_page(content, page["title"], site_title)
+                html = self.rewrite_assets(html, output_rel)
+        
+        if data is None:
+            self.size_stats["pages"] += 1
+            self.size_stats["bytes_before"] += len(html.encode("utf-8")) + self._inline_style_bytes()
+            if self.minify:
+                html = minify_html(html)
+            data = html.encode("utf-8")
+            self.size_stats["bytes_after"] += len(data)
+            if self.render_cache:
+                self.render_cache.put(key, data)
+        else:
+            html = data.decode("utf-8")
+        
+        with self.profiler.stage("write", page=page["path"]):
+            written = self.write_if_changed(output_file, html)
+        if written:
+            self.log(f"Built: {self._display_path(output_file)}")
+        else:
+            self.log(f"Unchanged: {self._display_path(output_file)}")
+        
+        entry = {
+            "source": page["file"],
+            "output": output_rel,
+            "hash": content_hash(data),
+            "bytes": len(data),
+        }
+        self.record_dependencies(page, entry, stat, fragments)
+        if self.indexes:
+            entry.update(self.index_fields(page, entry["hash"], lambda: (html, content)))
+        return entry
+    
+    def render_key(self, page: Dict[str, Any], output_rel: str, site_title: str, content: str) -> str:
+        """Cache key covering every input to a rendered page"""
+        return render_key(
+            __version__,
+            self.node_hash(TEMPLATE_NODE),
+            self.node_hash(ASSETS_NODE),
+            output_rel,
+            page["title"],
+            site_title,
+            content,
+        )
+    
+    def record_dependencies(self, page: Dict[str, Any], entry: Dict[str, Any],
+                            stat: os.stat_result, fragments: Set[str]):
+        """Store what a freshly rendered page depends on in its entry"""
+        entry["deps"] = self.page_dependencies(fragments)
+        entry["config_hash"] = self.page_config_hash(page)
+        entry["source_stat"] = [stat.st_size, stat.st_mtime_ns]
+    
+    def index_fields(self, page: Dict[str, Any], digest: str, sources) -> Dict[str, Any]:
+        """Return title, links, images and terms for a page, reusing the previous manifest"""
+        previous = self.previous_manifest["pages"].get(page["path"])
+        if previous and previous["hash"] == digest and "terms" in previous:
+            return {key: previous[key] for key in ("title", "links", "images", "terms")}
+        html, text = sources()
+        return {
+            "title": page["title"],
+            "links": extract_links(html),
+            "images": extract_images(html),
+            "terms": sorted(extract_terms(page["title"] + " " + text)),
+        }
+    
+    def stream_page(self, page: Dict[str, Any], site_title: str) -> Optional[Dict[str, Any]]:
+        """Render a page chunk by chunk straight into its output file"""
+        page_file = self.page_source(page)
+        if not page_file.exists():
+            return None
+        
+        output_file = self.output_path(page)
+        output_rel = output_file.relative_to(self.build_dir).as_posix()
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = output_file.with_name(output_file.name + ".tmp")
+        hasher = hashlib.sha256()
+        size = 0
+        links: List[str] = []
+        images: List[str] = []
+        terms = extract_terms(page["title"]) if self.indexes else set()
+        fragments: Set[str] = set()
+        stat = page_file.stat()
+        
+        with self.profiler.stage("render_page", page=page["path"]):
+            with open(page_file, 'r') as source, open(tmp_file, 'wb') as out:
+                lines = self._expand_lines(source, fragments)
+                if self.indexes:
+                    lines = self._collect_terms(lines, terms)
+                for chunk in self.render_page_chunks(lines, page["title"], site_title):
+                    chunk = self.rewrite_assets(chunk, output_rel)
+                    data = chunk.encode("utf-8")
+                    hasher.update(data)
+                    size += len(data)
+                    out.write(data)
+                    if self.indexes:
+                        links.extend(extract_links(chunk))
+                        images.extend(extract_images(chunk))
+        digest = hasher.hexdigest()
+        
+        self.size_stats["pages"] += 1
+        self.size_stats["bytes_before"] += size + self._inline_style_bytes()
+        self.size_stats["bytes_after"] += size
+        
+        # Keep the existing file (and its mtime) when the content is identical
+        previous = self.previous_manifest["pages"].get(page["path"])
+        with self.profiler.stage("write", page=page["path"]):
+            if previous and previous["hash"] == digest and output_file.exists():
+                tmp_file.unlink()
+                self.log(f"Unchanged: {self._display_path(output_file)}")
+            else:
+                tmp_file.replace(output_file)
+                self.profiler.add_bytes(size)
+                self.log(f"Built: {self._display_path(output_file)}")
+        
+        entry = {
+            "source": page["file"],
+            "output": output_rel,
+            "hash": digest,
+            "bytes": size,
+        }
+        self.record_dependencies(page, entry, stat, fragments)
+        if self.indexes:
+            entry.update({"title": page["title"], "links": links, "images": images, "terms": sorted(terms)})
+        return entry
+    
+    def _expand_lines(self, lines: Iterable[str], fragments: Set[str]) -> Iterator[str]:
+        for line in lines:
+            expanded, deps = self.expand_includes(line)
+            fragments.update(deps)
+            yield expanded
+    
+    def _collect_terms(self, lines: Iterable[str], terms: set) -> Iterator[str]:
+        for line in lines:
+            terms.update(extract_terms(line))
+            yield line
+    
+    def log(self, message: str):
+        """Print builder progress unless running quietly"""
+        if not self.quiet:
+            print(message)
+    
+    def _display_path(self, path: Path) -> str:
+        try:
+            return str(path.relative_to(self.project_root))
+        except ValueError:
+            return str(path)
+    
+    def _inline_style_bytes(self) -> int:
+        """Bytes each page saves by linking the stylesheet instead of inlining it"""
+        if not self.stylesheet_href:
+            return 0
+        inline = f"    <style>\n{SITE_STYLESHEET}    </style>"
+        return len(inline.encode("utf-8")) - len(self.style_html().encode("utf-8"))
+    
+    def report_sizes(self):
+        """Print page transfer sizes before and after minification/extraction"""
+        stats = self.size_stats
+        if not stats["pages"]:
+            return
+        before, after = stats["bytes_before"], stats["bytes_after"]
+        saved = 100.0 * (before - after) / before if before else 0.0
+        self.log(f"Page size: {before} -> {after} bytes over {stats['pages']} pages ({saved:.1f}% smaller)")
+    
+    def write_if_changed(self, output_file: Path, content: str) -> bool:
+        """Write content unless the file already holds it, keeping its mtime stable"""
+        data = content.encode("utf-8")
+        try:
+            if output_file.stat().st_size == len(data) and output_file.read_bytes() == data:
+                return False
+        except FileNotFoundError:
+            pass
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        # Replace rather than overwrite: the old file may be a hardlink into public/
+        tmp_file = output_file.with_name(f"{output_file.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+        tmp_file.write_bytes(data)
+        tmp_file.replace(output_file)
+        self.profiler.add_bytes(len(data))
+        return True
+    
+    def build_indexes(self):
+        """Write sitemap(s) and the search index and report broken internal links"""
+        pages = self.manifest["pages"]
+        base_url = self.site_config.get("base_url", "")
+        for name, content in render_sitemaps(pages, base_url).items():
+            self.write_if_changed(self.build_dir / name, content)
+        self.write_if_changed(self.build_dir / SEARCH_INDEX_NAME,
+                              dump_search_index(build_search_index(pages)))
+        
+        self.broken_links = find_broken_links(pages, self.build_dir)
+        for link in self.broken_links:
+            self.log(f"Broken link: {link['page']} -> {link['href']}")
+        self.log(f"Indexes: {len(pages)} pages, {len(self.broken_links)} broken links")
+    
+    def report_render_cache(self):
+        """Print render cache hits, misses and evictions for this build"""
+        stats = self.render_cache.stats
+        self.log(f"Render cache: {stats['hits']} hits, {stats['misses']} misses "
+                 f"({100.0 * self.render_cache.hit_rate:.1f}% hit rate), {stats['evicted']} evicted")
+    
+    def compress_outputs(self):
+        """Write precompressed siblings for text outputs above the size threshold"""
+        compressor = Precompressor(self.build_dir, min_size=self.compress_min_size)
+        self.compress_stats = compressor.run()
+        stats = self.compress_stats
+        self.profiler.add_bytes(stats["bytes_out"])
+        self.log(f"Compressed: {stats['written']} written, {stats['skipped']} up to date "
+              f"({', '.join(compressor.encoders)}; {stats['bytes_in']} -> {stats['bytes_out']} bytes)")
     
     def create_sample_pages(self):
         """Create sample markdown pages"""
@@ -208,24 +924,254 @@ See the README for more details on block anatomy.
         
         for filename, content in samples.items():
             (self.pages_dir / filename).write_text(content)
-            print(f"Created sample page: pages/{filename}")
+            self.log(f"Created sample page: pages/{filename}")
     
     def build(self):
         """Run the complete build process"""
-        print("Starting static site build...")
+        self.log("Starting static site build...")
         
-        self.clean_build()
-        self.copy_static_assets()
-        self.build_pages()
+        with self.profiler.stage("build"):
+            # Read before cleaning: asset hashes stay reusable across clean builds
+            self.previous_manifest = load_manifest(self.build_dir)
+            if self.incremental:
+                self.build_dir.mkdir(parents=True, exist_ok=True)
+            else:
+                with self.profiler.stage("clean_build"):
+                    self.clean_build()
+            # Static assets are site-wide, so only the first shard carries them
+            if self.shard_index == 0:
+                with self.profiler.stage("copy_static_assets"):
+                    self.copy_static_assets()
+            if self.fingerprint:
+                with self.profiler.stage("fingerprint_assets"):
+                    self.fingerprint_assets()
+            if self.optimize_images:
+                with self.profiler.stage("process_images"):
+                    self.process_images()
+            if self.extract_css or self.critical_css:
+                with self.profiler.stage("write_stylesheet"):
+                    self.write_stylesheet()
+            with self.profiler.stage("build_pages"):
+                self.build_pages()
+            if self.critical:
+                stats = self.critical.stats
+                self.log(f"Critical CSS: {stats['pages']} pages, {stats['templates']} templates analysed, "
+                         f"{stats['subsets']} distinct subsets")
+            if self.fingerprint:
+                self.write_cache_manifests()
+            # A shard only sees its own pages; indexes are built once after the merge
+            if self.indexes and self.shard_count <= 1:
+                with self.profiler.stage("build_indexes"):
+                    self.build_indexes()
+            if self.minify or self.extract_css:
+                self.report_sizes()
+            if self.compress:
+                with self.profiler.stage("compress_outputs"):
+                    self.compress_outputs()
+            if self.render_cache:
+                with self.profiler.stage("evict_render_cache"):
+                    self.render_cache.evict()
+                self.report_render_cache()
         
-        print(f"\nBuild complete! Site generated in: {self.build_dir}")
-        print("To serve locally, run: python -m http.server 8000 --directory build")
+        self.log(f"\nBuild complete! Site generated in: {self.build_dir}")
+        self.log("To preview locally, run: python -m neo_umg.build_site --serve")
+
+def _build_locale(builder: StaticSiteBuilder, config: Dict[str, Any]) -> StaticSiteBuilder:
+    builder.build_pages(config)
+    return builder
+
+def _build_shard(project_root: Path, build_dir: Path, shard_index: int, shard_count: int,
+                 options: Dict[str, Any]) -> int:
+    builder = StaticSiteBuilder(project_root, build_dir=build_dir, shard_index=shard_index,
+                                shard_count=shard_count, **options)
+    builder.build()
+    return len(builder.manifest["pages"])
+
+def build_sharded(project_root: Path, shard_count: int, jobs: Optional[int] = None,
+                  **options) -> Dict[str, Any]:
+    """Build every shard in a local worker process, then merge into build/"""
+    from concurrent.futures import ProcessPoolExecutor
+    
+    shards_root = (options.get("cache_dir") or project_root / ".neo_cache") / "shards"
+    shard_dirs = [shards_root / str(i) for i in range(shard_count)]
+    with ProcessPoolExecutor(max_workers=jobs or shard_count) as pool:
+        futures = [
+            pool.submit(_build_shard, project_root, shard_dirs[i], i, shard_count, options)
+            for i in range(shard_count)
+        ]
+        for future in futures:
+            future.result()
+    
+    build_dir = project_root / "build"
+    if not options.get("incremental") and build_dir.exists():
+        shutil.rmtree(build_dir)
+    stats = merge_shards(shard_dirs, build_dir, link_mode=options.get("link_mode", "auto"))
+    if options.get("indexes"):
+        stats["broken_links"] = len(build_merged_indexes(project_root, build_dir, options).broken_links)
+    return stats
+
+def build_merged_indexes(project_root: Path, build_dir: Path, options: Dict[str, Any]) -> "StaticSiteBuilder":
+    """Write sitemap and search index for a merged build from its combined manifest"""
+    builder = StaticSiteBuilder(project_root, build_dir=build_dir, **options)
+    builder.manifest = load_manifest(build_dir)
+    builder.site_config = builder.load_page_config()
+    builder.build_indexes()
+    return builder
+
+def rebuild_preview(project_root: Path, build_dir: Path, options: Dict[str, Any],
+                    store: PreviewStore) -> Optional[Dict[str, int]]:
+    """Rebuild incrementally and swap the result into store; None if the build failed"""
+    rebuild_options = dict(options, incremental=True, quiet=True)
+    try:
+        StaticSiteBuilder(project_root, build_dir=build_dir, **rebuild_options).build()
+    except Exception as e:
+        # Mid-edit sources (half-written site.json, a broken include) must not stop the server
+        print(f"Rebuild failed, still serving the last good build: {type(e).__name__}: {e}")
+        return None
+    return store.refresh()
+
+def serve_preview(project_root: Path, build_dir: Path, options: Dict[str, Any],
+                  host: str = "localhost", port: int = 8000, interval: float = 1.0):
+    """Serve build_dir from memory, rebuilding incrementally when sources change"""
+    import time
+    
+    store = PreviewStore(build_dir)
+    store.refresh()
+    server = create_server(store, host, port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Preview running on http://{host}:{port}/ ({len(store.entries)} files in memory)")
+    print("Press Ctrl+C to stop...")
+    
+    sources = [project_root / name for name in ("pages", "fragments", "public", "site.json")]
+    snapshot = snapshot_sources(sources)
+    try:
+        while True:
+            time.sleep(interval)
+            current = snapshot_sources(sources)
+            if current == snapshot:
+                continue
+            # A failed rebuild is retried on the next change, not on every poll
+            snapshot = current
+            stats = rebuild_preview(project_root, build_dir, options, store)
+            if stats:
+                print(f"Rebuilt: {stats['added']} added, {stats['updated']} updated, "
+                      f"{stats['removed']} removed, {stats['unchanged']} unchanged")
+    except KeyboardInterrupt:
+        print("\nShutting down...")
+        server.shutdown()
 
 def main():
     """Entry point for the builder"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Build the static site")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Keep the existing build directory and only update changed files")
+    parser.add_argument("--link-mode", choices=LINK_MODES, default="auto",
+                        help="How to place new or changed assets in the build directory")
+    parser.add_argument("--compress", action="store_true",
+                        help="Write .gz (and .br/.zst when available) siblings for text outputs")
+    parser.add_argument("--compress-min-size", type=int, default=DEFAULT_MIN_SIZE,
+                        help="Smallest output size in bytes worth precompressing")
+    parser.add_argument("--minify", action="store_true",
+                        help="Minify page HTML and inline CSS (pre/code blocks are preserved)")
+    parser.add_argument("--extract-css", action="store_true",
+                        help="Move the shared inline stylesheet into one fingerprinted CSS file")
+    parser.add_argument("--build-dir", type=Path, default=None,
+                        help="Output directory (defaults to build/)")
+    parser.add_argument("--shard", default=None, metavar="INDEX/COUNT",
+                        help="Build only one deterministic shard of the pages, e.g. 0/4")
+    parser.add_argument("--shards", type=int, default=None, metavar="COUNT",
+                        help="Split the build into COUNT shards on local worker processes and merge")
+    parser.add_argument("--quiet", action="store_true",
+                        help="Suppress per-page and stage progress output")
+    parser.add_argument("--profile", nargs="?", type=Path, const=Path("profile"), default=None,
+                        metavar="DIR",
+                        help="Write build_profile.json and a Chrome trace to DIR (default: profile/)")
+    parser.add_argument("--profile-top", type=int, default=10, metavar="N",
+                        help="Number of slowest pages to list in the profile report")
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream pages from disk to disk to bound memory on very large sites")
+    parser.add_argument("--indexes", action="store_true",
+                        help="Write sitemap.xml, search-index.json and report broken internal links")
+    parser.add_argument("--fingerprint", action="store_true",
+                        help="Publish content-hashed asset names, rewrite references and emit _headers")
+    parser.add_argument("--images", action="store_true",
+                        help="Create resized image variants (needs Pillow) and lazy-load <img> tags")
+    parser.add_argument("--critical-css", action="store_true",
+                        help="Inline the CSS rules each page uses and load the full stylesheet deferred")
+    parser.add_argument("--cache-dir", type=Path, default=None,
+                        help="Directory for build caches (defaults to .neo_cache/)")
+    parser.add_argument("--render-cache", action="store_true",
+                        help="Reuse rendered pages from the cache directory across builds and branches")
+    parser.add_argument("--cache-max-mb", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help="Size bound of the render cache; least recently used pages are evicted")
+    parser.add_argument("--serve", action="store_true",
+                        help="After building, serve the output from memory and rebuild on changes")
+    parser.add_argument("--host", default="localhost", help="Preview server host")
+    parser.add_argument("--port", type=int, default=8000, help="Preview server port")
+    parser.add_argument("--merge", nargs="+", type=Path, default=None, metavar="SHARD_DIR",
+                        help="Merge shard build directories into the build directory")
+    args = parser.parse_args()
+    
     project_root = Path(__file__).parent.parent
-    builder = StaticSiteBuilder(project_root)
+    build_dir = args.build_dir or project_root / "build"
+    options = {
+        "incremental": args.incremental,
+        "link_mode": args.link_mode,
+        "compress": args.compress,
+        "compress_min_size": args.compress_min_size,
+        "minify": args.minify,
+        "extract_css": args.extract_css,
+        "quiet": args.quiet,
+        "streaming": args.stream,
+        "indexes": args.indexes,
+        "fingerprint": args.fingerprint,
+        "optimize_images": args.images,
+        "critical_css": args.critical_css,
+        "cache_dir": args.cache_dir,
+        "render_cache": args.render_cache,
+        "cache_max_bytes": args.cache_max_mb * 1024 * 1024,
+    }
+    
+    try:
+        if args.merge:
+            stats = merge_shards(args.merge, build_dir, link_mode=args.link_mode)
+            if args.indexes:
+                build_merged_indexes(project_root, build_dir, options)
+            print(f"Merged {stats['shards']} shards: {stats['pages']} pages, {stats['files']} files")
+            return
+        if args.shards:
+            stats = build_sharded(project_root, args.shards, **options)
+            print(f"Merged {stats['shards']} shards: {stats['pages']} pages, {stats['files']} files")
+            return
+    except ShardCollisionError as e:
+        print(f"ERROR: {e}")
+        raise SystemExit(1)
+    
+    shard_index, shard_count = parse_shard(args.shard) if args.shard else (0, 1)
+    profiler = BuildProfiler() if args.profile else None
+    builder = StaticSiteBuilder(
+        project_root,
+        build_dir=build_dir,
+        shard_index=shard_index,
+        shard_count=shard_count,
+        profiler=profiler,
+        **options,
+    )
     builder.build()
+    
+    if profiler:
+        profile_dir = args.profile if args.profile.is_absolute() else project_root / args.profile
+        paths = profiler.write(profile_dir, top_n=args.profile_top)
+        report = profiler.report(args.profile_top)
+        print(f"\nProfile: {report['wall_ms']:.1f} ms, {report['bytes_written']} bytes written")
+        for entry in report["slowest_pages"]:
+            print(f"  {entry['ms']:8.2f} ms  {entry['page']}")
+        print(f"Report: {paths['report']}\nTrace:  {paths['trace']}")
+    
+    if args.serve:
+        serve_preview(project_root, build_dir, options, args.host, args.port)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
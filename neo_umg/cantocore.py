@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Cantocore Parser
+Tokenizes and parses block cantocore directives into a compact tuple AST,
+caching by source string so repeated directives are parsed once
+"""
+
+import re
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional, Tuple, Union
+
+# One alternation, tried left to right; whitespace is skipped
+TOKEN_RE = re.compile(r"""
+    (?P<ws>\s+)
+  | (?P<directive>::)
+  | (?P<bind>=>)
+  | (?P<arrow>→|->)
+  | (?P<number>-?\d+(?:\.\d+)?)
+  | (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+  | (?P<name>[^\W\d][\w-]*)
+  | (?P<punct>[:.,\[\]{}()])
+""", re.VERBOSE)
+
+CACHE_SIZE = 65536
+
+Token = Tuple[str, str, int]
+Node = Tuple[Any, ...]
+
+
+class CantocoreSyntaxError(ValueError):
+    """Raised for malformed cantocore; position is the offset into the source"""
+
+    def __init__(self, message: str, source: str, position: int):
+        super().__init__(f"{message} at {position}: {source!r}")
+        self.source = source
+        self.position = position
+
+
+def tokenize(source: str) -> List[Token]:
+    """(kind, text, offset) tokens; punctuation tokens use the character as kind"""
+    tokens = []
+    position = 0
+    end = len(source)
+    while position < end:
+        match = TOKEN_RE.match(source, position)
+        if match is None:
+            raise CantocoreSyntaxError(f"Unexpected character {source[position]!r}", source, position)
+        kind = match.lastgroup
+        if kind != "ws":
+            text = match.group()
+            tokens.append((text if kind == "punct" else kind, text, position))
+        position = match.end()
+    return tokens
+
+
+class Parser:
+    """Recursive-descent parser over one source string
+
+    program     := statement*
+    statement   := '::' NAME ':' expr               -> ("guard", NAME, expr)
+                 | ARROW expr                       -> ("then", expr)
+                 | NAME ':' NAME ['[' args ']'] ['{' bindings '}']
+                                                    -> ("op", kind, name, args, bindings)
+                 | expr                             -> ("expr", expr)
+    expr        := path ['(' args ')']              -> "a.b" or ("call", "a.b", args)
+    value       := expr | NUMBER | STRING           -> strings are ("str", text)
+    bindings    := expr '=>' expr (',' ...)*        -> ((event, target), ...)
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        self.tokens = tokenize(source)
+        self.index = 0
+
+    def peek(self, offset: int = 0) -> Optional[str]:
+        position = self.index + offset
+        return self.tokens[position][0] if position < len(self.tokens) else None
+
+    def take(self, kind: str) -> str:
+        if self.peek() != kind:
+            self.fail(f"Expected {kind!r}")
+        text = self.tokens[self.index][1]
+        self.index += 1
+        return text
+
+    def fail(self, message: str):
+        position = self.tokens[self.index][2] if self.index < len(self.tokens) else len(self.source)
+        raise CantocoreSyntaxError(message, self.source, position)
+
+    def program(self) -> Tuple[Node, ...]:
+        statements = []
+        while self.peek() is not None:
+            statements.append(self.statement())
+        return tuple(statements)
+
+    def statement(self) -> Node:
+        kind = self.peek()
+        if kind == "directive":
+            self.index += 1
+            keyword = self.take("name")
+            self.take(":")
+            return ("guard", keyword, self.expr())
+        if kind == "arrow":
+            self.index += 1
+            return ("then", self.expr())
+        if kind == "name" and self.peek(1) == ":":
+            op_kind = self.take("name")
+            self.index += 1
+            name = self.path()
+            args = self.sequence("[", "]", self.value) if self.peek() == "[" else ()
+            bindings = self.sequence("{", "}", self.binding) if self.peek() == "{" else ()
+            return ("op", op_kind, name, args, bindings)
+        return ("expr", self.expr())
+
+    def path(self) -> str:
+        parts = [self.take("name")]
+        while self.peek() == "." and self.peek(1) == "name":
+            self.index += 1
+            parts.append(self.take("name"))
+        return ".".join(parts)
+
+    def expr(self) -> Union[str, Node]:
+        path = self.path()
+        if self.peek() == "(":
+            return ("call", path, self.sequence("(", ")", self.value))
+        return path
+
+    def value(self) -> Any:
+        kind = self.peek()
+        if kind == "number":
+            text = self.take("number")
+            return float(text) if "." in text else int(text)
+        if kind == "string":
+            return ("str", self.take("string")[1:-1])
+        return self.expr()
+
+    def binding(self) -> Node:
+        event = self.expr()
+        self.take("bind")
+        return (event, self.expr())
+
+    def sequence(self, opener: str, closer: str, item) -> Tuple[Any, ...]:
+        """Comma-separated items between opener and closer"""
+        self.take(opener)
+        items = []
+        while self.peek() != closer:
+            items.append(item())
+            if self.peek() != ",":
+                break
+            self.index += 1
+        self.take(closer)
+        return tuple(items)
+
+
+def parse(source: str) -> Tuple[Node, ...]:
+    """Parse one cantocore string; raises CantocoreSyntaxError"""
+    return Parser(source).program()
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_cached(source: str) -> Tuple[Node, ...]:
+    """parse() memoised by source; malformed sources become an ("error", message) statement"""
+    try:
+        return parse(source)
+    except CantocoreSyntaxError as e:
+        return (("error", str(e)),)
+
+
+def compile_cantocore(value: Union[str, Iterable[str], None]) -> Tuple[Node, ...]:
+    """AST of a block's cantocore field, which is a string or a list of directive strings"""
+    if not value:
+        return ()
+    if isinstance(value, str):
+        return parse_cached(value)
+    statements: Tuple[Node, ...] = ()
+    for item in value:
+        if isinstance(item, str):
+            statements += parse_cached(item)
+    return statements
+
+
+def operation_hint(statements: Tuple[Node, ...]) -> str:
+    """First bracketed argument of the first instruction, e.g. INSTRUCTION:GA[EVENT] -> EVENT
+
+    Strings give their text, calls their path and numbers their value.
+    """
+    for statement in statements:
+        if statement[0] == "op" and statement[3]:
+            arg = statement[3][0]
+            if isinstance(arg, str):
+                return arg
+            if isinstance(arg, tuple):
+                # ("str", text) or ("call", path, args)
+                return arg[1]
+            return str(arg)
+    return ""
+
+
+def cache_info():
+    return parse_cached.cache_info()
+
+
+def clear_cache():
+    parse_cached.cache_clear()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Precompression Stage
+Writes .gz/.br/.zst siblings next to build outputs so static hosts
+can serve them without compressing per request
+"""
+
+import os
+import gzip
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSIBLE_SUFFIXES = {".html", ".css", ".js", ".json", ".xml", ".svg", ".txt"}
+
+DEFAULT_MIN_SIZE = 1024
+
+# Every sibling suffix any encoder may have written
+SIBLING_SUFFIXES = (".gz", ".br", ".zst")
+
+
+def _gzip(data: bytes) -> bytes:
+    # mtime=0 keeps the output byte-identical across builds
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def available_encoders() -> Dict[str, Callable[[bytes], bytes]]:
+    """Return the encoders usable in this environment keyed by file suffix"""
+    encoders: Dict[str, Callable[[bytes], bytes]] = {".gz": _gzip}
+    if brotli is not None:
+        encoders[".br"] = lambda data: brotli.compress(data, quality=11)
+    if zstandard is not None:
+        encoders[".zst"] = zstandard.ZstdCompressor(level=19).compress
+    return encoders
+
+
+class Precompressor:
+    """Compress eligible files in a directory tree in parallel"""
+
+    def __init__(self, root: Path, min_size: int = DEFAULT_MIN_SIZE,
+                 suffixes=COMPRESSIBLE_SUFFIXES, max_workers: Optional[int] = None):
+        self.root = root
+        self.min_size = min_size
+        self.suffixes = set(suffixes)
+        self.encoders = available_encoders()
+        self.max_workers = max_workers or (os.cpu_count() or 1)
+
+    def candidates(self) -> List[Path]:
+        """Find files that should get precompressed siblings (dotfiles excluded)"""
+        return [
+            path for path in self.root.rglob("*")
+            if path.suffix in self.suffixes and not path.name.startswith(".") and path.is_file()
+            and path.stat().st_size >= self.min_size
+        ]
+
+    def compress_file(self, path: Path) -> Dict[str, int]:
+        """Write compressed siblings for one file unless they are current"""
+        result = {"written": 0, "skipped": 0, "bytes_in": 0, "bytes_out": 0}
+        source_stat = path.stat()
+        data = None
+
+        for suffix, encode in self.encoders.items():
+            sibling = path.with_name(path.name + suffix)
+            try:
+                # Siblings carry the source mtime, so a match means up to date
+                if sibling.stat().st_mtime_ns == source_stat.st_mtime_ns:
+                    result["skipped"] += 1
+                    continue
+            except FileNotFoundError:
+                pass
+
+            if data is None:
+                data = path.read_bytes()
+            compressed = encode(data)
+            if len(compressed) >= len(data):
+                sibling.unlink(missing_ok=True)
+                continue
+
+            # A fresh file, so a sibling hardlinked into public/ is never written through
+            tmp_path = sibling.with_name(f"{sibling.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(compressed)
+            tmp_path.replace(sibling)
+            os.utime(sibling, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+            result["written"] += 1
+            result["bytes_in"] += len(data)
+            result["bytes_out"] += len(compressed)
+
+        return result
+
+    def run(self) -> Dict[str, int]:
+        """Precompress every candidate and return aggregate statistics"""
+        totals = {"files": 0, "written": 0, "skipped": 0, "bytes_in": 0, "bytes_out": 0}
+        files = self.candidates()
+        totals["files"] = len(files)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for result in pool.map(self.compress_file, files):
+                for key, value in result.items():
+                    totals[key] += value
+
+        return totals
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Critical CSS
+Selects the stylesheet rules a page's DOM can match so they can be inlined
+while the full stylesheet loads deferred
+"""
+
+import re
+from html.parser import HTMLParser
+from typing import Callable, Dict, FrozenSet, List, Set, Tuple
+
+_COMMENT_RE = re.compile(r"/\*.*?\*/", re.DOTALL)
+_COMBINATOR_RE = re.compile(r"\s*[>+~]\s*|\s+")
+_PSEUDO_RE = re.compile(r"::?[\w-]+(?:\([^)]*\))?")
+_ATTRIBUTE_RE = re.compile(r"\[[^\]]*\]")
+_SIMPLE_RE = re.compile(r"([.#]?)([\w-]+)")
+
+# At-rules whose bodies hold ordinary rules that can be filtered
+NESTED_AT_RULES = ("@media", "@supports", "@layer")
+
+# (prelude, raw rule text, nested rules for grouping at-rules)
+Rule = Tuple[str, str, list]
+
+
+class _TokenCollector(HTMLParser):
+    """Collects tag names, .classes and #ids from markup"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.tokens: Set[str] = set()
+
+    def handle_starttag(self, tag, attrs):
+        self.tokens.add(tag)
+        for name, value in attrs:
+            if name == "class" and value:
+                self.tokens.update("." + cls for cls in value.split())
+            elif name == "id" and value:
+                self.tokens.add("#" + value)
+
+
+def dom_tokens(html: str) -> Set[str]:
+    """Return the tag, .class and #id tokens present in a piece of HTML"""
+    collector = _TokenCollector()
+    collector.feed(html)
+    collector.close()
+    return collector.tokens
+
+
+def _block_end(css: str, start: int) -> int:
+    """Index just past the brace closing the block opened at css[start]"""
+    depth = 0
+    for i in range(start, len(css)):
+        if css[i] == "{":
+            depth += 1
+        elif css[i] == "}":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+    return len(css)
+
+
+def parse_rules(css: str) -> List[Rule]:
+    """Split a stylesheet into top-level rules, recursing into @media-style blocks"""
+    css = _COMMENT_RE.sub("", css)
+    rules: List[Rule] = []
+    position = 0
+    while True:
+        brace = css.find("{", position)
+        if brace == -1:
+            return rules
+        prelude = css[position:brace]
+        # Statement at-rules such as @import/@charset end at ';'
+        while prelude.lstrip().startswith("@") and ";" in prelude:
+            prelude = prelude[prelude.index(";") + 1:]
+        prelude = prelude.strip()
+        end = _block_end(css, brace)
+        children = []
+        if prelude.startswith(NESTED_AT_RULES):
+            children = parse_rules(css[brace + 1:end - 1])
+        rules.append((prelude, f"{prelude} {css[brace:end]}", children))
+        position = end
+
+
+def selector_tokens(selector: str) -> List[Set[str]]:
+    """Return, per compound selector, the tokens an element needs to match it"""
+    selector = _ATTRIBUTE_RE.sub("", _PSEUDO_RE.sub("", selector))
+    compounds = []
+    for compound in _COMBINATOR_RE.split(selector.strip()):
+        if compound:
+            compounds.append({prefix + name if prefix else name.lower()
+                              for prefix, name in _SIMPLE_RE.findall(compound)})
+    return compounds
+
+
+def selector_matches(selector: str, tokens: Set[str]) -> bool:
+    """Conservatively decide whether a selector can match a DOM with these tokens"""
+    return all(compound <= tokens for compound in selector_tokens(selector))
+
+
+def critical_rules(rules: List[Rule], tokens: Set[str]) -> List[str]:
+    """Return the raw text of rules that may apply to a DOM with these tokens"""
+    selected = []
+    for prelude, text, children in rules:
+        if prelude.startswith(NESTED_AT_RULES):
+            inner = critical_rules(children, tokens)
+            if inner:
+                selected.append(prelude + " {\n" + "\n".join(inner) + "\n}")
+        elif prelude.startswith("@"):
+            # @font-face, @keyframes, ...: left to the deferred stylesheet
+            continue
+        elif any(selector_matches(s, tokens) for s in prelude.split(",")):
+            selected.append(text)
+    return selected
+
+
+class CriticalCSS:
+    """Per-page critical subsets of one stylesheet, with per-template analysis cached"""
+
+    def __init__(self, css: str):
+        self.rules = parse_rules(css)
+        self.known_tokens: Set[str] = set()
+        self._collect_known(self.rules)
+        self._templates: Dict[str, FrozenSet[str]] = {}
+        self._subsets: Dict[FrozenSet[str], str] = {}
+        self.stats = {"pages": 0, "templates": 0, "subsets": 0}
+
+    def _collect_known(self, rules: List[Rule]):
+        for prelude, _, children in rules:
+            if children:
+                self._collect_known(children)
+            elif not prelude.startswith("@"):
+                for selector in prelude.split(","):
+                    for compound in selector_tokens(selector):
+                        self.known_tokens |= compound
+
+    def template_tokens(self, template_key: str, shell: Callable[[], str]) -> FrozenSet[str]:
+        """Tokens of a layout's shell, analysed once per template"""
+        tokens = self._templates.get(template_key)
+        if tokens is None:
+            tokens = frozenset(dom_tokens(shell()) & self.known_tokens)
+            self._templates[template_key] = tokens
+            self.stats["templates"] += 1
+        return tokens
+
+    def for_page(self, template_key: str, shell: Callable[[], str], content_html: str) -> str:
+        """Return the critical CSS for a page built from this template and content"""
+        self.stats["pages"] += 1
+        tokens = self.template_tokens(template_key, shell) | (dom_tokens(content_html) & self.known_tokens)
+        css = self._subsets.get(tokens)
+        if css is None:
+            css = "\n".join(critical_rules(self.rules, set(tokens)))
+            self._subsets[tokens] = css
+            self.stats["subsets"] += 1
+        return css
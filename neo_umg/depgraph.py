@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Build Dependency Graph
+Records which fragments, data entries and templates each fragment was
+rendered from, and works out what a change invalidates; pages keep their
+own dependencies in their manifest entries
+"""
+
+from graphlib import TopologicalSorter
+from typing import Dict, Iterable, List, Set
+
+
+def fragment_node(name: str) -> str:
+    return f"fragment:{name}"
+
+
+def data_node(key: str) -> str:
+    return f"data:{key}"
+
+
+TEMPLATE_NODE = "template"
+
+# The fingerprinted asset name mapping pages are rewritten against
+ASSETS_NODE = "assets"
+
+
+class DependencyGraph:
+    """Directed graph of node -> the nodes it was built from"""
+
+    def __init__(self, edges: Dict[str, Iterable[str]] = None):
+        self.edges: Dict[str, Set[str]] = {node: set(deps) for node, deps in (edges or {}).items()}
+
+    def set(self, node: str, deps: Iterable[str]):
+        """Replace the recorded dependencies of node"""
+        self.edges[node] = set(deps)
+
+    def nodes(self) -> Set[str]:
+        """Return every node mentioned in the graph"""
+        nodes = set(self.edges)
+        for deps in self.edges.values():
+            nodes.update(deps)
+        return nodes
+
+    def prune(self, roots: Iterable[str]):
+        """Drop nodes that are no longer reachable from roots"""
+        reachable: Set[str] = set()
+        stack = [root for root in roots if root in self.edges]
+        while stack:
+            node = stack.pop()
+            if node in reachable:
+                continue
+            reachable.add(node)
+            stack.extend(self.edges.get(node, ()))
+        self.edges = {node: deps for node, deps in self.edges.items() if node in reachable}
+
+    def topological_order(self) -> List[str]:
+        """Return nodes ordered so dependencies come before dependents"""
+        return list(TopologicalSorter(self.edges).static_order())
+
+    def invalidated(self, changed: Set[str]) -> Set[str]:
+        """Return every node that is, or transitively depends on, a changed node"""
+        dirty = set(changed)
+        for node in self.topological_order():
+            if node not in dirty and self.edges.get(node, set()) & dirty:
+                dirty.add(node)
+        return dirty
+
+    def to_dict(self) -> Dict[str, List[str]]:
+        return {node: sorted(deps) for node, deps in sorted(self.edges.items())}
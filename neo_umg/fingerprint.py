@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Asset Fingerprinting
+Publishes static assets under content-hashed names, rewrites page
+references to them and emits long-lived cache headers
+"""
+
+import os
+import re
+import shutil
+import posixpath
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+from concurrent.futures import ThreadPoolExecutor
+
+from .asset_sync import AssetSync, file_digest
+from .compress import SIBLING_SUFFIXES
+from .indexes import resolve_link
+
+FINGERPRINT_SUFFIXES = {
+    ".css", ".js", ".mjs", ".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp",
+    ".avif", ".ico", ".woff", ".woff2", ".ttf", ".otf", ".mp4", ".webm",
+}
+
+ASSET_MANIFEST_NAME = "asset-manifest.json"
+HEADERS_NAME = "_headers"
+
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "public, max-age=0, must-revalidate"
+
+_URL_ATTR_RE = re.compile(r'\b(src|href)="([^"#?:]+)([^"]*)"')
+
+
+def fingerprinted_name(relative: str, digest: str, length: int = 10) -> str:
+    """Insert a content hash before the extension: app.css -> app.3f9a1c2b4d.css"""
+    directory, name = posixpath.split(relative)
+    stem, suffix = posixpath.splitext(name)
+    return posixpath.join(directory, f"{stem}.{digest[:length]}{suffix}")
+
+
+def rewrite_asset_urls(html: str, page_output: str, mapping: Dict[str, str]) -> str:
+    """Point src/href attributes that reference fingerprinted assets at the hashed names"""
+    if not mapping:
+        return html
+
+    def replace(match):
+        target = resolve_link(page_output, match.group(2))
+        hashed = mapping.get(target)
+        if hashed is None:
+            return match.group(0)
+        return f'{match.group(1)}="/{hashed}{match.group(3)}"'
+
+    return _URL_ATTR_RE.sub(replace, html)
+
+
+def render_headers(immutable_paths: Iterable[str], revalidate_paths: Iterable[str] = ("",)) -> str:
+    """Render a _headers file: hashed assets are immutable, named entry points revalidate"""
+    # Netlify and Cloudflare Pages join every matching rule, so a catch-all /*
+    # would append must-revalidate to the hashed files; unmatched paths already
+    # get the hosts' revalidating default
+    immutable = set(immutable_paths)
+    lines = []
+    for path in sorted(set(revalidate_paths) - immutable):
+        lines += [f"/{path}", f"  Cache-Control: {REVALIDATE_CACHE}", ""]
+    for path in sorted(immutable):
+        lines += [f"/{path}", f"  Cache-Control: {IMMUTABLE_CACHE}", ""]
+    return "\n".join(lines)
+
+
+class AssetFingerprinter:
+    """Hash assets (reusing unchanged hashes) and publish hashed copies"""
+
+    def __init__(self, source_dir: Path, build_dir: Path,
+                 previous: Optional[Dict[str, Dict[str, Any]]] = None,
+                 publish: bool = True, max_workers: Optional[int] = None):
+        self.source_dir = source_dir
+        self.build_dir = build_dir
+        self.previous = previous or {}
+        self.publish_copies = publish
+        self.max_workers = max_workers or min(8, (os.cpu_count() or 1) + 2)
+        self.records: Dict[str, Dict[str, Any]] = {}
+        self.stats = {"assets": 0, "hashed": 0, "reused": 0, "published": 0, "removed": 0}
+
+    @property
+    def mapping(self) -> Dict[str, str]:
+        """Original build-relative path -> fingerprinted path"""
+        return {rel: record["fingerprinted"] for rel, record in self.records.items()}
+
+    def run(self) -> Dict[str, Dict[str, Any]]:
+        """Fingerprint every eligible asset and return per-asset records"""
+        if not self.source_dir.exists():
+            return self.records
+
+        to_hash = []
+        for path, stat in AssetSync(self.source_dir, self.build_dir).scan():
+            if path.suffix.lower() not in FINGERPRINT_SUFFIXES:
+                continue
+            rel = path.relative_to(self.source_dir).as_posix()
+            record = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+            previous = self.previous.get(rel)
+            if previous and (previous["size"], previous["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+                record["hash"] = previous["hash"]
+                self.stats["reused"] += 1
+            else:
+                to_hash.append((rel, path))
+            self.records[rel] = record
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            digests = pool.map(lambda item: file_digest(item[1]), to_hash)
+            for (rel, _), digest in zip(to_hash, digests):
+                self.records[rel]["hash"] = digest
+                self.stats["hashed"] += 1
+
+        for rel, record in self.records.items():
+            record["fingerprinted"] = fingerprinted_name(rel, record["hash"])
+            if self.publish_copies and self.publish(rel, record["fingerprinted"]):
+                self.stats["published"] += 1
+        self.stats["assets"] = len(self.records)
+
+        if self.publish_copies:
+            self.remove_stale()
+        return self.records
+
+    def remove_stale(self):
+        """Delete hashed names from earlier builds that no longer apply"""
+        current = {record["fingerprinted"] for record in self.records.values()}
+        for record in self.previous.values():
+            stale = record.get("fingerprinted")
+            if not stale or stale in current:
+                continue
+            for sibling in SIBLING_SUFFIXES:
+                (self.build_dir / (stale + sibling)).unlink(missing_ok=True)
+            if (self.build_dir / stale).exists():
+                (self.build_dir / stale).unlink()
+                self.stats["removed"] += 1
+
+    def publish(self, rel: str, hashed: str) -> bool:
+        """Place the hashed copy next to the original; False if already present"""
+        target = self.build_dir / hashed
+        if target.exists():
+            return False
+        source = self.build_dir / rel
+        if not source.exists():
+            source = self.source_dir / rel
+        target.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copy2(source, target)
+        return True
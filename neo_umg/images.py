@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Image Optimization
+Resized, re-encoded image variants cached by source hash, and <img>
+rewriting with srcset and lazy loading
+"""
+
+import os
+import re
+import json
+import shutil
+import threading
+import posixpath
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from PIL import Image, features
+except ImportError:
+    Image = None
+
+from .asset_sync import AssetSync, file_digest
+from .indexes import resolve_link
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp"}
+DEFAULT_WIDTHS = (480, 960, 1600)
+VARIANT_DIR = "_img"
+
+# Matches the 800px content column in SITE_STYLESHEET
+DEFAULT_SIZES = "(max-width: 800px) 100vw, 800px"
+
+_IMG_TAG_RE = re.compile(r"<img\b[^>]*>", re.IGNORECASE)
+_SRC_RE = re.compile(r'\bsrc="([^"]*)"', re.IGNORECASE)
+
+
+def images_available() -> bool:
+    """True when Pillow is installed and variants can be produced"""
+    return Image is not None
+
+
+def rewrite_img_tags(html: str, page_output: str, variants: Dict[str, Dict[str, Any]],
+                     sizes: str = DEFAULT_SIZES, assets: Optional[Dict[str, str]] = None) -> str:
+    """Add loading="lazy" to <img> tags and srcset for images with variants
+
+    assets maps build-relative paths to fingerprinted names, so the
+    full-size srcset candidate uses the same hashed URL as src.
+    """
+
+    def rewrite(match):
+        tag = match.group(0)
+        extra = []
+        if "loading=" not in tag:
+            extra.append('loading="lazy"')
+        src = _SRC_RE.search(tag)
+        target = resolve_link(page_output, src.group(1)) if src else None
+        record = variants.get(target) if src else None
+        if record and record.get("variants") and "srcset=" not in tag:
+            candidates = [f"/{url} {width}w" for width, url in record["variants"]]
+            original = f"/{assets[target]}" if assets and target in assets else src.group(1)
+            candidates.append(f"{original} {record['width']}w")
+            extra.append(f'srcset="{", ".join(candidates)}"')
+            if "sizes=" not in tag:
+                extra.append(f'sizes="{sizes}"')
+        if not extra:
+            return tag
+        end = -2 if tag.endswith("/>") else -1
+        return tag[:end].rstrip() + " " + " ".join(extra) + tag[end:]
+
+    return _IMG_TAG_RE.sub(rewrite, html)
+
+
+class ImageOptimizer:
+    """Produce resized variants for images under a source directory"""
+
+    def __init__(self, source_dir: Path, build_dir: Path, cache_dir: Path,
+                 widths=DEFAULT_WIDTHS, quality: int = 80,
+                 previous: Optional[Dict[str, Dict[str, Any]]] = None,
+                 publish: bool = True, max_workers: Optional[int] = None):
+        self.source_dir = source_dir
+        self.build_dir = build_dir
+        self.cache_dir = cache_dir
+        self.widths = sorted(widths)
+        self.quality = quality
+        self.previous = previous or {}
+        # Shards other than the first only need the records, not the files
+        self.publish_variants = publish
+        self.max_workers = max_workers or (os.cpu_count() or 1)
+        self.records: Dict[str, Dict[str, Any]] = {}
+        self.stats = {"images": 0, "processed": 0, "cached": 0, "variants": 0}
+        self.use_webp = Image is not None and features.check("webp")
+
+    def variant_suffix(self, source_suffix: str) -> str:
+        return ".webp" if self.use_webp else source_suffix.lower()
+
+    def run(self) -> Dict[str, Dict[str, Any]]:
+        """Create or reuse variants for every image and return per-image records"""
+        if Image is None or not self.source_dir.exists():
+            return self.records
+
+        jobs = []
+        for path, stat in AssetSync(self.source_dir, self.build_dir).scan():
+            if path.suffix.lower() not in IMAGE_SUFFIXES:
+                continue
+            rel = path.relative_to(self.source_dir).as_posix()
+            previous = self.previous.get(rel)
+            if previous and (previous["size"], previous["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+                digest = previous["hash"]
+            else:
+                digest = None
+            jobs.append((rel, path, stat, digest, previous))
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for rel, record, cached in pool.map(lambda job: self.process(*job), jobs):
+                self.records[rel] = record
+                self.stats["cached" if cached else "processed"] += 1
+                self.stats["variants"] += len(record["variants"])
+        self.stats["images"] = len(self.records)
+        return self.records
+
+    def process(self, rel: str, path: Path, stat: os.stat_result, digest: Optional[str],
+                previous: Optional[Dict[str, Any]]) -> Tuple[str, Dict[str, Any], bool]:
+        """Build (or fetch from cache) the variants of one image"""
+        digest = digest or file_digest(path)
+        suffix = self.variant_suffix(path.suffix)
+        stem = posixpath.splitext(posixpath.basename(rel))[0]
+
+        if previous and previous["hash"] == digest:
+            width = previous["width"]
+        else:
+            # A clean checkout has no previous record but may share the cache
+            width = self.cached_width(digest)
+        cached = width is not None and all(
+            self.cache_path(digest, w, suffix).exists() for w in self.widths if w < width
+        )
+        if not cached:
+            if self.publish_variants:
+                width = self.render_variants(path, digest, suffix)
+            elif width is None:
+                width = self.source_width(path)
+
+        variants = []
+        for w in self.widths:
+            if w >= width:
+                break
+            url = posixpath.join(VARIANT_DIR, posixpath.dirname(rel), f"{stem}-{w}.{digest[:10]}{suffix}")
+            if self.publish_variants:
+                self.publish(self.cache_path(digest, w, suffix), self.build_dir / url)
+            variants.append([w, url])
+
+        record = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "hash": digest,
+            "width": width,
+            "variants": variants,
+        }
+        return rel, record, cached
+
+    def cache_path(self, digest: str, width: int, suffix: str) -> Path:
+        return self.cache_dir / f"{digest}-{width}q{self.quality}{suffix}"
+
+    def width_path(self, digest: str) -> Path:
+        return self.cache_dir / f"{digest}.json"
+
+    def cached_width(self, digest: str) -> Optional[int]:
+        """Source width recorded next to the cached variants, if any"""
+        try:
+            with open(self.width_path(digest), 'r') as f:
+                return json.load(f)["width"]
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            return None
+
+    def store_width(self, digest: str, width: int):
+        path = self.width_path(digest)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+        with open(tmp, 'w') as f:
+            json.dump({"width": width}, f)
+        tmp.replace(path)
+
+    def source_width(self, path: Path) -> int:
+        """Width from the image header, without decoding the pixels"""
+        with Image.open(path) as image:
+            return image.size[0]
+
+    def render_variants(self, path: Path, digest: str, suffix: str) -> int:
+        """Decode the image once, write every smaller width to the cache, return its width"""
+        with Image.open(path) as image:
+            width, height = image.size
+            if self.use_webp or suffix in (".jpg", ".jpeg"):
+                image = image.convert("RGBA" if self.use_webp and "A" in image.getbands() else "RGB")
+            for w in self.widths:
+                if w >= width:
+                    break
+                resized = image.resize((w, max(1, round(height * w / width))), Image.LANCZOS)
+                target = self.cache_path(digest, w, suffix)
+                # Shards may render the same image concurrently
+                tmp = target.with_name(f"{target.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+                resized.save(tmp, format=Image.registered_extensions()[suffix],
+                             quality=self.quality, optimize=True)
+                tmp.replace(target)
+        # Written last, so a recorded width means every variant is in place
+        self.store_width(digest, width)
+        return width
+
+    def publish(self, cached: Path, target: Path):
+        """Link or copy a cached variant into the build directory"""
+        if target.exists():
+            return
+        target.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(cached, target)
+        except OSError:
+            shutil.copy2(cached, target)
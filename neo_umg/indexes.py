@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Site Indexes
+Sitemap, prefix-searchable search index and internal link graph,
+assembled from per-page manifest entries
+"""
+
+import re
+import json
+import bisect
+import posixpath
+from pathlib import Path
+from typing import Any, Dict, List, Set
+from xml.sax.saxutils import escape
+
+# sitemaps.org protocol limits per file
+SITEMAP_MAX_URLS = 50000
+SITEMAP_MAX_BYTES = 50 * 1024 * 1024
+
+SEARCH_INDEX_NAME = "search-index.json"
+
+_HREF_RE = re.compile(r'<a\b[^>]*?\bhref="([^"]*)"', re.IGNORECASE)
+_IMG_RE = re.compile(r'<img\b[^>]*?\bsrc="([^"]*)"', re.IGNORECASE)
+_TERM_RE = re.compile(r"[a-z0-9]{2,}")
+_EXTERNAL_RE = re.compile(r"^(?:[a-z][a-z0-9+.-]*:|//|#)", re.IGNORECASE)
+
+
+def public_url(output: str) -> str:
+    """Map a build-relative output file to the URL it is served at"""
+    if output == "index.html":
+        return "/"
+    if output.endswith("/index.html"):
+        return "/" + output[:-len("index.html")]
+    return "/" + output
+
+
+def extract_links(html: str) -> List[str]:
+    """Return the internal link targets in a chunk of HTML"""
+    return [href for href in _HREF_RE.findall(html) if href and not _EXTERNAL_RE.match(href)]
+
+
+def extract_images(html: str) -> List[str]:
+    """Return local image sources in a chunk of HTML"""
+    return [src for src in _IMG_RE.findall(html) if src and not _EXTERNAL_RE.match(src)]
+
+
+def extract_terms(text: str) -> Set[str]:
+    """Return the lowercase search terms in a piece of text"""
+    return set(_TERM_RE.findall(text.lower()))
+
+
+def resolve_link(page_output: str, href: str) -> str:
+    """Resolve an internal href to a build-relative file path"""
+    target = href.split("#", 1)[0].split("?", 1)[0]
+    if not target:
+        return page_output
+    if target.startswith("/"):
+        resolved = target.lstrip("/")
+    else:
+        resolved = posixpath.join(posixpath.dirname(page_output), target)
+    if not resolved or resolved.endswith("/"):
+        resolved += "index.html"
+    return posixpath.normpath(resolved)
+
+
+def find_broken_links(pages: Dict[str, Dict[str, Any]], build_dir: Path) -> List[Dict[str, str]]:
+    """Report links from manifest entries whose targets do not exist in the build"""
+    outputs = {entry["output"] for entry in pages.values()}
+    missing_cache: Dict[str, bool] = {}
+    broken = []
+    for path, entry in pages.items():
+        for href in entry.get("links", []):
+            target = resolve_link(entry["output"], href)
+            if target in outputs:
+                continue
+            if target not in missing_cache:
+                candidate = build_dir / target
+                missing_cache[target] = not (candidate.is_file() or (candidate / "index.html").is_file())
+            if missing_cache[target]:
+                broken.append({"page": path, "href": href, "target": target})
+    return broken
+
+
+def _sitemap_entry(base_url: str, entry: Dict[str, Any]) -> str:
+    loc = escape(base_url + public_url(entry["output"]))
+    images = "".join(
+        f"<image:image><image:loc>{escape(base_url + '/' + resolve_link(entry['output'], src))}</image:loc></image:image>"
+        for src in entry.get("images", [])
+    )
+    return f"<url><loc>{loc}</loc>{images}</url>\n"
+
+
+def render_sitemaps(pages: Dict[str, Dict[str, Any]], base_url: str,
+                    max_urls: int = SITEMAP_MAX_URLS,
+                    max_bytes: int = SITEMAP_MAX_BYTES) -> Dict[str, str]:
+    """Render sitemap files, splitting into a sitemap index at protocol limits"""
+    base_url = base_url.rstrip("/")
+    header = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+              '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9" '
+              'xmlns:image="http://www.google.com/schemas/sitemap-image/1.1">\n')
+    footer = "</urlset>\n"
+
+    chunks: List[List[str]] = [[]]
+    size = len(header) + len(footer)
+    for path in sorted(pages):
+        entry = _sitemap_entry(base_url, pages[path])
+        if len(chunks[-1]) >= max_urls or (chunks[-1] and size + len(entry) > max_bytes):
+            chunks.append([])
+            size = len(header) + len(footer)
+        chunks[-1].append(entry)
+        size += len(entry)
+
+    if len(chunks) == 1:
+        return {"sitemap.xml": header + "".join(chunks[0]) + footer}
+
+    files = {}
+    index = ['<?xml version="1.0" encoding="UTF-8"?>\n'
+             '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n']
+    for number, chunk in enumerate(chunks, start=1):
+        name = f"sitemap-{number}.xml"
+        files[name] = header + "".join(chunk) + footer
+        index.append(f"<sitemap><loc>{escape(base_url)}/{name}</loc></sitemap>\n")
+    index.append("</sitemapindex>\n")
+    files["sitemap.xml"] = "".join(index)
+    return files
+
+
+def build_search_index(pages: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Build a compact index with sorted terms for prefix lookups"""
+    paths = sorted(pages)
+    postings: Dict[str, List[int]] = {}
+    for number, path in enumerate(paths):
+        for term in pages[path].get("terms", []):
+            postings.setdefault(term, []).append(number)
+    terms = sorted(postings)
+    return {
+        "pages": [[public_url(pages[p]["output"]), pages[p].get("title", "")] for p in paths],
+        "terms": terms,
+        "postings": [postings[t] for t in terms],
+    }
+
+
+def search_prefix(index: Dict[str, Any], prefix: str) -> List[List[str]]:
+    """Return [url, title] pairs for pages containing a term with this prefix"""
+    terms = index["terms"]
+    prefix = prefix.lower()
+    matches: Set[int] = set()
+    position = bisect.bisect_left(terms, prefix)
+    while position < len(terms) and terms[position].startswith(prefix):
+        matches.update(index["postings"][position])
+        position += 1
+    return [index["pages"][n] for n in sorted(matches)]
+
+
+def dump_search_index(index: Dict[str, Any]) -> str:
+    """Serialize the search index without whitespace"""
+    return json.dumps(index, separators=(",", ":"))
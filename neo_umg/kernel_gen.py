@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Kernel Generator Engine
+Shared by the CSV-driven kernel generators: renders files in parallel,
+creates directories in one batch, writes only what changed and records
+what it produced in a generation manifest
+"""
+
+import os
+import json
+import hashlib
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+
+# What to do with a file that already exists
+EXISTING_MODES = ("update", "skip")
+
+INIT_FILE = "__init__.mojo"
+INIT_CONTENT = "# Package initialization\n"
+
+GEN_MANIFEST_NAME = ".gen-manifest.json"
+GEN_MANIFEST_VERSION = 1
+
+
+def content_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def kernel_path(name: str) -> Path:
+    """block_names.csv layout: domain.sub.action[.variant] -> domain/sub/action[_variant].mojo"""
+    parts = name.split(".")
+    action = parts[2] if len(parts) > 2 else "default"
+    if len(parts) > 3:
+        return Path(parts[0], parts[1], f"{action}_{parts[3]}.mojo")
+    return Path(parts[0], parts[1], f"{action}.mojo")
+
+
+def load_gen_manifest(output_dir: Path) -> Dict[str, Any]:
+    """Load the generation manifest of an output tree, or an empty one"""
+    try:
+        with open(output_dir / GEN_MANIFEST_NAME, 'r') as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        manifest = {}
+    if manifest.get("version") != GEN_MANIFEST_VERSION:
+        manifest = {"version": GEN_MANIFEST_VERSION, "generators": {}}
+    return manifest
+
+
+def save_gen_manifest(output_dir: Path, manifest: Dict[str, Any]):
+    """Write the generation manifest atomically"""
+    path = output_dir / GEN_MANIFEST_NAME
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    tmp_path.replace(path)
+
+
+def print_check(report: Dict[str, List[str]]) -> int:
+    """Print a check report; returns the exit status (1 if the tree is out of sync)"""
+    problems = 0
+    for kind, names in report.items():
+        if names:
+            problems += len(names)
+            print(f"{kind}: {len(names)}")
+            for name in names[:20]:
+                print(f"  {name}")
+            if len(names) > 20:
+                print(f"  ... {len(names) - 20} more")
+    print("Generated tree matches the manifest" if not problems else f"{problems} problems")
+    return 1 if problems else 0
+
+
+def print_prune(result: Dict[str, List[str]]):
+    for name in result["kept"]:
+        print(f"Kept (edited since generation or shared): {name}")
+    print(f"Pruned {len(result['removed'])} orphaned files, kept {len(result['kept'])}")
+
+
+class KernelGenerator:
+    """Render rows to files under output_dir, writing only new or changed content"""
+
+    def __init__(self, output_dir: Path, generator: str, template_version: int = 1,
+                 existing: str = "update", init_files: bool = False,
+                 limit: Optional[int] = None, max_workers: Optional[int] = None,
+                 claim: bool = True):
+        if existing not in EXISTING_MODES:
+            raise ValueError(f"existing must be one of {EXISTING_MODES}")
+        self.output_dir = output_dir
+        self.generator = generator
+        self.template_version = template_version
+        self.existing = existing
+        self.init_files = init_files
+        # Cap on new files created, taken in row order
+        self.limit = limit
+        # False for generators whose rows come from files another generator
+        # owns; their entries never stop that generator from pruning
+        self.claim = claim
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        self.files: List[Dict[str, Any]] = []
+        self.stats = {"files": 0, "written": 0, "unchanged": 0, "skipped": 0,
+                      "duplicates": 0, "dirs_created": 0}
+
+    def plan(self, rows: Iterable[Any], render: Callable[[Any], Optional[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Render every row into the list of files this generator owns
+
+        render returns {"name", "path" (relative), "content"} and optionally
+        "existing" to override the generator's mode, or None to skip the row.
+        """
+        rows = list(rows)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            rendered = [f for f in pool.map(render, rows) if f is not None]
+
+        # The first row to claim a path wins, as with the old exists() checks
+        self.files = []
+        seen = set()
+        for f in rendered:
+            if f["path"] in seen:
+                self.stats["duplicates"] += 1
+                continue
+            seen.add(f["path"])
+            self.files.append(f)
+        if self.init_files:
+            for directory in sorted({Path(f["path"]).parent for f in self.files}):
+                init_path = directory / INIT_FILE
+                if directory != Path(".") and init_path not in seen:
+                    self.files.append({"name": init_path.as_posix(), "path": init_path,
+                                       "content": INIT_CONTENT, "existing": "skip"})
+        self.stats["files"] = len(self.files)
+        return self.files
+
+    def run(self, rows: Iterable[Any], render: Callable[[Any], Optional[Dict[str, Any]]]) -> Dict[str, int]:
+        """Render every row, sync the results into output_dir and record them"""
+        self.plan(rows, render)
+        if self.limit is not None:
+            budget = self.limit
+            for f in self.files:
+                if not (self.output_dir / f["path"]).exists():
+                    f["over_limit"] = budget <= 0
+                    budget -= 1
+
+        self.make_dirs({(self.output_dir / f["path"]).parent for f in self.files if not f.get("over_limit")})
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for f, outcome in zip(self.files, pool.map(self.sync_file, self.files)):
+                f["outcome"] = outcome
+                self.stats[outcome] += 1
+        self.record()
+        return self.stats
+
+    def make_dirs(self, directories: Iterable[Path]):
+        """Create every missing directory once, parents first"""
+        for directory in sorted(directories, key=lambda d: len(d.parts)):
+            if not directory.is_dir():
+                directory.mkdir(parents=True, exist_ok=True)
+                self.stats["dirs_created"] += 1
+
+    def sync_file(self, f: Dict[str, Any]) -> str:
+        """Write one rendered file unless it is already current; returns the outcome"""
+        data = f["content"].encode("utf-8")
+        f["hash"] = content_digest(data)
+        target = self.output_dir / f["path"]
+        try:
+            stat = target.stat()
+        except FileNotFoundError:
+            stat = None
+
+        if stat is not None:
+            # Size differs -> changed; otherwise compare digests before rewriting
+            if stat.st_size == len(data) and content_digest(target.read_bytes()) == f["hash"]:
+                return "unchanged"
+            if f.get("existing", self.existing) == "skip":
+                return "skipped"
+
+        if f.get("over_limit"):
+            return "skipped"
+
+        tmp = target.with_name(f"{target.name}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        tmp.replace(target)
+        return "written"
+
+    def written(self) -> List[Dict[str, Any]]:
+        return [f for f in self.files if f.get("outcome") == "written"]
+
+    def record(self):
+        """Store name -> path, template version, hash and stat in the manifest"""
+        manifest = load_gen_manifest(self.output_dir)
+        entries = {}
+        for f in self.files:
+            try:
+                stat = (self.output_dir / f["path"]).stat()
+            except FileNotFoundError:
+                continue
+            entry = {"path": Path(f["path"]).as_posix(), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                     "live": self.claim}
+            if f["outcome"] == "skipped":
+                # Kept as found (hand-edited or an older template): not our current output
+                entry.update(template=None, hash=None)
+            else:
+                entry.update(template=self.template_version, hash=f["hash"])
+            entries[f["name"]] = entry
+        # Entries whose rows are gone stay recorded until pruned, no longer live
+        for name, entry in manifest["generators"].get(self.generator, {}).items():
+            entries.setdefault(name, dict(entry, live=False))
+        manifest["generators"][self.generator] = entries
+        save_gen_manifest(self.output_dir, manifest)
+
+    def check(self) -> Dict[str, List[str]]:
+        """Compare planned files with the manifest and the tree using stat only"""
+        recorded = load_gen_manifest(self.output_dir)["generators"].get(self.generator, {})
+        planned = {f["name"] for f in self.files}
+        report = {"missing": [], "modified": [], "outdated": [], "unrecorded": [], "orphaned": []}
+        for name in sorted(planned):
+            entry = recorded.get(name)
+            if entry is None:
+                report["unrecorded"].append(name)
+                continue
+            try:
+                stat = (self.output_dir / entry["path"]).stat()
+            except FileNotFoundError:
+                report["missing"].append(name)
+                continue
+            if (stat.st_size, stat.st_mtime_ns) != (entry["size"], entry["mtime_ns"]):
+                report["modified"].append(name)
+            elif entry["template"] is not None and entry["template"] != self.template_version:
+                report["outdated"].append(name)
+        report["orphaned"] = sorted(set(recorded) - planned)
+        return report
+
+    def prune(self) -> Dict[str, List[str]]:
+        """Delete recorded files whose rows are gone
+
+        Only files this generator wrote or verified (those with a recorded
+        hash) are deleted. Files kept as found in skip mode, files edited
+        since any generator last wrote them and paths another generator
+        still has a live row for stay.
+        """
+        manifest = load_gen_manifest(self.output_dir)
+        recorded = manifest["generators"].get(self.generator, {})
+        planned = {f["name"] for f in self.files}
+        others = [
+            entry
+            for generator, entries in manifest["generators"].items() if generator != self.generator
+            for entry in entries.values() if entry.get("hash") is not None
+        ]
+        # Entries from before "live" was recorded count as live
+        claimed = {entry["path"] for entry in others if entry.get("live", True)}
+        generated = {(entry["path"], entry["size"], entry["mtime_ns"]) for entry in others}
+        result = {"removed": [], "kept": []}
+        for name in sorted(set(recorded) - planned):
+            entry = recorded[name]
+            path = self.output_dir / entry["path"]
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                del recorded[name]
+                continue
+            # Rewritten by another generator since we wrote it still counts as generated
+            current = (stat.st_size, stat.st_mtime_ns)
+            edited = current != (entry["size"], entry["mtime_ns"]) and (entry["path"],) + current not in generated
+            if entry.get("hash") is None or entry["path"] in claimed or edited:
+                result["kept"].append(name)
+                continue
+            path.unlink()
+            del recorded[name]
+            result["removed"].append(name)
+            # Drop directories the removal left empty
+            directory = path.parent
+            while directory != self.output_dir and not any(directory.iterdir()):
+                directory.rmdir()
+                directory = directory.parent
+        manifest["generators"][self.generator] = recorded
+        save_gen_manifest(self.output_dir, manifest)
+        return result
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Kernel Tree Scanner
+Walks a kernel tree once with os.scandir and keeps a persistent stat cache,
+so tools can list kernels and see what changed since the last scan
+"""
+
+import os
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+
+from .kernel_gen import content_digest
+
+SCAN_CACHE_NAME = ".kernel-scan.json"
+SCAN_CACHE_VERSION = 1
+
+# Kernel sources and their block JSON sidecars
+KERNEL_SUFFIXES = (".mojo", ".json")
+
+
+def hash_file(path: str) -> str:
+    with open(path, 'rb') as f:
+        return content_digest(f.read())
+
+
+class KernelScanner:
+    """Stat-cached view of the .mojo and .json files under root
+
+    Files whose size and mtime match the cache keep their recorded hash;
+    only new or touched files are hashed, in parallel. The cache lives at
+    root/.kernel-scan.json unless cache_path is given; persist=False scans
+    without reading or writing it.
+    """
+
+    def __init__(self, root: Path, persist: bool = True, cache_path: Optional[Path] = None,
+                 max_workers: Optional[int] = None):
+        self.root = Path(root)
+        self.cache_path = (cache_path or self.root / SCAN_CACHE_NAME) if persist else None
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        self.files: Dict[str, Dict[str, Any]] = {}
+
+    def walk(self) -> Dict[str, os.stat_result]:
+        """Relative posix path -> stat for every kernel file; dotfiles are skipped"""
+        found = {}
+        stack = [(str(self.root), "")]
+        while stack:
+            directory, prefix = stack.pop()
+            try:
+                entries = list(os.scandir(directory))
+            except FileNotFoundError:
+                continue
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append((entry.path, prefix + entry.name + "/"))
+                elif entry.name.endswith(KERNEL_SUFFIXES):
+                    found[prefix + entry.name] = entry.stat()
+        return found
+
+    def load_cache(self) -> Dict[str, Dict[str, Any]]:
+        if self.cache_path is None:
+            return {}
+        try:
+            with open(self.cache_path, 'r') as f:
+                cache = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        return cache.get("files", {}) if cache.get("version") == SCAN_CACHE_VERSION else {}
+
+    def save_cache(self):
+        tmp_path = self.cache_path.with_name(f"{self.cache_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump({"version": SCAN_CACHE_VERSION, "files": self.files}, f)
+        tmp_path.replace(self.cache_path)
+
+    def scan(self, hash_files: bool = True) -> Dict[str, Any]:
+        """One pass over the tree: returns added, modified and removed paths since the last scan
+
+        With hash_files=False nothing is read: files whose stat changed count
+        as modified and their hashes are left empty.
+        """
+        previous = self.load_cache()
+        current = self.walk()
+        self.files = {}
+        stale = []
+        for rel, stat in current.items():
+            entry = previous.get(rel)
+            if entry and (entry["size"], entry["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+                self.files[rel] = entry
+            else:
+                self.files[rel] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": None}
+                stale.append(rel)
+
+        if hash_files and stale:
+            paths = [os.path.join(self.root, rel) for rel in stale]
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                for rel, digest in zip(stale, pool.map(hash_file, paths)):
+                    self.files[rel]["hash"] = digest
+
+        result = {"added": [], "modified": [], "removed": sorted(set(previous) - set(current)), "unchanged": 0}
+        for rel in sorted(stale):
+            old = previous.get(rel)
+            if old is None:
+                result["added"].append(rel)
+            elif not hash_files or old.get("hash") != self.files[rel]["hash"]:
+                result["modified"].append(rel)
+            else:
+                # Touched but identical: the refreshed stat is cached
+                result["unchanged"] += 1
+        result["unchanged"] += len(current) - len(stale)
+
+        if self.cache_path is not None and hash_files and (stale or result["removed"]):
+            self.save_cache()
+        return result
+
+    def paths(self, suffix: str = ".mojo", under: str = "") -> List[Path]:
+        """Files of the last scan with suffix, optionally under a relative directory"""
+        prefix = under.rstrip("/") + "/" if under else ""
+        return [self.root / rel for rel in sorted(self.files)
+                if rel.endswith(suffix) and rel.startswith(prefix)]
+
+    def changed(self) -> List[str]:
+        """Scan and return every added or modified path"""
+        result = self.scan()
+        return result["added"] + result["modified"]
+
+
+def main():
+    """Report what changed in a kernel tree since the last scan"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Scan a kernel tree and report changes since the last scan")
+    parser.add_argument("root", type=Path, nargs="?", default=Path("neocore") / "src" / "kernels")
+    args = parser.parse_args()
+
+    result = KernelScanner(args.root).scan()
+    for kind in ("added", "modified", "removed"):
+        for rel in result[kind]:
+            print(f"{kind}: {rel}")
+    print(f"{len(result['added'])} added, {len(result['modified'])} modified, "
+          f"{len(result['removed'])} removed, {result['unchanged']} unchanged")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
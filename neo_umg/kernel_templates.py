@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Kernel Template Registry
+Selects kernel templates by exact name segment and renders them from
+templates dedented and parsed once, so generation stays linear in rows
+"""
+
+import json
+import textwrap
+from pathlib import Path
+from string import Formatter
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def compile_template(source: str) -> List[Tuple[str, Optional[str]]]:
+    """Split a str.format template into (literal, field) chunks"""
+    chunks = []
+    for literal, field, spec, conversion in Formatter().parse(source):
+        if spec or conversion:
+            raise ValueError(f"Kernel templates take plain {{field}} placeholders, got {{{field}!{conversion}:{spec}}}")
+        if field is not None and not field.isidentifier():
+            raise ValueError(f"Invalid template field: {{{field}}}")
+        chunks.append((literal, field))
+    return chunks
+
+
+class KernelTemplate:
+    """A template dedented, stripped and parsed at load time
+
+    Pass dedent=False for flush-left sources whose whitespace-only lines
+    must survive as written.
+    """
+
+    def __init__(self, source: str, name: str = "inline", dedent: bool = True):
+        self.name = name
+        self.source = (textwrap.dedent(source) if dedent else source).strip()
+        self.chunks = compile_template(self.source)
+        self.fields = {field for _, field in self.chunks if field is not None}
+
+    @classmethod
+    def from_file(cls, path: Path) -> "KernelTemplate":
+        return cls(path.read_text(encoding="utf-8"), name=path.name)
+
+    def render(self, context: Dict[str, Any]) -> str:
+        parts = []
+        for literal, field in self.chunks:
+            parts.append(literal)
+            if field is not None:
+                parts.append(str(context[field]))
+        return "".join(parts)
+
+
+class TemplateRegistry:
+    """Maps exact name segments to templates; earlier rules win over later ones"""
+
+    def __init__(self, default: KernelTemplate):
+        self.default = default
+        self.rules: Dict[str, Tuple[int, KernelTemplate]] = {}
+
+    def register(self, segment: str, template: KernelTemplate):
+        if segment in self.rules:
+            raise ValueError(f"Template rule for segment '{segment}' already registered")
+        self.rules[segment] = (len(self.rules), template)
+
+    @classmethod
+    def from_config(cls, config_path: Path) -> "TemplateRegistry":
+        """Load {"default": file, "rules": [{"segment", "template"}]}; files are relative to the config"""
+        with open(config_path, 'r') as f:
+            config = json.load(f)
+        base = config_path.parent
+        loaded: Dict[str, KernelTemplate] = {}
+
+        def load(file_name: str) -> KernelTemplate:
+            if file_name not in loaded:
+                loaded[file_name] = KernelTemplate.from_file(base / file_name)
+            return loaded[file_name]
+
+        registry = cls(load(config["default"]))
+        for rule in config.get("rules", []):
+            registry.register(rule["segment"], load(rule["template"]))
+        return registry
+
+    def match(self, name: str) -> KernelTemplate:
+        """Template of the highest-priority rule naming one of name's segments"""
+        best = None
+        for segment in name.split("."):
+            rule = self.rules.get(segment)
+            if rule is not None and (best is None or rule[0] < best[0]):
+                best = rule
+        return best[1] if best else self.default
+
+    def render(self, name: str, context: Dict[str, Any]) -> str:
+        return self.match(name).render(context)
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Build Manifest
+Per-page record of what a build produced, stored next to the output as a
+small JSON header plus one JSON Lines record per page
+"""
+
+import json
+import hashlib
+import threading
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+MANIFEST_NAME = ".neo-manifest.json"
+PAGES_NAME = ".neo-manifest.pages.jsonl"
+MANIFEST_VERSION = 2
+
+_DECODER = json.JSONDecoder()
+
+
+def content_hash(data: bytes) -> str:
+    """Return the hex digest used to identify output content"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def new_manifest(shard: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+    """Create an empty manifest, optionally tagged with its shard"""
+    return {"version": MANIFEST_VERSION, "shard": shard, "pages": {}}
+
+
+class PageEntries(Mapping):
+    """Read-only mapping of page path -> entry backed by a JSON Lines pages file
+
+    Only path -> byte offset is kept in memory, built on first use; entries
+    are parsed from the file when looked up. A path written twice resolves
+    to its last record.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.offsets: Optional[Dict[str, int]] = None
+        self._file = None
+        self._lock = threading.Lock()
+
+    def ensure_index(self) -> Dict[str, int]:
+        with self._lock:
+            if self.offsets is None:
+                self.offsets = {path: offset for path, offset, _ in self._scan(parse=False)}
+            return self.offsets
+
+    def _scan(self, parse: bool = True) -> Iterator[Tuple[str, int, Any]]:
+        """(path, byte offset, entry or None) for every record in file order"""
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return
+        with f:
+            offset = 0
+            for line in f:
+                if line.strip():
+                    # Records are ["<path>", {...}]; the path is decoded on its own
+                    text = line.decode("utf-8")
+                    if parse:
+                        path, entry = json.loads(text)
+                    else:
+                        path, entry = _DECODER.raw_decode(text, 1)[0], None
+                    yield path, offset, entry
+                offset += len(line)
+
+    def __getitem__(self, path: str) -> Dict[str, Any]:
+        offset = self.ensure_index()[path]
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, 'rb')
+            self._file.seek(offset)
+            line = self._file.readline()
+        return json.loads(line)[1]
+
+    def __contains__(self, path: object) -> bool:
+        return path in self.ensure_index()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.ensure_index())
+
+    def __len__(self) -> int:
+        return len(self.ensure_index())
+
+    def items(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Every (path, entry) in one sequential read of the file"""
+        offsets = self.ensure_index()
+        for path, offset, entry in self._scan():
+            if offsets.get(path) == offset:
+                yield path, entry
+
+    def values(self) -> Iterator[Dict[str, Any]]:
+        return (entry for _, entry in self.items())
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Pickled for locale worker processes, which reopen the file themselves
+        return {"path": self.path, "offsets": self.offsets}
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__init__(state["path"])
+        self.offsets = state["offsets"]
+
+
+class PageWriter:
+    """Append page entries to a build directory's pages file as they are produced"""
+
+    def __init__(self, build_dir: Path):
+        build_dir.mkdir(parents=True, exist_ok=True)
+        self.path = build_dir / PAGES_NAME
+        self.tmp_path = self.path.with_suffix(".tmp")
+        self._file = open(self.tmp_path, 'w', encoding="utf-8")
+
+    def add(self, path: str, entry: Dict[str, Any]):
+        self._file.write(json.dumps([path, entry], sort_keys=True, separators=(",", ":")) + "\n")
+
+    def commit(self) -> PageEntries:
+        """Replace the pages file with what was written and return a view of it"""
+        self._file.close()
+        self.tmp_path.replace(self.path)
+        return PageEntries(self.path)
+
+
+def load_manifest(build_dir: Path) -> Dict[str, Any]:
+    """Load the manifest header from a build directory, or an empty manifest
+
+    "pages" is a PageEntries view that reads entries on demand.
+    """
+    path = build_dir / MANIFEST_NAME
+    try:
+        with open(path, 'r') as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return new_manifest()
+    if manifest.get("version") != MANIFEST_VERSION:
+        return new_manifest()
+    manifest["pages"] = PageEntries(build_dir / PAGES_NAME)
+    return manifest
+
+
+def save_manifest(build_dir: Path, manifest: Dict[str, Any]):
+    """Write the manifest header, and its pages unless a PageWriter already wrote them"""
+    build_dir.mkdir(parents=True, exist_ok=True)
+    pages = manifest.get("pages", {})
+    if isinstance(pages, dict):
+        writer = PageWriter(build_dir)
+        for page_path in sorted(pages):
+            writer.add(page_path, pages[page_path])
+        writer.commit()
+    path = build_dir / MANIFEST_NAME
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump({key: value for key, value in manifest.items() if key != "pages"}, f,
+                  indent=2, sort_keys=True)
+    tmp_path.replace(path)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+HTML/CSS Minifier
+Conservative whitespace and comment removal for generated pages
+"""
+
+import re
+
+# Elements whose contents are whitespace-sensitive or not HTML
+PRESERVED_ELEMENTS = ("pre", "code", "textarea", "script")
+
+# Block-level elements; whitespace around their tags never renders
+BLOCK_ELEMENTS = (
+    "html", "head", "body", "meta", "title", "link", "style", "nav", "main",
+    "header", "footer", "section", "article", "aside", "div", "p", "ul", "ol",
+    "li", "table", "thead", "tbody", "tr", "td", "th", "h1", "h2", "h3", "h4",
+    "h5", "h6", "hr", "br", "form", "!doctype",
+)
+
+_PRESERVED_RE = re.compile(
+    r"(<(%s)\b.*?</\2\s*>)" % "|".join(PRESERVED_ELEMENTS),
+    re.IGNORECASE | re.DOTALL,
+)
+_STYLE_RE = re.compile(r"(<style\b[^>]*>)(.*?)(</style\s*>)", re.IGNORECASE | re.DOTALL)
+_COMMENT_RE = re.compile(r"<!--(?!\[if).*?-->", re.DOTALL)
+_WHITESPACE_RE = re.compile(r"\s+")
+_BLOCK_TAG_RE = re.compile(
+    r"\s*(</?(?:%s)\b[^>]*>)\s*" % "|".join(BLOCK_ELEMENTS),
+    re.IGNORECASE,
+)
+
+_CSS_STRING_RE = re.compile(r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')""")
+_CSS_COMMENT_RE = re.compile(r"/\*.*?\*/", re.DOTALL)
+_CSS_PUNCT_RE = re.compile(r"\s*([{}:;,>])\s*")
+
+
+def minify_css(css: str) -> str:
+    """Strip comments and redundant whitespace from a stylesheet"""
+    parts = _CSS_STRING_RE.split(_CSS_COMMENT_RE.sub("", css))
+    out = []
+    # Odd indices are quoted strings and are kept verbatim
+    for i, part in enumerate(parts):
+        if i % 2:
+            out.append(part)
+            continue
+        part = _WHITESPACE_RE.sub(" ", part)
+        part = _CSS_PUNCT_RE.sub(r"\1", part)
+        out.append(part.replace(";}", "}"))
+    return "".join(out).strip()
+
+
+def _minify_markup(html: str) -> str:
+    html = _COMMENT_RE.sub("", html)
+    html = _STYLE_RE.sub(lambda m: m.group(1) + minify_css(m.group(2)) + m.group(3), html)
+    html = _WHITESPACE_RE.sub(" ", html)
+    return _BLOCK_TAG_RE.sub(r"\1", html)
+
+
+def minify_html(html: str) -> str:
+    """Minify markup, leaving pre/code/textarea/script contents untouched"""
+    parts = _PRESERVED_RE.split(html)
+    out = []
+    # split() yields [text, element, tag_name, text, element, tag_name, ...]
+    for i in range(0, len(parts), 3):
+        out.append(_minify_markup(parts[i]))
+        if i + 1 < len(parts):
+            out.append(parts[i + 1])
+    return "".join(out).strip()
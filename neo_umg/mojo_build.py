@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Mojo Kernel Build Orchestrator
+Compiles only kernels whose source or local imports changed, in parallel,
+reusing binaries from a content-addressed artifact cache and sealing the
+binary hash into each kernel's block JSON
+"""
+
+import os
+import re
+import json
+import shutil
+import hashlib
+import threading
+import subprocess
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+
+from .kernel_gen import INIT_FILE, content_digest
+from .kernel_scan import KernelScanner
+
+# Bump when the cache key stops capturing something that changes the binary
+MOJO_CACHE_VERSION = 1
+
+DEFAULT_CACHE_DIR = Path(".neo_cache") / "mojo"
+DEFAULT_TARGET = "wasm"
+IMPORTS_CACHE_NAME = "imports.json"
+
+IMPORT_RE = re.compile(r'^\s*(?:from\s+(\.*[\w.]*)\s+import\b|import\s+([\w.]+(?:\s*,\s*[\w.]+)*))', re.MULTILINE)
+
+
+def module_file(directory: Path, dotted: str) -> Optional[Path]:
+    """Resolve a dotted module name against directory to a .mojo file or package"""
+    base = directory.joinpath(*dotted.split("."))
+    for candidate in (base.with_name(base.name + ".mojo"), base / INIT_FILE):
+        if candidate.is_file():
+            return candidate
+    return None
+
+
+def import_names(text: str) -> List[str]:
+    """Every module name a kernel source imports, relative ones with their dots"""
+    modules = []
+    for match in IMPORT_RE.finditer(text):
+        if match.group(1) is not None:
+            modules.append(match.group(1))
+        else:
+            modules += [name.strip() for name in match.group(2).split(",")]
+    return modules
+
+
+def resolve_imports(source: Path, modules: List[str], roots: List[Path]) -> List[Path]:
+    """Kernel files imported by source; standard library and packages are ignored"""
+    found = []
+    for module in modules:
+        if module.startswith("."):
+            # One dot is the kernel's own package, each further dot a parent
+            dots = len(module) - len(module.lstrip("."))
+            directory = source.parent
+            for _ in range(dots - 1):
+                directory = directory.parent
+            rest = module[dots:]
+            resolved = module_file(directory, rest) if rest else directory / INIT_FILE
+            if resolved is not None and resolved.is_file():
+                found.append(resolved)
+            continue
+        for root in roots:
+            resolved = module_file(root, module)
+            if resolved is not None:
+                found.append(resolved)
+                break
+    return found
+
+
+class MojoCompiler:
+    """Default compiler: `mojo build <source> -o <output>` with the kernel roots on the import path"""
+
+    def __init__(self, executable: str = "mojo", include_dirs: Optional[List[Path]] = None,
+                 extra_args: Optional[List[str]] = None):
+        self.executable = executable
+        self.include_dirs = include_dirs or []
+        self.extra_args = extra_args or []
+        self._identity = None
+
+    @property
+    def identity(self) -> str:
+        """Compiler version and flags, part of every cache key"""
+        if self._identity is None:
+            try:
+                version = subprocess.run([self.executable, "--version"], capture_output=True,
+                                         text=True, check=True).stdout.strip()
+            except (OSError, subprocess.CalledProcessError):
+                version = "unknown"
+            self._identity = " ".join([version] + self.extra_args)
+        return self._identity
+
+    def __call__(self, source: Path, output: Path):
+        command = [self.executable, "build", str(source), "-o", str(output)]
+        for directory in self.include_dirs:
+            command += ["-I", str(directory)]
+        result = subprocess.run(command + self.extra_args, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip() or f"{self.executable} exited with {result.returncode}")
+
+
+class MojoBuilder:
+    """Build every kernel under the given roots into output_dir
+
+    compiler is any callable (source, output) that writes the binary to output
+    and raises on failure; an optional `identity` attribute is folded into the
+    cache key so a compiler upgrade rebuilds everything.
+    """
+
+    def __init__(self, roots: List[Path], output_dir: Path, cache_dir: Path = DEFAULT_CACHE_DIR,
+                 compiler: Optional[Callable[[Path, Path], Any]] = None, jobs: Optional[int] = None,
+                 target: str = DEFAULT_TARGET, seal: bool = True):
+        self.roots = roots
+        self.output_dir = output_dir
+        self.cache_dir = cache_dir
+        self.compiler = compiler or MojoCompiler(include_dirs=roots)
+        self.jobs = jobs or os.cpu_count() or 1
+        self.target = target
+        self.seal = seal
+        self.digests: Dict[Path, str] = {}
+        self.imports: Dict[Path, List[Path]] = {}
+        # Hashes from the kernel scanners' stat caches and import names by content hash
+        self.known_digests: Dict[Path, str] = {}
+        self.import_cache: Dict[str, List[str]] = {}
+        self.import_cache_dirty = False
+        self.stats = {"kernels": 0, "cached": 0, "compiled": 0, "failed": 0, "sealed": 0, "read": 0}
+        self.failures: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def kernels(self) -> List[Dict[str, Any]]:
+        """Every compilable kernel with its path relative to its root"""
+        found = []
+        for root in self.roots:
+            # The scanner's stat cache means only new or touched kernels are read
+            scanner = KernelScanner(root)
+            scanner.scan()
+            for rel, entry in scanner.files.items():
+                if entry["hash"]:
+                    self.known_digests[root / rel] = entry["hash"]
+            for source in scanner.paths(".mojo"):
+                if source.name != INIT_FILE:
+                    found.append({"source": source, "rel": source.relative_to(root)})
+        return found
+
+    def load_import_cache(self):
+        try:
+            with open(self.cache_dir / IMPORTS_CACHE_NAME, 'r') as f:
+                cache = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        if cache.get("version") == MOJO_CACHE_VERSION:
+            self.import_cache = cache.get("imports", {})
+
+    def save_import_cache(self):
+        if not self.import_cache_dirty:
+            return
+        path = self.cache_dir / IMPORTS_CACHE_NAME
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump({"version": MOJO_CACHE_VERSION, "imports": self.import_cache}, f)
+        tmp_path.replace(path)
+        self.import_cache_dirty = False
+
+    def scan(self, source: Path):
+        """Hash source and record its local imports, once per file
+
+        Sources the kernel scanner already hashed are only read when their
+        import names are not cached under that hash yet.
+        """
+        if source in self.digests:
+            return
+        digest = self.known_digests.get(source)
+        modules = self.import_cache.get(digest) if digest else None
+        if modules is None:
+            data = source.read_bytes()
+            digest = content_digest(data)
+            modules = import_names(data.decode("utf-8", errors="replace"))
+            self.import_cache[digest] = modules
+            self.import_cache_dirty = True
+            self.stats["read"] += 1
+        self.digests[source] = digest
+        # Resolution is redone every run: adding or removing a module can change it
+        self.imports[source] = resolve_imports(source, modules, self.roots)
+        for imported in self.imports[source]:
+            self.scan(imported)
+
+    def closure(self, source: Path) -> List[Path]:
+        """source and every kernel file it imports, directly or transitively"""
+        seen = {source}
+        stack = [source]
+        while stack:
+            for imported in self.imports[stack.pop()]:
+                if imported not in seen:
+                    seen.add(imported)
+                    stack.append(imported)
+        return sorted(seen)
+
+    def cache_key(self, source: Path) -> str:
+        self.scan(source)
+        hasher = hashlib.sha256()
+        identity = str(getattr(self.compiler, "identity", ""))
+        hasher.update(f"{MOJO_CACHE_VERSION}\0{identity}\0{self.target}\0".encode("utf-8"))
+        for path in self.closure(source):
+            # The importing kernel itself is keyed by content alone so moves stay cached
+            name = "" if path == source else path.resolve().as_posix()
+            hasher.update(f"{name}\0{self.digests[path]}\n".encode("utf-8"))
+        return hasher.hexdigest()
+
+    def artifact_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key[2:]}.{self.target}"
+
+    def build(self) -> Dict[str, int]:
+        """Compile cache misses in parallel, install every binary and seal the blocks"""
+        kernels = self.kernels()
+        self.load_import_cache()
+        for kernel in kernels:
+            kernel["key"] = self.cache_key(kernel["source"])
+        self.save_import_cache()
+        self.stats["kernels"] = len(kernels)
+
+        # Kernels with identical source and imports share one compile
+        pending: Dict[str, Path] = {}
+        for kernel in kernels:
+            if not self.artifact_path(kernel["key"]).exists():
+                pending.setdefault(kernel["key"], kernel["source"])
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            list(pool.map(lambda item: self.compile(*item), pending.items()))
+
+        for kernel in kernels:
+            artifact = self.artifact_path(kernel["key"])
+            if not artifact.exists():
+                self.stats["failed"] += 1
+                continue
+            if kernel["key"] in pending:
+                self.stats["compiled"] += 1
+            else:
+                self.stats["cached"] += 1
+            self.install(kernel, artifact)
+        return self.stats
+
+    def compile(self, key: str, source: Path):
+        """Compile one kernel into the cache; the entry only appears once complete"""
+        artifact = self.artifact_path(key)
+        artifact.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = artifact.with_name(f"{artifact.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+        try:
+            self.compiler(source, tmp_path)
+            tmp_path.replace(artifact)
+        except Exception as e:
+            with self._lock:
+                self.failures[str(source)] = str(e)
+            try:
+                tmp_path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def install(self, kernel: Dict[str, Any], artifact: Path):
+        """Copy the binary into output_dir if it differs and seal its block"""
+        data = artifact.read_bytes()
+        binary_hash = content_digest(data)
+        target = self.output_dir / kernel["rel"].with_suffix(f".{self.target}")
+        try:
+            current = target.read_bytes()
+        except FileNotFoundError:
+            current = None
+        if current != data:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(artifact, target)
+        if self.seal and self.seal_block(kernel["source"].with_suffix(".json"), binary_hash, kernel["key"]):
+            self.stats["sealed"] += 1
+
+    def seal_block(self, block_path: Path, binary_hash: str, cache_key: str) -> bool:
+        """Record the binary hash and cache key in the kernel's block JSON; returns True if it changed"""
+        try:
+            with open(block_path, 'r') as f:
+                block = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return False
+        seal = {"binary_sha256": binary_hash, "cache_key": cache_key, "target": self.target}
+        if block.get("seal") == seal:
+            return False
+        block["seal"] = seal
+        tmp_path = block_path.with_name(f"{block_path.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(block, f, indent=2)
+            f.write("\n")
+        tmp_path.replace(block_path)
+        return True
+
+    def report(self):
+        for source, error in sorted(self.failures.items()):
+            print(f"Failed to compile {source}: {error}")
+        stats = self.stats
+        print(f"Kernels: {stats['kernels']}  compiled: {stats['compiled']}  cached: {stats['cached']}  "
+              f"failed: {stats['failed']}  sealed: {stats['sealed']}  sources read: {stats['read']}")
+
+
+def main():
+    """Entry point for incremental kernel builds"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compile Mojo kernels incrementally")
+    parser.add_argument("--kernels-dir", type=Path, action="append",
+                        help="Kernel source root (repeatable, default: src/kernels)")
+    parser.add_argument("--out", type=Path, default=Path("dist") / "kernels",
+                        help="Where compiled kernels are installed")
+    parser.add_argument("--cache-dir", type=Path, default=DEFAULT_CACHE_DIR,
+                        help="Content-addressed artifact cache")
+    parser.add_argument("--jobs", "-j", type=int, default=None,
+                        help="Parallel compiles (default: CPU count)")
+    parser.add_argument("--target", default=DEFAULT_TARGET,
+                        help="Binary extension of compiled kernels")
+    parser.add_argument("--mojo", default="mojo", help="Mojo executable")
+    parser.add_argument("--no-seal", action="store_true",
+                        help="Do not write binary hashes back into block JSON")
+    args = parser.parse_args()
+
+    roots = args.kernels_dir or [Path("src") / "kernels"]
+    builder = MojoBuilder(roots, args.out, cache_dir=args.cache_dir,
+                          compiler=MojoCompiler(args.mojo, include_dirs=roots),
+                          jobs=args.jobs, target=args.target, seal=not args.no_seal)
+    builder.build()
+    builder.report()
+    return 1 if builder.stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    exit(main())
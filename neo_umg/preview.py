@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Preview Server
+Serves the build output from memory with precomputed ETags and
+compressed variants; rebuilds swap in only the entries that changed
+"""
+
+import os
+import gzip
+import hashlib
+import mimetypes
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlparse
+
+from .compress import COMPRESSIBLE_SUFFIXES, DEFAULT_MIN_SIZE
+
+# Content-Encoding token -> precompressed sibling suffix, in preference order
+ENCODINGS = (("br", ".br"), ("zstd", ".zst"), ("gzip", ".gz"))
+SIBLING_SUFFIXES = {suffix for _, suffix in ENCODINGS}
+
+
+def url_candidates(url_path: str):
+    """Yield build-relative files a request path may be served from"""
+    path = unquote(url_path).lstrip("/")
+    if path == "" or path.endswith("/"):
+        yield path + "index.html"
+        return
+    yield path
+    yield path + ".html"
+    yield path + "/index.html"
+
+
+def _accepted(header: str) -> set:
+    accepted = set()
+    for item in header.split(","):
+        token, _, params = item.strip().partition(";")
+        if token and params.replace(" ", "") != "q=0":
+            accepted.add(token.lower())
+    return accepted
+
+
+class PreviewStore:
+    """In-memory map of build-relative path -> response entry"""
+
+    def __init__(self, build_dir: Path, min_size: int = DEFAULT_MIN_SIZE):
+        self.build_dir = build_dir
+        self.min_size = min_size
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def scan(self) -> Dict[str, os.stat_result]:
+        """Stat every servable file (dotfiles and compressed siblings excluded)"""
+        found = {}
+        stack = [self.build_dir]
+        while stack:
+            try:
+                entries = list(os.scandir(stack.pop()))
+            except FileNotFoundError:
+                continue
+            for entry in entries:
+                if entry.name.startswith(".") or entry.name.endswith(".tmp"):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(Path(entry.path))
+                elif os.path.splitext(entry.name)[1] not in SIBLING_SUFFIXES:
+                    rel = Path(entry.path).relative_to(self.build_dir).as_posix()
+                    found[rel] = entry.stat()
+        return found
+
+    def load_entry(self, rel: str, stat: os.stat_result) -> Dict[str, Any]:
+        """Read one file with its ETag and compressed variants"""
+        path = self.build_dir / rel
+        body = path.read_bytes()
+        etag = '"' + hashlib.sha256(body).hexdigest()[:20] + '"'
+        variants = {}
+        for encoding, suffix in ENCODINGS:
+            sibling = path.with_name(path.name + suffix)
+            try:
+                if sibling.stat().st_mtime_ns == stat.st_mtime_ns:
+                    variants[encoding] = sibling.read_bytes()
+            except FileNotFoundError:
+                pass
+        if not variants and path.suffix in COMPRESSIBLE_SUFFIXES and len(body) >= self.min_size:
+            variants["gzip"] = gzip.compress(body, compresslevel=6, mtime=0)
+        content_type = mimetypes.guess_type(rel)[0] or "application/octet-stream"
+        if content_type.startswith("text/") or content_type in ("application/json", "application/xml"):
+            content_type += "; charset=utf-8"
+        return {
+            "body": body,
+            "etag": etag,
+            "type": content_type,
+            "variants": variants,
+            "stat": (stat.st_size, stat.st_mtime_ns),
+        }
+
+    def refresh(self) -> Dict[str, int]:
+        """Reload files whose size or mtime changed and swap them in"""
+        stats = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+        with self._lock:
+            current = self.entries
+            entries = {}
+            for rel, stat in self.scan().items():
+                previous = current.get(rel)
+                if previous and previous["stat"] == (stat.st_size, stat.st_mtime_ns):
+                    entries[rel] = previous
+                    stats["unchanged"] += 1
+                    continue
+                try:
+                    entries[rel] = self.load_entry(rel, stat)
+                except FileNotFoundError:
+                    continue
+                stats["updated" if previous else "added"] += 1
+            stats["removed"] = len(set(current) - set(entries))
+            # One reference swap; in-flight requests keep the map they looked up
+            self.entries = entries
+        return stats
+
+    def lookup(self, url_path: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        entries = self.entries
+        for rel in url_candidates(url_path):
+            if rel in entries:
+                return rel, entries[rel]
+        return None
+
+
+class PreviewHandler(BaseHTTPRequestHandler):
+    """Serves entries from a PreviewStore"""
+
+    def __init__(self, *args, store: PreviewStore, **kwargs):
+        self.store = store
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        self.send_entry(head_only=False)
+
+    def do_HEAD(self):
+        self.send_entry(head_only=True)
+
+    def send_entry(self, head_only: bool):
+        found = self.store.lookup(urlparse(self.path).path)
+        if found is None:
+            self.send_error(404, "Not Found")
+            return
+        _, entry = found
+
+        body = entry["body"]
+        etag = entry["etag"]
+        encoding = None
+        accepted = _accepted(self.headers.get("Accept-Encoding", ""))
+        for candidate, _ in ENCODINGS:
+            if candidate in entry["variants"] and candidate in accepted:
+                encoding = candidate
+                body = entry["variants"][candidate]
+                # Each encoded representation needs its own validator
+                etag = f'{etag[:-1]}-{candidate}"'
+                break
+
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", entry["type"])
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        if entry["variants"]:
+            self.send_header("Vary", "Accept-Encoding")
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self.end_headers()
+        if not head_only:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def snapshot_sources(paths) -> Dict[str, Tuple[int, int]]:
+    """Return (size, mtime_ns) for every file under the given files or directories"""
+    snapshot = {}
+    stack = [Path(p) for p in paths]
+    while stack:
+        path = stack.pop()
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        if path.is_dir():
+            stack.extend(Path(entry.path) for entry in os.scandir(path))
+        else:
+            snapshot[str(path)] = (stat.st_size, stat.st_mtime_ns)
+    return snapshot
+
+
+def create_server(store: PreviewStore, host: str = "localhost", port: int = 8000) -> ThreadingHTTPServer:
+    """Create a threaded server for the store; call serve_forever() to run it"""
+    handler = lambda *args, **kwargs: PreviewHandler(*args, store=store, **kwargs)
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
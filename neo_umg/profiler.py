@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Build Profiler
+Records wall time per build stage and bytes written, and exports a JSON
+report plus a Chrome trace-event file (chrome://tracing, Perfetto)
+"""
+
+import os
+import json
+import time
+import threading
+from pathlib import Path
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, List
+
+
+class NullProfiler:
+    """Profiler stand-in that records nothing"""
+
+    def stage(self, name: str, **args):
+        return nullcontext()
+
+    def add_bytes(self, count: int):
+        pass
+
+    def for_worker(self) -> "NullProfiler":
+        return self
+
+    def merge(self, other: "NullProfiler"):
+        pass
+
+
+class BuildProfiler:
+    """Collects timed stage events during a build"""
+
+    def __init__(self):
+        self.events: List[Dict[str, Any]] = []
+        self.bytes_written = 0
+        self._origin = time.perf_counter_ns()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str, **args):
+        """Time the enclosed block as one stage event"""
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            end = time.perf_counter_ns()
+            event = {
+                "name": name,
+                "start_ns": start - self._origin,
+                "duration_ns": end - start,
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+                "args": args,
+            }
+            with self._lock:
+                self.events.append(event)
+
+    def add_bytes(self, count: int):
+        """Account for bytes written to the build output"""
+        with self._lock:
+            self.bytes_written += count
+
+    def for_worker(self) -> "BuildProfiler":
+        """Empty profiler for a worker process, on this profiler's timeline"""
+        worker = BuildProfiler()
+        worker._origin = self._origin
+        return worker
+
+    def merge(self, other: "BuildProfiler"):
+        """Add the events and bytes a worker profiler recorded"""
+        with self._lock:
+            self.events += other.events
+            self.bytes_written += other.bytes_written
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = dict(self.__dict__)
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def report(self, top_n: int = 10) -> Dict[str, Any]:
+        """Summarise totals per stage and the slowest pages"""
+        stages: Dict[str, Dict[str, float]] = {}
+        for event in self.events:
+            totals = stages.setdefault(event["name"], {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            ms = event["duration_ns"] / 1e6
+            totals["count"] += 1
+            totals["total_ms"] += ms
+            totals["max_ms"] = max(totals["max_ms"], ms)
+
+        page_times: Dict[str, float] = {}
+        for event in self.events:
+            page = event["args"].get("page")
+            if page is not None and event["name"] in ("render_page", "write"):
+                page_times[page] = page_times.get(page, 0.0) + event["duration_ns"] / 1e6
+
+        slowest = sorted(page_times.items(), key=lambda item: item[1], reverse=True)[:top_n]
+        wall_ns = max((e["start_ns"] + e["duration_ns"] for e in self.events), default=0)
+        return {
+            "wall_ms": wall_ns / 1e6,
+            "bytes_written": self.bytes_written,
+            "stages": stages,
+            "slowest_pages": [{"page": page, "ms": ms} for page, ms in slowest],
+        }
+
+    def trace_events(self) -> Dict[str, Any]:
+        """Return the events in Chrome trace-event format"""
+        return {
+            "traceEvents": [
+                {
+                    "name": event["name"],
+                    "cat": "build",
+                    "ph": "X",
+                    "ts": event["start_ns"] / 1e3,
+                    "dur": event["duration_ns"] / 1e3,
+                    "pid": event["pid"],
+                    "tid": event["tid"],
+                    "args": event["args"],
+                }
+                for event in self.events
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+    def write(self, output_dir: Path, top_n: int = 10) -> Dict[str, Path]:
+        """Write the JSON report and trace file into output_dir"""
+        output_dir.mkdir(parents=True, exist_ok=True)
+        paths = {
+            "report": output_dir / "build_profile.json",
+            "trace": output_dir / "build_trace.json",
+        }
+        with open(paths["report"], 'w') as f:
+            json.dump(self.report(top_n), f, indent=2)
+        with open(paths["trace"], 'w') as f:
+            json.dump(self.trace_events(), f)
+        return paths
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Render Cache
+Content-addressed store of rendered pages shared across builds, branches
+and CI runs, bounded in size with least-recently-used eviction
+"""
+
+import os
+import hashlib
+import threading
+from pathlib import Path
+from typing import Optional
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Bump when rendering changes in a way the inputs in the key do not capture
+RENDER_CACHE_VERSION = 1
+
+
+def render_key(*parts: str) -> str:
+    """Hash the inputs that determine a page's rendered output"""
+    hasher = hashlib.sha256()
+    for part in (str(RENDER_CACHE_VERSION),) + parts:
+        data = part.encode("utf-8")
+        hasher.update(len(data).to_bytes(8, "little"))
+        hasher.update(data)
+    return hasher.hexdigest()
+
+
+class RenderCache:
+    """On-disk rendered-page store; entry mtimes record last use for LRU eviction"""
+
+    def __init__(self, cache_dir: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0, "stored": 0, "evicted": 0}
+
+    def path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / key[2:]
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return cached output for key, marking it recently used"""
+        path = self.path(key)
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+        except FileNotFoundError:
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        return data
+
+    def put(self, key: str, data: bytes):
+        """Store output for key atomically"""
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        tmp_path.replace(path)
+        self.stats["stored"] += 1
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+    def evict(self) -> int:
+        """Delete least recently used entries until the cache fits max_bytes"""
+        if not self.cache_dir.exists():
+            return 0
+        entries = []
+        total = 0
+        for bucket in os.scandir(self.cache_dir):
+            if not bucket.is_dir():
+                continue
+            for entry in os.scandir(bucket.path):
+                if entry.name.endswith(".tmp"):
+                    continue
+                stat = entry.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                total += stat.st_size
+
+        entries.sort()
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        self.stats["evicted"] += removed
+        return removed
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Sharded Builds
+Deterministic page partitioning and merging of per-shard build outputs
+"""
+
+import os
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+from .asset_sync import AssetSync, file_digest
+from .manifest import MANIFEST_NAME, PAGES_NAME, load_manifest, new_manifest, save_manifest
+
+
+class ShardCollisionError(Exception):
+    """Raised when two shards produce different content for the same path"""
+
+    def __init__(self, collisions: List[str]):
+        self.collisions = collisions
+        super().__init__(f"{len(collisions)} path collision(s) between shards: " + "; ".join(collisions[:5]))
+
+
+def shard_for(page_path: str, shard_count: int) -> int:
+    """Map a page path to a shard, stable across processes and machines"""
+    return zlib.crc32(page_path.encode("utf-8")) % shard_count
+
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """Parse an 'INDEX/COUNT' shard spec such as '2/8'"""
+    try:
+        index, count = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard spec '{spec}', expected INDEX/COUNT")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Shard index {index} out of range for {count} shards")
+    return index, count
+
+
+def _walk_files(root: Path) -> Iterable[Path]:
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            yield Path(dirpath, filename)
+
+
+def merge_shards(shard_dirs: List[Path], output_dir: Path, link_mode: str = "auto") -> Dict[str, Any]:
+    """Combine shard outputs and manifests into one build directory"""
+    collisions = []
+    merged = new_manifest()
+    page_owner: Dict[str, int] = {}
+    output_owner: Dict[str, str] = {}
+
+    for index, shard_dir in enumerate(shard_dirs):
+        manifest = load_manifest(shard_dir)
+        for path, entry in manifest["pages"].items():
+            if path in page_owner:
+                collisions.append(f"page {path} built by shards {page_owner[path]} and {index}")
+                continue
+            output = entry.get("output")
+            if output in output_owner:
+                collisions.append(f"pages {output_owner[output]} and {path} both write {output}")
+                continue
+            page_owner[path] = index
+            output_owner[output] = path
+            merged["pages"][path] = entry
+
+    # Files may legitimately repeat (shared assets) as long as content matches
+    file_owner: Dict[str, Tuple[int, Path]] = {}
+    for index, shard_dir in enumerate(shard_dirs):
+        for path in _walk_files(shard_dir):
+            relative = path.relative_to(shard_dir).as_posix()
+            if relative in (MANIFEST_NAME, PAGES_NAME):
+                continue
+            if relative not in file_owner:
+                file_owner[relative] = (index, path)
+                continue
+            other_index, other_path = file_owner[relative]
+            if (other_path.stat().st_size != path.stat().st_size
+                    or file_digest(other_path) != file_digest(path)):
+                collisions.append(f"{relative} differs between shards {other_index} and {index}")
+
+    if collisions:
+        raise ShardCollisionError(collisions)
+
+    stats = {"shards": len(shard_dirs), "pages": len(merged["pages"]), "files": 0, "skipped": 0}
+    for shard_dir in shard_dirs:
+        shard_stats = AssetSync(shard_dir, output_dir, link_mode=link_mode).sync()
+        stats["files"] += shard_stats["files"]
+        stats["skipped"] += shard_stats["skipped"]
+
+    save_manifest(output_dir, merged)
+    return stats
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Block Template Store
+Lazy, indexed access to block JSON templates: a persistent index maps each
+block_id to a file and byte range, and templates are parsed on demand
+"""
+
+import os
+import re
+import json
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+TEMPLATE_INDEX_VERSION = 1
+DEFAULT_MAX_TEMPLATES = 512
+
+WHITESPACE_RE = re.compile(r'\s*')
+
+_MISSING = object()
+
+
+def object_offsets(text: str) -> List[Tuple[str, int, int]]:
+    """(key, start, end) character offsets of every value in a top-level JSON object"""
+    decoder = json.JSONDecoder()
+    index = WHITESPACE_RE.match(text, 0).end()
+    if text[index:index + 1] != "{":
+        raise ValueError("Template bundle is not a JSON object")
+    index = WHITESPACE_RE.match(text, index + 1).end()
+    entries = []
+    if text[index:index + 1] == "}":
+        return entries
+    while True:
+        key, index = decoder.raw_decode(text, index)
+        index = WHITESPACE_RE.match(text, index).end()
+        if text[index:index + 1] != ":":
+            raise ValueError(f"Expected ':' at {index}")
+        start = WHITESPACE_RE.match(text, index + 1).end()
+        _, index = decoder.raw_decode(text, start)
+        entries.append((key, start, index))
+        index = WHITESPACE_RE.match(text, index).end()
+        delimiter = text[index:index + 1]
+        if delimiter == "}":
+            return entries
+        if delimiter != ",":
+            raise ValueError(f"Expected ',' or '}}' at {index}")
+        index = WHITESPACE_RE.match(text, index + 1).end()
+
+
+def byte_offsets(text: str, entries: List[Tuple[str, int, int]]) -> Dict[str, List[int]]:
+    """Convert character offsets to [byte offset, byte length] in the UTF-8 file"""
+    ascii_only = text.isascii()
+    result = {}
+    char_pos = byte_pos = 0
+    for key, start, end in entries:
+        if ascii_only:
+            result[key] = [start, end - start]
+            continue
+        byte_pos += len(text[char_pos:start].encode("utf-8"))
+        length = len(text[start:end].encode("utf-8"))
+        result[key] = [byte_pos, length]
+        char_pos, byte_pos = end, byte_pos + length
+    return result
+
+
+class TemplateStore:
+    """Read-only mapping of block_id -> template backed by bundle and per-block JSON files
+
+    Nothing is read at construction. The first lookup stats the sources and
+    re-indexes only files whose size or mtime changed since the saved index.
+    Later sources override earlier ones, as with dict.update.
+    """
+
+    def __init__(self, bundles: List[Path], block_dirs: List[Path], index_path: Path,
+                 max_templates: int = DEFAULT_MAX_TEMPLATES):
+        self.bundles = bundles
+        self.block_dirs = block_dirs
+        self.index_path = index_path
+        self.max_templates = max_templates
+        self.locations: Optional[Dict[str, Tuple[Path, int, int]]] = None
+        self.cache: "OrderedDict[str, Any]" = OrderedDict()
+        self.stats = {"indexed_files": 0, "reused_files": 0, "hits": 0, "loads": 0, "evicted": 0}
+        self._lock = threading.Lock()
+
+    def sources(self) -> List[Tuple[Path, bool]]:
+        """(path, is_bundle) in override order: per-block files first, then bundles"""
+        found = []
+        for directory in self.block_dirs:
+            if directory.is_dir():
+                entries = sorted(e.path for e in os.scandir(directory)
+                                 if e.name.endswith(".json") and e.is_file())
+                found += [(Path(path), False) for path in entries]
+        found += [(path, True) for path in self.bundles if path.is_file()]
+        return found
+
+    def load_index(self) -> Dict[str, Any]:
+        try:
+            with open(self.index_path, 'r') as f:
+                index = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        return index.get("files", {}) if index.get("version") == TEMPLATE_INDEX_VERSION else {}
+
+    def save_index(self, files: Dict[str, Any]):
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_name(self.index_path.name + ".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump({"version": TEMPLATE_INDEX_VERSION, "files": files}, f)
+        tmp_path.replace(self.index_path)
+
+    def index_file(self, path: Path, is_bundle: bool, size: int) -> Dict[str, List[int]]:
+        """Map the block_ids defined by one source file to byte ranges"""
+        if not is_bundle:
+            with open(path, 'r') as f:
+                block = json.load(f)
+            block_id = block.get("block_id", "") if isinstance(block, dict) else ""
+            return {block_id: [0, size]}
+        text = path.read_text(encoding="utf-8")
+        try:
+            return byte_offsets(text, object_offsets(text))
+        except ValueError as e:
+            print(f"Skipping template bundle {path}: {e}")
+            return {}
+
+    def ensure_index(self) -> Dict[str, Tuple[Path, int, int]]:
+        """Build block_id -> (file, offset, length), reusing index entries of unchanged files"""
+        with self._lock:
+            if self.locations is not None:
+                return self.locations
+            saved = self.load_index()
+            files = {}
+            locations = {}
+            for path, is_bundle in self.sources():
+                stat = path.stat()
+                key = str(path)
+                entry = saved.get(key)
+                if entry and (entry["size"], entry["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+                    self.stats["reused_files"] += 1
+                else:
+                    entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                             "entries": self.index_file(path, is_bundle, stat.st_size)}
+                    self.stats["indexed_files"] += 1
+                files[key] = entry
+                for block_id, (offset, length) in entry["entries"].items():
+                    locations[block_id] = (path, offset, length)
+            if files != saved:
+                self.save_index(files)
+            self.locations = locations
+            return locations
+
+    def get(self, block_id: str, default: Any = None) -> Any:
+        """Parse a template on first use and keep the most recently used ones"""
+        with self._lock:
+            if block_id in self.cache:
+                self.cache.move_to_end(block_id)
+                self.stats["hits"] += 1
+                return self.cache[block_id]
+        location = self.ensure_index().get(block_id)
+        if location is None:
+            return default
+        path, offset, length = location
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            template = json.loads(f.read(length))
+        with self._lock:
+            self.stats["loads"] += 1
+            self.cache[block_id] = template
+            while len(self.cache) > self.max_templates:
+                self.cache.popitem(last=False)
+                self.stats["evicted"] += 1
+        return template
+
+    def __getitem__(self, block_id: str) -> Any:
+        template = self.get(block_id, _MISSING)
+        if template is _MISSING:
+            raise KeyError(block_id)
+        return template
+
+    def __contains__(self, block_id: str) -> bool:
+        return block_id in self.ensure_index()
+
+    def __len__(self) -> int:
+        return len(self.ensure_index())
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self.ensure_index()))
+
+    def keys(self) -> List[str]:
+        return list(self.ensure_index())
@@ -1,64 +1,68 @@
 import csv
 import pathlib
-import textwrap
 import argparse
+import sys
 
 parser = argparse.ArgumentParser()
 parser.add_argument("--max", type=int, default=None, help="limit number of kernels")
+parser.add_argument("--check", action="store_true",
+                    help="verify the tree against the generation manifest (stat only) and exit")
+parser.add_argument("--prune", action="store_true",
+                    help="remove generated files whose CSV rows are gone")
 args = parser.parse_args()
 
 ROOT = pathlib.Path(__file__).resolve().parents[1]
 SRC = ROOT / "src" / "kernels"
 CSV = ROOT.parent / "docs" / "block_names.csv"
 
+sys.path.insert(0, str(ROOT.parent))
+from neo_umg.kernel_gen import KernelGenerator, print_check, print_prune
+from neo_umg.kernel_templates import KernelTemplate
+
+# Bump when the stub template changes so --check reports older stubs
+TEMPLATE_VERSION = 1
+
+STUB = KernelTemplate('''
+    @compiler.register("{name}")
+    struct {struct_name}:
+        @staticmethod
+        fn execute() -> Void:
+            # TODO: implement
+            return
+    ''', name="neocore_gen_kernels")
+
+def render(row):
+    parts = row["name"].split(".")
+    if len(parts) < 3:
+        print(f"Skipping invalid name: {row['name']}")
+        return None
+        
+    domain = parts[0]
+    sub = parts[1]
+    action = parts[2]
+    
+    # Generate struct name by capitalizing and removing underscores
+    struct_name = ''.join(word.capitalize() for word in action.split('_'))
+    
+    stub = STUB.render({"name": row["name"], "struct_name": struct_name})
+    
+    return {"name": row["name"], "path": pathlib.Path(domain, sub, f"{action}.mojo"), "content": stub + "\n"}
+
 def generate_kernels():
-    count = 0
-    generated = 0
     with open(CSV, 'r') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            if args.max and generated >= args.max:
-                break
-                
-            parts = row["name"].split(".")
-            if len(parts) < 3:
-                print(f"Skipping invalid name: {row['name']}")
-                continue
-                
-            domain = parts[0]
-            sub = parts[1]
-            action = parts[2]
-            
-            # Create directory structure
-            out_dir = SRC / domain / sub
-            out_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Generate filename
-            out_file = out_dir / f"{action}.mojo"
-            
-            # Skip if already exists
-            if out_file.exists():
-                continue
-            
-            # Generate struct name by capitalizing and removing underscores
-            struct_name = ''.join(word.capitalize() for word in action.split('_'))
-            
-            # Generate Mojo stub
-            stub = textwrap.dedent(f'''
-            @compiler.register("{row['name']}")
-            struct {struct_name}:
-                @staticmethod
-                fn execute() -> Void:
-                    # TODO: implement
-                    return
-            ''').strip()
-            
-            # Write file
-            out_file.write_text(stub + "\n")
-            count += 1
-            generated += 1
-            
-    print(f"Generated {count} new kernel files (total processed: {generated})")
+        rows = list(csv.DictReader(f))
+    
+    # Existing files are skipped; --max caps how many new files are created
+    generator = KernelGenerator(SRC, "neocore_gen_kernels", TEMPLATE_VERSION, existing="skip", limit=args.max)
+    if args.check:
+        generator.plan(rows, render)
+        return print_check(generator.check())
+    stats = generator.run(rows, render)
+    
+    print(f"Generated {stats['written']} new kernel files (total processed: {stats['files']})")
+    if args.prune:
+        print_prune(generator.prune())
+    return 0
 
 if __name__ == "__main__":
-    generate_kernels()
\ No newline at end of file
+    exit(generate_kernels())
@@ -1,14 +1,20 @@
 import os
+import sys
 import pathlib
 import pytest
 
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2]))
+from neo_umg.kernel_scan import KernelScanner
+
 def test_all_mojo_stubs_generated():
     """Test that all Mojo stub files have been generated."""
     root = pathlib.Path(__file__).parent.parent
     kernels_dir = root / "src" / "kernels"
     
-    # Count .mojo files
-    mojo_files = list(kernels_dir.rglob("*.mojo"))
+    # Count .mojo files (stat only; the test leaves no scan cache behind)
+    scanner = KernelScanner(kernels_dir, persist=False)
+    scanner.scan(hash_files=False)
+    mojo_files = scanner.paths(".mojo")
     
     # Should have at least 1500 files
     assert len(mojo_files) >= 1500, f"Expected at least 1500 Mojo files, found {len(mojo_files)}"
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Static Site Build Benchmarks
+Generates synthetic sites and records cold, warm and incremental build
+time, peak RSS and bytes written for neo_umg.build_site as JSON
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import platform
+import subprocess
+from pathlib import Path
+from typing import Any, Dict, List
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+DEFAULT_SIZES = [100, 10000, 100000]
+COMPLEXITIES = ["simple", "rich"]
+PHASES = ["cold", "warm", "incremental"]
+
+# Pages per section directory, so no directory holds 100k files
+SECTION_SIZE = 1000
+
+# Share of pages edited before the incremental build
+INCREMENTAL_FRACTION = 0.01
+
+WORDS = ("mojo kernel block stack render page build asset cache shard locale fragment "
+         "template neocore static site fast module pipeline index search graph").split()
+
+
+def paragraph(rng: random.Random, words: int) -> str:
+    text = " ".join(rng.choice(WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + "."
+
+
+def page_markdown(rng: random.Random, number: int, complexity: str) -> str:
+    """Markdown for one synthetic page"""
+    lines = [f"# Page {number}", "", paragraph(rng, 40)]
+    if complexity == "rich":
+        for section in range(6):
+            lines += ["", f"## Section {section}", "", paragraph(rng, 120),
+                      "", f"Some **bold {rng.choice(WORDS)}** text and a [link](/section-0/page-{rng.randrange(50)}.html)."]
+        lines += ["", '{% include "callout.md" %}', "", "<pre><code>fn main():", "    print(42)</code></pre>",
+                  "", f'<img src="/media/asset-{number % 50}.png" alt="figure">']
+    return "\n".join(lines) + "\n"
+
+
+def generate_site(root: Path, pages: int, complexity: str, assets: int, seed: int = 0) -> Path:
+    """Write a synthetic project with pages, fragments and public assets"""
+    rng = random.Random(seed)
+    if root.exists():
+        shutil.rmtree(root)
+    (root / "pages").mkdir(parents=True)
+    (root / "fragments").mkdir()
+    (root / "public" / "media").mkdir(parents=True)
+    (root / "fragments" / "callout.md").write_text('> Note: {% include "note.md" %}\n')
+    (root / "fragments" / "note.md").write_text(paragraph(rng, 20) + "\n")
+
+    with open(root / "pages.jsonl", 'w') as index:
+        for number in range(pages):
+            section = f"section-{number // SECTION_SIZE}"
+            source = f"{section}/page-{number}.md"
+            if number % SECTION_SIZE == 0:
+                (root / "pages" / section).mkdir()
+            (root / "pages" / source).write_text(page_markdown(rng, number, complexity))
+            index.write(json.dumps({"path": f"/{section}/page-{number}", "file": source,
+                                    "title": f"Page {number}"}) + "\n")
+
+    for number in range(assets):
+        size = rng.randrange(4096, 65536)
+        (root / "public" / "media" / f"asset-{number}.png").write_bytes(rng.randbytes(size))
+
+    (root / "site.json").write_text(json.dumps({"title": "Benchmark Site", "pages_file": "pages.jsonl"}))
+    return root
+
+
+def touch_pages(root: Path, fraction: float, seed: int = 1) -> int:
+    """Edit a fraction of the pages so an incremental build has work to do"""
+    rng = random.Random(seed)
+    sources = sorted((root / "pages").rglob("*.md"))
+    edited = rng.sample(sources, max(1, int(len(sources) * fraction)))
+    for source in edited:
+        with open(source, 'a') as f:
+            f.write("\nEdited for the incremental benchmark.\n")
+    return len(edited)
+
+
+def run_build(root: Path, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one build in a fresh interpreter and return its measurements"""
+    result = subprocess.run(
+        [sys.executable, __file__, "--worker", str(root), json.dumps(options)],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def worker(root: Path, options: Dict[str, Any]):
+    """Build root once and print seconds, peak RSS and bytes written"""
+    sys.path.insert(0, str(PROJECT_ROOT))
+    from neo_umg.build_site import StaticSiteBuilder
+    from neo_umg.profiler import BuildProfiler
+
+    profiler = BuildProfiler()
+    builder = StaticSiteBuilder(root, profiler=profiler, quiet=True, **options)
+    start = time.perf_counter()
+    builder.build()
+    seconds = time.perf_counter() - start
+
+    # ru_maxrss is KiB on Linux and bytes on macOS; unavailable on Windows
+    peak_mb = None
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak_mb = round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+    print(json.dumps({
+        "seconds": round(seconds, 4),
+        "peak_rss_mb": peak_mb,
+        "bytes_written": profiler.bytes_written,
+        "pages_built": builder.size_stats["pages"],
+    }))
+
+
+def benchmark_corpus(root: Path, pages: int, complexity: str, assets: int,
+                     options: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Generate one corpus and measure every build phase on it"""
+    generate_site(root, pages, complexity, assets)
+    corpus = {"pages": pages, "complexity": complexity, "assets": assets}
+    results = []
+    for phase in PHASES:
+        if phase == "incremental":
+            edited = touch_pages(root, INCREMENTAL_FRACTION)
+        phase_options = dict(options, incremental=phase != "cold")
+        measured = run_build(root, phase_options)
+        if phase == "incremental":
+            measured["pages_edited"] = edited
+        results.append(dict(corpus, phase=phase, **measured))
+        rss = measured["peak_rss_mb"]
+        rss = f"{rss:8.1f} MB" if rss is not None else "     n/a MB"
+        print(f"  {phase:<12} {measured['seconds']:9.3f} s  {rss}  "
+              f"{measured['bytes_written']:>12} bytes")
+    return results
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: Path, threshold: float) -> List[str]:
+    """Return descriptions of runs slower than the baseline by more than threshold"""
+    with open(baseline_path, 'r') as f:
+        baseline = json.load(f)
+
+    def key(run):
+        return (run["pages"], run["complexity"], run["assets"], run["phase"])
+
+    previous = {key(run): run for run in baseline["results"]}
+    regressions = []
+    for run in results:
+        old = previous.get(key(run))
+        if old and old["seconds"] > 0 and run["seconds"] > old["seconds"] * (1 + threshold):
+            regressions.append(f"{key(run)}: {old['seconds']:.3f} s -> {run['seconds']:.3f} s")
+    return regressions
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    """Entry point for the benchmark suite"""
+    import argparse
+
+    if len(sys.argv) == 4 and sys.argv[1] == "--worker":
+        worker(Path(sys.argv[2]), json.loads(sys.argv[3]))
+        return 0
+
+    parser = argparse.ArgumentParser(description="Benchmark neo_umg.build_site on synthetic sites")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="Comma-separated page counts to generate")
+    parser.add_argument("--complexity", default=",".join(COMPLEXITIES),
+                        help="Comma-separated markdown complexities (simple, rich)")
+    parser.add_argument("--assets", default="0,500",
+                        help="Comma-separated static asset counts; >0 makes asset-heavy variants")
+    parser.add_argument("--builder-options", default="{}",
+                        help='StaticSiteBuilder keyword arguments as JSON, e.g. \'{"minify": true}\'')
+    parser.add_argument("--workdir", type=Path, default=PROJECT_ROOT / ".neo_cache" / "bench",
+                        help="Where synthetic sites are generated")
+    parser.add_argument("--output", type=Path, default=Path("bench_results.json"),
+                        help="JSON file to write results to")
+    parser.add_argument("--baseline", type=Path, default=None,
+                        help="Earlier results file; exit non-zero if any run regressed")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Allowed slowdown against the baseline (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    options = json.loads(args.builder_options)
+    results = []
+    for pages in [int(size) for size in args.sizes.split(",")]:
+        for complexity in args.complexity.split(","):
+            for assets in [int(count) for count in args.assets.split(",")]:
+                print(f"{pages} pages, {complexity} markdown, {assets} assets")
+                root = args.workdir / f"{pages}-{complexity}-{assets}"
+                results += benchmark_corpus(root, pages, complexity, assets, options)
+
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "builder_options": options,
+        "results": results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults: {args.output}")
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Cantocore Parser Benchmark
+Parses every cantocore field in the block corpus uncached, cold-cached and
+warm-cached, and records the timings as JSON
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import platform
+from pathlib import Path
+from typing import Any, Dict, List
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+from neo_umg.cantocore import cache_info, clear_cache, compile_cantocore, parse_cached, parse
+
+DEFAULT_ROOTS = [PROJECT_ROOT / "blocks", PROJECT_ROOT / "neocore" / "src" / "kernels"]
+
+# Directive shapes used to pad the corpus to a realistic block count
+SYNTHETIC_DIRECTIVES = [
+    "::IF:TRIGGER.ACTIVE", "→ STACK.REWRITE", "::UNLESS:GUARDRAIL.BLOCK",
+    "INSTRUCTION:GA[EVENT]", "INSTRUCTION:MODAL_TRIGGER{on_click => open_modal()}",
+    "::WHEN:SESSION.EXPIRED", "→ AUTH.REFRESH(token)", "INSTRUCTION:CACHE[GET, 300]",
+]
+
+
+def find_cantocore(value: Any, found: List[Any]):
+    """Collect every cantocore field in a block or a bundle of blocks"""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key == "cantocore":
+                found.append(item)
+            else:
+                find_cantocore(item, found)
+    elif isinstance(value, list):
+        for item in value:
+            find_cantocore(item, found)
+
+
+def load_corpus(roots: List[Path]) -> List[Any]:
+    """cantocore fields of every block JSON under roots"""
+    fields: List[Any] = []
+    for root in roots:
+        for path in sorted(root.rglob("*.json")) if root.is_dir() else []:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    find_cantocore(json.load(f), fields)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue
+    return fields
+
+
+def synthetic_corpus(blocks: int, seed: int = 0) -> List[Any]:
+    rng = random.Random(seed)
+    fields = []
+    for number in range(blocks):
+        directives = rng.sample(SYNTHETIC_DIRECTIVES, rng.randint(1, 3))
+        # A share of blocks carry a unique directive, like per-block event names
+        if number % 10 == 0:
+            directives.append(f"INSTRUCTION:GA[EVENT_{number}]")
+        fields.append(directives if len(directives) > 1 else directives[0])
+    return fields
+
+
+def timed(function, repeat: int) -> float:
+    """Best of repeat runs, in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark(fields: List[Any], repeat: int) -> Dict[str, Any]:
+    sources = [item for field in fields for item in ([field] if isinstance(field, str) else field)
+               if isinstance(item, str)]
+
+    def uncached():
+        for source in sources:
+            try:
+                parse(source)
+            except ValueError:
+                pass
+
+    def cold():
+        clear_cache()
+        for field in fields:
+            compile_cantocore(field)
+
+    def warm():
+        for field in fields:
+            compile_cantocore(field)
+
+    result = {
+        "blocks": len(fields),
+        "directives": len(sources),
+        "unique_directives": len(set(sources)),
+        "uncached_seconds": round(timed(uncached, repeat), 6),
+        "cold_seconds": round(timed(cold, repeat), 6),
+        "warm_seconds": round(timed(warm, repeat), 6),
+    }
+    result["errors"] = sum(1 for source in set(sources) if parse_cached(source)[0][0] == "error")
+    info = cache_info()
+    result["cache_hits"], result["cache_misses"] = info.hits, info.misses
+    return result
+
+
+def main():
+    """Entry point for the cantocore benchmark"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark cantocore parsing over the block corpus")
+    parser.add_argument("--root", type=Path, action="append",
+                        help="Directory of block JSON to scan (repeatable, default: blocks and neocore kernels)")
+    parser.add_argument("--synthetic", type=int, default=100000,
+                        help="Synthetic blocks added to the corpus (0 for the real corpus only)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is kept)")
+    parser.add_argument("--output", type=Path, default=None, help="JSON file to write results to")
+    args = parser.parse_args()
+
+    fields = load_corpus(args.root or DEFAULT_ROOTS) + synthetic_corpus(args.synthetic)
+    result = benchmark(fields, args.repeat)
+    for key, value in result.items():
+        print(f"{key:<18} {value}")
+
+    if args.output:
+        report = {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "results": result,
+        }
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -1,10 +1,17 @@
 #!/usr/bin/env python
 """Generate Mojo kernel stubs from block CSV (idempotent)."""
-import csv, pathlib, textwrap, argparse
+import csv, pathlib, argparse, sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+from neo_umg.kernel_gen import KernelGenerator, kernel_path, print_check, print_prune
+from neo_umg.kernel_templates import KernelTemplate
 
 CSV = pathlib.Path("docs/block_names.csv")
 KERNELS = pathlib.Path("neocore/src/kernels")
 
+# Bump when TEMPLATE changes so --check reports stubs from older templates
+TEMPLATE_VERSION = 1
+
 TEMPLATE = '''
 from memory import memset_zero, memcpy
 from python import Python
@@ -25,50 +32,49 @@ struct {class_name}:
         return Variant(True)
 '''
 
+# Parsed once; render() only fills the placeholders
+STUB = KernelTemplate(TEMPLATE, name="gen_kernels", dedent=False)
+
+def render(row):
+    parts = row["name"].split(".")
+    domain, subdomain = parts[0], parts[1]
+    action = parts[2] if len(parts) > 2 else "default"
+    class_name = "".join(p.title() for p in parts)
+    code = STUB.render({
+        "full_name": row["name"],
+        "class_name": class_name,
+        "domain": domain,
+        "subdomain": subdomain,
+        "action": action,
+    })
+    return {"name": row["name"], "path": kernel_path(row["name"]), "content": code}
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--max", type=int, default=None, help="limit number of kernels")
+    parser.add_argument("--check", action="store_true",
+                        help="verify the tree against the generation manifest (stat only) and exit")
+    parser.add_argument("--prune", action="store_true",
+                        help="remove generated files whose CSV rows are gone")
     args = parser.parse_args()
+    if args.prune and args.max:
+        parser.error("--prune needs the full CSV; drop --max")
 
     rows = list(csv.DictReader(CSV.open()))
     if args.max:
         rows = rows[:args.max]
 
-    # Ensure output dir
-    KERNELS.mkdir(parents=True, exist_ok=True)
-
-    generated = 0
-    for row in rows:
-        parts = row["name"].split(".")
-        domain, subdomain = parts[0], parts[1]
-        action = parts[2] if len(parts) > 2 else "default"
-        variant = parts[3] if len(parts) > 3 else None
-
-        # Create path
-        if variant:
-            path = KERNELS / domain / subdomain / f"{action}_{variant}.mojo"
-        else:
-            path = KERNELS / domain / subdomain / f"{action}.mojo"
-
-        # Skip if exists (idempotent)
-        if path.exists():
-            continue
-
-        # Generate stub
-        path.parent.mkdir(parents=True, exist_ok=True)
-        class_name = "".join(p.title() for p in parts)
-        code = TEMPLATE.format(
-            full_name=row["name"],
-            class_name=class_name,
-            domain=domain,
-            subdomain=subdomain,
-            action=action
-        ).strip()
-        
-        path.write_text(code)
-        generated += 1
+    # Existing files are kept (idempotent): they may hold implementations
+    generator = KernelGenerator(KERNELS, "gen_kernels", TEMPLATE_VERSION, existing="skip")
+    if args.check:
+        generator.plan(rows, render)
+        return print_check(generator.check())
+    stats = generator.run(rows, render)
 
-    print(f"Generated {generated} new kernels (total: {len(rows)})")
+    print(f"Generated {stats['written']} new kernels (total: {len(rows)})")
+    if args.prune:
+        print_prune(generator.prune())
+    return 0
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    exit(main())
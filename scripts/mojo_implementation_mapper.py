@@ -1,7 +1,16 @@
+import csv
 import json
+import time
+import fnmatch
 import pathlib
 import re
-from typing import Dict, List, Optional
+import sys
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+from neo_umg.kernel_scan import KernelScanner
 
 # Common Mojo code patterns for different block types
 MOJO_PATTERNS = {
@@ -157,168 +166,282 @@ MOJO_PATTERNS = {
     }
 }
 
-class MojoImplementationMapper:
-    def __init__(self, umg_neocore_path: str):
-        self.root = pathlib.Path(umg_neocore_path)
-        self.kernels_dir = self.root / "neocore" / "src" / "kernels"
-        self.blocks_data = self._load_block_metadata()
-        
-    def _load_block_metadata(self) -> Dict:
-        """Load block metadata from WEBSITE BUILDER JSONs"""
-        metadata = {}
-        
-        # Try to load from the extracted analytics JSON as example
-        analytics_file = self.root.parent / "WEBSITE BUILDER" / "extracted_analytics" / "analytics__ga_event.json"
-        if analytics_file.exists():
-            with open(analytics_file, 'r') as f:
-                sample = json.load(f)
-                # Extract the structure pattern
-                metadata['structure'] = {
-                    'has_code_modules': True,
-                    'molt_type': sample.get('molt_type', 'Instruction'),
-                    'category': sample.get('category'),
-                    'display': sample.get('display', {})
-                }
-        
-        return metadata
-    
-    def map_implementation(self, block_name: str) -> Optional[str]:
-        """Map a block name to appropriate Mojo implementation"""
-        parts = block_name.split('.')
-        if len(parts) < 3:
-            return None
-            
-        domain, subdomain, action = parts[:3]
-        
-        # Try to find matching pattern
-        if subdomain in MOJO_PATTERNS and action in MOJO_PATTERNS[subdomain]:
-            return MOJO_PATTERNS[subdomain][action]
-        
-        # Try domain-level patterns
-        if domain in MOJO_PATTERNS and action in MOJO_PATTERNS[domain]:
-            return MOJO_PATTERNS[domain][action]
-            
-        # Generate default implementation based on action
-        return self._generate_default_implementation(domain, subdomain, action)
-    
-    def _generate_default_implementation(self, domain: str, subdomain: str, action: str) -> str:
-        """Generate a default implementation based on action keywords"""
-        
-        # Common action patterns
-        if action in ["get", "fetch", "read", "load"]:
-            return '''
+# Default implementations chosen by action keyword when no pattern matches
+ACTION_IMPLEMENTATIONS = [
+    (("get", "fetch", "read", "load"), '''
             # Retrieve data
             let key = self.get_key()
             if self.storage.exists(key):
                 return self.storage.get(key)
             return None
-            '''
-        
-        elif action in ["set", "save", "store", "write"]:
-            return '''
+            '''),
+    (("set", "save", "store", "write"), '''
             # Store data
             let key = self.get_key()
             let value = self.prepare_value()
             self.storage.set(key, value)
             return True
-            '''
-            
-        elif action in ["validate", "check", "verify"]:
-            return '''
+            '''),
+    (("validate", "check", "verify"), '''
             # Validation logic
             if not self.input:
                 return False
             return self.validator.is_valid(self.input)
-            '''
-            
-        elif action in ["create", "generate", "build"]:
-            return '''
+            '''),
+    (("create", "generate", "build"), '''
             # Creation logic
             let instance = self.factory.create()
             instance.initialize(self.config)
             return instance
-            '''
-            
-        elif action in ["delete", "remove", "clear"]:
-            return '''
+            '''),
+    (("delete", "remove", "clear"), '''
             # Deletion logic
             let key = self.get_key()
             if self.storage.exists(key):
                 self.storage.delete(key)
                 return True
             return False
-            '''
-            
-        elif action in ["update", "modify", "change"]:
-            return '''
+            '''),
+    (("update", "modify", "change"), '''
             # Update logic
             let current = self.get_current()
             let updated = self.apply_changes(current)
             self.save(updated)
             return updated
-            '''
-            
-        elif action in ["render", "display", "show"]:
-            return '''
+            '''),
+    (("render", "display", "show"), '''
             # Rendering logic
             let template = self.get_template()
             let data = self.prepare_data()
             return template.render(data)
-            '''
-            
-        else:
-            return '''
+            '''),
+]
+
+# Fallback for actions no pattern or keyword covers
+GENERIC_IMPLEMENTATION = '''
             # Generic implementation
             # TODO: Implement {action} logic
             return None
-            '''.format(action=action)
+            '''
+
+WILDCARD = "*"
+
+# Kernel stub markers, matched against raw file bytes
+TODO_MARKER = b"# TODO: implement"
+TODO_RE = re.compile(rb'# TODO: implement\s*return')
+REGISTER_RE = re.compile(rb'@compiler\.register\("(.+?)"\)')
+
+# (domain, subdomain, action) keys tried for a block, most specific first;
+# MOJO_PATTERNS keys match the subdomain before the domain
+LOOKUP_ORDER = [
+    (True, True, True),
+    (False, True, True),
+    (True, False, True),
+    (False, False, True),
+    (True, True, False),
+    (True, False, False),
+]
+
+
+class PatternIndex:
+    """Implementations keyed on (domain, subdomain, action) with "*" wildcards"""
+
+    def __init__(self):
+        self.entries: Dict[Tuple[str, str, str], str] = {}
+
+    def add(self, domain: str, subdomain: str, action: str, implementation: str):
+        # The first registration for a key wins, as in the old lookup chain
+        self.entries.setdefault((domain, subdomain, action), implementation)
+
+    def lookup(self, domain: str, subdomain: str, action: str) -> Optional[str]:
+        for keep_domain, keep_subdomain, keep_action in LOOKUP_ORDER:
+            key = (domain if keep_domain else WILDCARD,
+                   subdomain if keep_subdomain else WILDCARD,
+                   action if keep_action else WILDCARD)
+            implementation = self.entries.get(key)
+            if implementation is not None:
+                return implementation
+        return None
+
+
+def glob_match(parts: Tuple[str, ...], pattern_parts: List[str]) -> bool:
+    """Match path segments against glob segments; a "**" segment spans any number of directories"""
+    if not pattern_parts:
+        return not parts
+    head, rest = pattern_parts[0], pattern_parts[1:]
+    if head == "**":
+        return any(glob_match(parts[i:], rest) for i in range(len(parts) + 1))
+    return bool(parts) and fnmatch.fnmatch(parts[0], head) and glob_match(parts[1:], rest)
+
+
+def build_pattern_index() -> PatternIndex:
+    """Index MOJO_PATTERNS and the action keyword table once"""
+    index = PatternIndex()
+    for key, actions in MOJO_PATTERNS.items():
+        for action, implementation in actions.items():
+            index.add(WILDCARD, key, action, implementation)
+            index.add(key, WILDCARD, action, implementation)
+    for actions, implementation in ACTION_IMPLEMENTATIONS:
+        for action in actions:
+            index.add(WILDCARD, WILDCARD, action, implementation)
+    return index
+
+
+class MojoImplementationMapper:
+    def __init__(self, umg_neocore_path: str):
+        self.root = pathlib.Path(umg_neocore_path)
+        self.kernels_dir = self.root / "neocore" / "src" / "kernels"
+        self.blocks_data = self._load_block_metadata()
+        self.index = build_pattern_index()
+        self._memo: Dict[str, Optional[str]] = {}
+        # Names that fell through to GENERIC_IMPLEMENTATION
+        self.unmatched: Set[str] = set()
+        
+    def _load_block_metadata(self) -> Dict:
+        """Load block metadata from WEBSITE BUILDER JSONs"""
+        metadata = {}
+        
+        # Try to load from the extracted analytics JSON as example
+        analytics_file = self.root.parent / "WEBSITE BUILDER" / "extracted_analytics" / "analytics__ga_event.json"
+        if analytics_file.exists():
+            with open(analytics_file, 'r') as f:
+                sample = json.load(f)
+                # Extract the structure pattern
+                metadata['structure'] = {
+                    'has_code_modules': True,
+                    'molt_type': sample.get('molt_type', 'Instruction'),
+                    'category': sample.get('category'),
+                    'display': sample.get('display', {})
+                }
+        
+        return metadata
+    
+    def map_implementation(self, block_name: str) -> Optional[str]:
+        """Map a block name to appropriate Mojo implementation"""
+        if block_name in self._memo:
+            return self._memo[block_name]
+        
+        parts = block_name.split('.')
+        if len(parts) < 3:
+            implementation = None
+        else:
+            domain, subdomain, action = parts[:3]
+            implementation = self.index.lookup(domain, subdomain, action)
+            if implementation is None:
+                self.unmatched.add(block_name)
+                implementation = GENERIC_IMPLEMENTATION.format(action=action)
+        
+        self._memo[block_name] = implementation
+        return implementation
+    
+    def map_many(self, names: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Map every name; names without a pattern or keyword match land in self.unmatched"""
+        return {name: self.map_implementation(name) for name in names}
     
     def update_kernel_file(self, mojo_file_path: pathlib.Path, preserve_umg_metadata: bool = True):
         """Update a kernel file with appropriate Mojo implementation"""
+        return self._update_kernel(mojo_file_path, write=True) == "updated"
+    
+    def _update_kernel(self, mojo_file_path: pathlib.Path, write: bool) -> str:
+        """Fill one kernel's TODO stub; returns skipped, unmatched, unchanged or updated"""
+        with open(mojo_file_path, 'rb') as f:
+            content = f.read()
         
-        # Read current file
-        content = mojo_file_path.read_text()
+        # Most kernels are already implemented: one substring test rules them out
+        if TODO_MARKER not in content:
+            return "skipped"
         
         # Extract block name from decorator
-        match = re.search(r'@compiler\.register\("(.+?)"\)', content)
+        match = REGISTER_RE.search(content)
         if not match:
-            return False
-            
-        block_name = match.group(1)
+            return "unmatched"
         
         # Get implementation
-        implementation = self.map_implementation(block_name)
+        implementation = self.map_implementation(match.group(1).decode('utf-8'))
         if not implementation:
-            return False
+            return "unmatched"
         
         # Replace TODO with implementation
-        new_content = re.sub(
-            r'# TODO: implement\s*return',
-            implementation.strip() + '\n        return',
-            content
-        )
+        replacement = (implementation.strip() + '\n        return').encode('utf-8')
+        new_content = TODO_RE.sub(lambda _: replacement, content)
+        if new_content == content:
+            return "unchanged"
         
-        # Write back
-        mojo_file_path.write_text(new_content)
-        return True
+        if write:
+            tmp_path = mojo_file_path.with_name(f"{mojo_file_path.name}.{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(new_content)
+            tmp_path.replace(mojo_file_path)
+        return "updated"
     
-    def batch_update_kernels(self, pattern: str = "**/**.mojo", dry_run: bool = True):
-        """Update multiple kernel files"""
-        updated = []
+    def kernel_files(self, pattern: str = "*.mojo") -> List[pathlib.Path]:
+        """Kernel files under kernels_dir that rglob(pattern) would find, from the shared stat-cached scan"""
+        scanner = KernelScanner(self.kernels_dir)
+        # Listing only: the files are read by the caller, so hashing them here is wasted I/O
+        scanner.scan(hash_files=False)
+        # Like rglob, the pattern may match at any depth
+        pattern_parts = ["**"] + pattern.strip("/").split("/")
+        return [path for path in scanner.paths(".mojo")
+                if glob_match(path.relative_to(self.kernels_dir).parts, pattern_parts)]
+    
+    def batch_update_kernels(self, pattern: str = "*.mojo", dry_run: bool = True,
+                             max_workers: Optional[int] = None) -> Dict[str, Any]:
+        """Fill the TODO stubs of every kernel matching pattern, a file name or relative path glob
+        
+        Files are read once in a thread pool; only kernels that still carry the
+        TODO marker are mapped, and changed files are replaced atomically.
+        """
+        files = self.kernel_files(pattern)
+        update = lambda path: self._update_kernel(path, write=not dry_run)
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            outcomes = list(pool.map(update, files))
         
-        for mojo_file in self.kernels_dir.rglob(pattern):
-            if dry_run:
-                print(f"Would update: {mojo_file.relative_to(self.root)}")
-            else:
-                if self.update_kernel_file(mojo_file):
-                    updated.append(mojo_file)
-                    print(f"Updated: {mojo_file.relative_to(self.root)}")
+        updated = [path for path, outcome in zip(files, outcomes) if outcome == "updated"]
+        for mojo_file in updated:
+            verb = "Would update" if dry_run else "Updated"
+            print(f"{verb}: {mojo_file.relative_to(self.root)}")
         
-        return updated
+        report = {
+            "scanned": len(files),
+            "matched": sum(1 for outcome in outcomes if outcome in ("updated", "unchanged")),
+            "updated": len(updated),
+            "files": updated,
+        }
+        print(f"Scanned {report['scanned']} kernels: {report['matched']} with a TODO stub and a mapping, "
+              f"{report['updated']} {'would be ' if dry_run else ''}updated")
+        return report
+
+def report_catalog(mapper: MojoImplementationMapper, csv_path: pathlib.Path):
+    """Map every block in the catalog and list the names no pattern covers"""
+    with open(csv_path, 'r') as f:
+        names = [row["name"] for row in csv.DictReader(f)]
+    start = time.perf_counter()
+    mapped = mapper.map_many(names)
+    elapsed = time.perf_counter() - start
+    invalid = sorted(name for name, implementation in mapped.items() if implementation is None)
+    print(f"Mapped {len(names)} blocks in {elapsed * 1000:.1f} ms: "
+          f"{len(names) - len(mapper.unmatched) - len(invalid)} matched, "
+          f"{len(mapper.unmatched)} generic, {len(invalid)} invalid names")
+    for name in sorted(mapper.unmatched):
+        print(f"  unmatched: {name}")
+    for name in invalid:
+        print(f"  invalid: {name}")
 
 def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Map UMG blocks to Mojo implementations")
+    parser.add_argument("--root", default="C:\\Users\\Magne\\OneDrive\\Desktop\\UMG_NEOCORE",
+                        help="UMG_NEOCORE checkout")
+    parser.add_argument("--catalog", type=pathlib.Path, default=None,
+                        help="map every block in a block_names.csv and report unmatched names")
+    args = parser.parse_args()
+    
     # Example usage
-    mapper = MojoImplementationMapper("C:\\Users\\Magne\\OneDrive\\Desktop\\UMG_NEOCORE")
+    mapper = MojoImplementationMapper(args.root)
+    
+    if args.catalog:
+        report_catalog(mapper, args.catalog)
+        return
     
     # Test mapping
     test_blocks = [
@@ -337,4 +460,4 @@ def main():
         print("-" * 50)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
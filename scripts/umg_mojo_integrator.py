@@ -1,9 +1,23 @@
+import os
 import json
 import pathlib
 import re
+import sys
+import time
+import difflib
 from typing import Dict, List, Optional, Any
+from concurrent.futures import ThreadPoolExecutor
 import textwrap
 
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+from neo_umg.cantocore import compile_cantocore, operation_hint
+from neo_umg.kernel_gen import KernelGenerator
+from neo_umg.kernel_scan import KernelScanner
+from neo_umg.template_store import TemplateStore
+
+# Bump when generate_mojo_kernel changes so the generation manifest marks older kernels
+INTEGRATOR_TEMPLATE_VERSION = 1
+
 class UMGMojoIntegrator:
     """Integrates Mojo implementations with UMG block JSON structure"""
     
@@ -12,23 +26,13 @@ class UMGMojoIntegrator:
         self.wb_root = pathlib.Path(website_builder_path)
         self.kernels_dir = self.umg_root / "neocore" / "src" / "kernels"
         
-        # Load UMG block templates from WEBSITE BUILDER
+        # UMG block templates from WEBSITE BUILDER, indexed and parsed on demand
         self.block_templates = self._load_block_templates()
         
-    def _load_block_templates(self) -> Dict[str, Any]:
-        """Load all block JSON templates from WEBSITE BUILDER"""
-        templates = {}
-        
-        # Load from extracted directories
-        extracted_dir = self.wb_root / "extracted_analytics"
-        if extracted_dir.exists():
-            for json_file in extracted_dir.glob("*.json"):
-                with open(json_file, 'r') as f:
-                    data = json.load(f)
-                    block_id = data.get('block_id', '')
-                    templates[block_id] = data
-                    
-        # Also try to load from the main JSON files
+    def _load_block_templates(self) -> TemplateStore:
+        """Open a lazy store over the WEBSITE BUILDER block JSON templates"""
+        # Per-block files from the extracted directory, then the bundles,
+        # which override them (the order the eager loader used)
         json_files = [
             "analytics_blocks_jsons.json",
             "auth_blocks_jsons.json",
@@ -44,14 +48,11 @@ class UMGMojoIntegrator:
             "testing_blocks_jsons.json"
         ]
         
-        for json_file in json_files:
-            file_path = self.wb_root / json_file
-            if file_path.exists():
-                with open(file_path, 'r') as f:
-                    data = json.load(f)
-                    templates.update(data)
-                    
-        return templates
+        return TemplateStore(
+            bundles=[self.wb_root / json_file for json_file in json_files],
+            block_dirs=[self.wb_root / "extracted_analytics"],
+            index_path=self.umg_root / ".neo_cache" / "block_templates.index.json",
+        )
     
     def generate_mojo_kernel(self, block_name: str, block_template: Dict) -> str:
         """Generate Mojo kernel code based on block template and type"""
@@ -115,12 +116,21 @@ struct {struct_name}:
         
         return kernel.strip()
     
-    def _parse_cantocore(self, cantocore: str) -> str:
+    def _parse_cantocore(self, cantocore) -> str:
         """Parse cantocore notation to extract operation type"""
-        # Example: "INSTRUCTION:GA[EVENT]" -> "EVENT"
-        match = re.search(r'\[(.+?)\]', cantocore)
-        if match:
-            return match.group(1)
+        # Example: "INSTRUCTION:GA[EVENT]" -> "EVENT"; parsed once per distinct string
+        for source in [cantocore] if isinstance(cantocore, str) else cantocore or []:
+            if not isinstance(source, str):
+                continue
+            statements = compile_cantocore(source)
+            if any(statement[0] == "error" for statement in statements):
+                # Not valid cantocore: keep the first bracketed text, as before the parser
+                match = re.search(r'\[(.+?)\]', source)
+                operation = match.group(1) if match else ""
+            else:
+                operation = operation_hint(statements)
+            if operation:
+                return operation
         return ""
     
     def _generate_implementation(self, domain: str, subdomain: str, action: str, 
@@ -273,20 +283,13 @@ struct {struct_name}:
         # TODO: Implement {action} for {domain}.{subdomain}
         return Variant(None)'''.format(action=action, domain=domain, subdomain=subdomain)
     
-    def update_kernel_with_umg_structure(self, block_name: str) -> bool:
-        """Update a kernel file with UMG structure and Mojo implementation"""
-        
-        # Find the kernel file
+    def render_update(self, block_name: str) -> Optional[Dict[str, str]]:
+        """Render the kernel source and .json sidecar for a block"""
         parts = block_name.split('.')
         if len(parts) < 3:
-            return False
+            return None
             
         domain, subdomain, action = parts[:3]
-        kernel_path = self.kernels_dir / domain / subdomain / f"{action}.mojo"
-        
-        if not kernel_path.exists():
-            print(f"Kernel file not found: {kernel_path}")
-            return False
         
         # Get template if available
         template = self.block_templates.get(block_name, {})
@@ -299,42 +302,143 @@ struct {struct_name}:
                 'description': f"Implements {action} for {subdomain}"
             }
         
-        # Generate new kernel
-        new_kernel = self.generate_mojo_kernel(block_name, template)
+        # Keep the binary seal written by neo_umg.mojo_build; it is replaced
+        # on the next build if the kernel changed
+        metadata_path = self.kernels_dir / domain / subdomain / f"{action}.json"
+        try:
+            with open(metadata_path, 'r') as f:
+                seal = json.load(f).get('seal')
+        except (FileNotFoundError, json.JSONDecodeError, AttributeError):
+            seal = None
+        if seal is not None:
+            template = dict(template, seal=seal)
+        
+        return {
+            "kernel": self.generate_mojo_kernel(block_name, template),
+            "metadata": json.dumps(template, indent=2) + "\n",
+        }
+    
+    def update_kernel_with_umg_structure(self, block_name: str) -> bool:
+        """Update a kernel file with UMG structure and Mojo implementation"""
         
-        # Write the updated kernel
-        kernel_path.write_text(new_kernel)
-        print(f"Updated: {kernel_path}")
+        # Find the kernel file
+        parts = block_name.split('.')
+        if len(parts) < 3:
+            return False
+            
+        domain, subdomain, action = parts[:3]
+        kernel_path = self.kernels_dir / domain / subdomain / f"{action}.mojo"
         
-        # Also save the UMG metadata
-        metadata_path = kernel_path.with_suffix('.json')
-        with open(metadata_path, 'w') as f:
-            json.dump(template, f, indent=2)
+        if not kernel_path.exists():
+            print(f"Kernel file not found: {kernel_path}")
+            return False
+        
+        rendered = self.render_update(block_name)
+        
+        # Write the kernel and its UMG metadata, skipping unchanged files
+        for path, content in ((kernel_path, rendered["kernel"]),
+                              (kernel_path.with_suffix('.json'), rendered["metadata"])):
+            if not path.exists() or path.read_text() != content:
+                path.write_text(content)
+        print(f"Updated: {kernel_path}")
             
         return True
     
-    def batch_update_domain(self, domain: str, dry_run: bool = True):
-        """Update all kernels in a domain"""
-        domain_dir = self.kernels_dir / domain
-        if not domain_dir.exists():
-            print(f"Domain directory not found: {domain_dir}")
-            return
-            
-        updated = 0
-        for kernel_file in domain_dir.rglob("*.mojo"):
-            # Extract block name from file path
-            relative_path = kernel_file.relative_to(self.kernels_dir)
-            parts = list(relative_path.parts)
-            parts[-1] = parts[-1].replace('.mojo', '')
-            block_name = '.'.join(parts)
-            
-            if dry_run:
-                print(f"Would update: {block_name}")
-            else:
-                if self.update_kernel_with_umg_structure(block_name):
-                    updated += 1
-                    
-        print(f"\nTotal updated: {updated}")
+    def kernel_block_names(self, domains: Optional[List[str]] = None) -> List[str]:
+        """Block names of the domain/subdomain/action.mojo kernels in the given domains (all if None)"""
+        if domains is None:
+            domains = sorted(entry.name for entry in os.scandir(self.kernels_dir) if entry.is_dir())
+        
+        # One walk of the whole tree serves every domain; listing needs no hashes
+        scanner = KernelScanner(self.kernels_dir)
+        scanner.scan(hash_files=False)
+        
+        block_names = []
+        for domain in domains:
+            domain_dir = self.kernels_dir / domain
+            if not domain_dir.exists():
+                print(f"Domain directory not found: {domain_dir}")
+                continue
+            for kernel_file in scanner.paths(".mojo", under=domain):
+                # Extract block name from file path
+                parts = list(kernel_file.relative_to(self.kernels_dir).parts)
+                if len(parts) != 3:
+                    continue
+                parts[-1] = parts[-1][:-len('.mojo')]
+                block_names.append('.'.join(parts))
+        return sorted(block_names)
+    
+    def batch_update_domain(self, domains=None, dry_run: bool = True, show_diff: bool = False,
+                            max_workers: Optional[int] = None) -> Dict[str, Any]:
+        """Update all kernels in one domain, a list of domains or every domain (None)
+        
+        Kernels and sidecars are rendered and synced in parallel and only
+        rewritten when their content changes. With dry_run nothing is written
+        and a unified-diff summary of what would change is printed instead.
+        """
+        start = time.perf_counter()
+        if isinstance(domains, str):
+            domains = [domains]
+        block_names = self.kernel_block_names(domains)
+        
+        # Rows follow the kernels already in the tree, so they never keep one alive
+        generator = KernelGenerator(self.kernels_dir, "umg_mojo_integrator", INTEGRATOR_TEMPLATE_VERSION,
+                                    existing="update", max_workers=max_workers, claim=False)
+        
+        # Render each block once; its kernel and sidecar become two rows
+        rows = []
+        with ThreadPoolExecutor(max_workers=generator.max_workers) as pool:
+            for block_name, rendered in zip(block_names, pool.map(self.render_update, block_names)):
+                if rendered is None:
+                    continue
+                path = pathlib.Path(*block_name.split('.')).with_suffix('.mojo')
+                rows.append({"name": block_name, "path": path, "content": rendered["kernel"]})
+                rows.append({"name": f"{block_name}.json", "path": path.with_suffix('.json'),
+                             "content": rendered["metadata"]})
+        
+        def render(row):
+            return row
+        
+        report = {"blocks": len(block_names)}
+        
+        if dry_run:
+            files = generator.plan(rows, render)
+            with ThreadPoolExecutor(max_workers=generator.max_workers) as pool:
+                diffs = list(pool.map(self._diff_file, files))
+            changed = [(f, diff) for f, diff in zip(files, diffs) if diff is not None]
+            for f, diff in changed:
+                added = sum(1 for line in diff if line.startswith('+') and not line.startswith('+++'))
+                removed = sum(1 for line in diff if line.startswith('-') and not line.startswith('---'))
+                print(f"Would update: {f['path'].as_posix()} (+{added} -{removed})")
+                if show_diff:
+                    print(''.join(diff))
+            report.update(files=len(files), changed=len(changed), unchanged=len(files) - len(changed),
+                          bytes_written=0)
+        else:
+            stats = generator.run(rows, render)
+            report.update(files=stats["files"], changed=stats["written"], unchanged=stats["unchanged"],
+                          bytes_written=sum(len(f["content"].encode("utf-8")) for f in generator.written()))
+        
+        report["seconds"] = time.perf_counter() - start
+        report["files_per_sec"] = report["files"] / report["seconds"] if report["seconds"] else 0.0
+        verb = "would change" if dry_run else "written"
+        print(f"\n{report['files']} files for {report['blocks']} blocks in {report['seconds']:.2f}s "
+              f"({report['files_per_sec']:.0f} files/sec): {report['changed']} {verb}, "
+              f"{report['unchanged']} unchanged, {report['bytes_written']} bytes written")
+        return report
+    
+    def _diff_file(self, f: Dict[str, Any]) -> Optional[List[str]]:
+        """Unified diff from the file on disk to its rendered content, or None if identical"""
+        path = self.kernels_dir / f["path"]
+        try:
+            current = path.read_text()
+        except FileNotFoundError:
+            current = ""
+        if current == f["content"]:
+            return None
+        name = f["path"].as_posix()
+        return list(difflib.unified_diff(current.splitlines(keepends=True), f["content"].splitlines(keepends=True),
+                                         fromfile=f"a/{name}", tofile=f"b/{name}"))
         
     def create_mojo_examples_reference(self):
         """Create a reference file with Mojo code examples"""
@@ -510,11 +614,31 @@ fn process_value(val: Variant) -> String:
         print(f"Created Mojo examples reference at: {ref_path}")
 
 def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Update Mojo kernels with UMG block structure")
+    parser.add_argument("--umg-root", default="C:\\Users\\Magne\\OneDrive\\Desktop\\UMG_NEOCORE",
+                        help="UMG_NEOCORE checkout")
+    parser.add_argument("--wb-root", default="C:\\WEBSITE BUILDER",
+                        help="WEBSITE BUILDER directory holding the block JSON templates")
+    parser.add_argument("--domain", action="append",
+                        help="batch update this domain (repeatable)")
+    parser.add_argument("--all-domains", action="store_true",
+                        help="batch update every domain under neocore/src/kernels")
+    parser.add_argument("--apply", action="store_true",
+                        help="write changes (batch updates are a dry run by default)")
+    parser.add_argument("--diff", action="store_true",
+                        help="print full unified diffs in dry-run mode")
+    parser.add_argument("--jobs", type=int, default=None, help="worker threads")
+    args = parser.parse_args()
+    
     # Initialize integrator
-    integrator = UMGMojoIntegrator(
-        "C:\\Users\\Magne\\OneDrive\\Desktop\\UMG_NEOCORE",
-        "C:\\WEBSITE BUILDER"
-    )
+    integrator = UMGMojoIntegrator(args.umg_root, args.wb_root)
+    
+    if args.domain or args.all_domains:
+        integrator.batch_update_domain(None if args.all_domains else args.domain,
+                                       dry_run=not args.apply, show_diff=args.diff, max_workers=args.jobs)
+        return
     
     # Create reference documentation
     integrator.create_mojo_examples_reference()
@@ -532,7 +656,7 @@ def main():
         integrator.update_kernel_with_umg_structure(block)
     
     print("\nTo batch update entire domains, use:")
-    print('integrator.batch_update_domain("analytics", dry_run=False)')
+    print('python scripts/umg_mojo_integrator.py --domain analytics --apply  (or --all-domains)')
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,615 @@
+import os
+import gzip
+import json
+import pathlib
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from neo_umg.asset_sync import AssetSync
+from neo_umg.build_site import StaticSiteBuilder, build_sharded, rebuild_preview
+from neo_umg.images import rewrite_img_tags
+from neo_umg.indexes import render_sitemaps, search_prefix
+from neo_umg.manifest import PAGES_NAME, PageEntries, PageWriter, load_manifest
+from neo_umg.minify import minify_css, minify_html
+from neo_umg.preview import PreviewStore, create_server
+from neo_umg.profiler import BuildProfiler
+from neo_umg.shards import ShardCollisionError, merge_shards
+
+
+def make_site(root: pathlib.Path) -> pathlib.Path:
+    """Create a minimal project with pages and public assets."""
+    (root / "pages").mkdir()
+    (root / "pages" / "index.md").write_text("# Home\n\nHello **world**\n")
+    (root / "pages" / "about.md").write_text("# About\n")
+    (root / "pages" / "docs.md").write_text("# Docs\n")
+    (root / "public" / "media").mkdir(parents=True)
+    (root / "public" / "robots.txt").write_text("User-agent: *\n")
+    (root / "public" / "media" / "clip.bin").write_bytes(os.urandom(2048))
+    return root
+
+
+def test_asset_sync_skips_unchanged_files(tmp_path):
+    site = make_site(tmp_path)
+    dest = tmp_path / "out"
+
+    first = AssetSync(site / "public", dest, link_mode="copy").sync()
+    assert first["files"] == 2
+    assert first["copied"] == 2
+    assert (dest / "media" / "clip.bin").read_bytes() == (site / "public" / "media" / "clip.bin").read_bytes()
+
+    second = AssetSync(site / "public", dest, link_mode="copy").sync()
+    assert second["skipped"] == 2
+    assert second["bytes_copied"] == 0
+    assert second["bytes_saved"] == second["bytes_total"]
+
+    (site / "public" / "robots.txt").write_text("User-agent: *\nDisallow: /private\n")
+    third = AssetSync(site / "public", dest, link_mode="copy").sync()
+    assert third["copied"] == 1
+    assert "Disallow" in (dest / "robots.txt").read_text()
+
+
+def test_asset_sync_hardlinks(tmp_path):
+    site = make_site(tmp_path)
+    dest = tmp_path / "out"
+
+    stats = AssetSync(site / "public", dest, link_mode="hardlink").sync()
+    assert stats["linked"] == 2
+    assert os.path.samefile(dest / "robots.txt", site / "public" / "robots.txt")
+
+
+def test_incremental_build_over_existing_directories(tmp_path):
+    site = make_site(tmp_path)
+
+    StaticSiteBuilder(site).build()
+    builder = StaticSiteBuilder(site, incremental=True)
+    builder.build()
+
+    assert (site / "build" / "index.html").exists()
+    assert (site / "build" / "media" / "clip.bin").exists()
+    assert builder.asset_stats["skipped"] == 2
+
+
+def test_build_outputs_never_write_through_to_public(tmp_path):
+    site = make_site(tmp_path)
+    (site / "public" / "_headers").write_text("/*\n  X-Frame-Options: DENY\n")
+    (site / "public" / "sitemap.xml").write_text("<urlset></urlset>\n")
+    (site / "public" / "app.css").write_text("body { color: red; }\n" * 100)
+    sources = {path: path.read_bytes() for path in (site / "public").rglob("*") if path.is_file()}
+
+    for incremental in (False, True):
+        StaticSiteBuilder(site, incremental=incremental, link_mode="hardlink", fingerprint=True,
+                          indexes=True, compress=True, compress_min_size=256).build()
+    assert "<loc>" in (site / "build" / "sitemap.xml").read_text()
+    assert "immutable" in (site / "build" / "_headers").read_text()
+    assert {path: path.read_bytes() for path in sources} == sources
+    assert not list((site / "public").glob("*.gz"))
+
+
+def test_incremental_build_removes_deleted_public_files(tmp_path):
+    site = make_site(tmp_path)
+    StaticSiteBuilder(site).build()
+    assert (site / "build" / "robots.txt").exists()
+
+    (site / "public" / "robots.txt").unlink()
+    StaticSiteBuilder(site, incremental=True).build()
+    assert not (site / "build" / "robots.txt").exists()
+    assert (site / "build" / "media" / "clip.bin").exists()
+    assert load_manifest(site / "build")["public"] == ["media/clip.bin"]
+
+
+def test_precompressed_siblings_are_reused(tmp_path):
+    site = make_site(tmp_path)
+    builder = StaticSiteBuilder(site, compress=True, compress_min_size=256)
+    builder.build()
+
+    index = site / "build" / "index.html"
+    assert gzip.decompress((site / "build" / "index.html.gz").read_bytes()) == index.read_bytes()
+    assert builder.compress_stats["written"] >= 3
+
+    rebuild = StaticSiteBuilder(site, incremental=True, compress=True, compress_min_size=256)
+    rebuild.build()
+    assert rebuild.compress_stats["written"] == 0
+    assert rebuild.compress_stats["skipped"] == builder.compress_stats["written"]
+
+
+def test_deleted_assets_take_their_precompressed_siblings(tmp_path):
+    site = make_site(tmp_path)
+    (site / "public" / "app.css").write_text("body { color: red; }\n" * 100)
+    (site / "public" / "site.js").write_text("console.log('hi');\n" * 100)
+    builder = StaticSiteBuilder(site, compress=True, compress_min_size=256, fingerprint=True)
+    builder.build()
+    hashed = builder.asset_map["site.js"]
+    assert (site / "build" / "app.css.gz").exists()
+    assert (site / "build" / f"{hashed}.gz").exists()
+
+    (site / "public" / "app.css").unlink()
+    (site / "public" / "site.js").write_text("console.log('bye');\n" * 100)
+    StaticSiteBuilder(site, incremental=True, compress=True, compress_min_size=256, fingerprint=True).build()
+    assert not (site / "build" / "app.css.gz").exists()
+    assert not (site / "build" / f"{hashed}.gz").exists()
+
+
+def test_minify_preserves_preformatted_blocks():
+    html = "<main>\n    <p>a   b</p>\n    <pre>  keep\n    this</pre>\n</main>"
+    assert minify_html(html) == "<main><p>a b</p><pre>  keep\n    this</pre></main>"
+    assert minify_css("a { color : red ; font: 'Segoe  UI' ; }") == "a{color:red;font:'Segoe  UI'}"
+
+
+def test_extracted_stylesheet_is_shared(tmp_path):
+    site = make_site(tmp_path)
+    builder = StaticSiteBuilder(site, minify=True, extract_css=True)
+    builder.build()
+
+    css_files = list((site / "build" / "assets").glob("site.*.css"))
+    assert len(css_files) == 1
+    for page in ("index.html", "about.html", "docs.html"):
+        html = (site / "build" / page).read_text()
+        assert f'href="/assets/{css_files[0].name}"' in html
+        assert "<style>" not in html
+    assert builder.size_stats["bytes_after"] < builder.size_stats["bytes_before"]
+
+
+def test_sharded_build_merges_to_full_site(tmp_path):
+    site = make_site(tmp_path)
+    shard_dirs = [tmp_path / "shards" / str(i) for i in range(3)]
+    for i, shard_dir in enumerate(shard_dirs):
+        StaticSiteBuilder(site, build_dir=shard_dir, shard_index=i, shard_count=3).build()
+
+    built = [load_manifest(d)["pages"] for d in shard_dirs]
+    assert sum(len(pages) for pages in built) == 3
+
+    stats = merge_shards(shard_dirs, tmp_path / "merged", link_mode="copy")
+    assert stats["pages"] == 3
+    merged = load_manifest(tmp_path / "merged")
+    assert set(merged["pages"]) == {"/", "/about", "/docs"}
+    assert (tmp_path / "merged" / "media" / "clip.bin").exists()
+
+
+def test_sharded_build_writes_indexes_once_after_merge(tmp_path):
+    site = make_site(tmp_path)
+    (site / "pages" / "docs.md").write_text(
+        '# Docs\n\n<a href="/about.html">about</a> <a href="/robots.txt">robots</a> <a href="/gone.html">gone</a>\n')
+    (site / "site.json").write_text(json.dumps({
+        "title": "Site",
+        "base_url": "https://example.com",
+        "pages": [{"path": f"/p{i}", "file": "index.md", "title": f"Page {i}"} for i in range(6)] + [
+            {"path": "/", "file": "index.md", "title": "Home"},
+            {"path": "/about", "file": "about.md", "title": "About"},
+            {"path": "/docs", "file": "docs.md", "title": "Documentation"},
+        ],
+    }))
+
+    stats = build_sharded(site, 3, indexes=True, quiet=True)
+    assert (stats["shards"], stats["pages"], stats["broken_links"]) == (3, 9, 1)
+    for shard in range(3):
+        assert not (site / ".neo_cache" / "shards" / str(shard) / "sitemap.xml").exists()
+    sitemap = (site / "build" / "sitemap.xml").read_text()
+    assert sitemap.count("<loc>") == 9
+    index = json.loads((site / "build" / "search-index.json").read_text())
+    assert search_prefix(index, "docu") == [["/docs.html", "Documentation"]]
+
+
+def test_shard_merge_detects_collisions(tmp_path):
+    site = make_site(tmp_path)
+    first, second = tmp_path / "a", tmp_path / "b"
+    StaticSiteBuilder(site, build_dir=first).build()
+    StaticSiteBuilder(site, build_dir=second).build()
+    (second / "index.html").write_text("<p>different</p>")
+
+    with pytest.raises(ShardCollisionError) as excinfo:
+        merge_shards([first, second], tmp_path / "merged")
+    assert any("index.html" in c or "page /" in c for c in excinfo.value.collisions)
+
+
+def test_profiler_reports_stages_and_trace(tmp_path, capsys):
+    site = make_site(tmp_path)
+    profiler = BuildProfiler()
+    StaticSiteBuilder(site, profiler=profiler, quiet=True).build()
+    assert capsys.readouterr().out == ""
+
+    report = profiler.report(top_n=2)
+    for stage in ("clean_build", "copy_static_assets", "load_page_config", "render_page", "write"):
+        assert stage in report["stages"]
+    assert report["stages"]["render_page"]["count"] == 3
+    assert len(report["slowest_pages"]) == 2
+    assert report["bytes_written"] > 0
+
+    paths = profiler.write(tmp_path / "profile")
+    trace = json.loads(paths["trace"].read_text())
+    assert all(event["ph"] == "X" for event in trace["traceEvents"])
+
+
+def test_streaming_build_matches_regular_build(tmp_path):
+    site = make_site(tmp_path)
+    (site / "site.json").write_text(json.dumps({
+        "title": "Big Site",
+        "pages": [{"path": "/", "file": "index.md", "title": "Home"}],
+        "pages_file": "pages.jsonl",
+    }))
+    with open(site / "pages.jsonl", "w") as f:
+        for name in ("about", "docs"):
+            f.write(json.dumps({"path": f"/{name}", "file": f"{name}.md", "title": name.title()}) + "\n")
+
+    StaticSiteBuilder(site, build_dir=tmp_path / "regular").build()
+    streamed = StaticSiteBuilder(site, build_dir=tmp_path / "streamed", streaming=True)
+    streamed.build()
+
+    for page in ("index.html", "about.html", "docs.html"):
+        assert (tmp_path / "streamed" / page).read_bytes() == (tmp_path / "regular" / page).read_bytes()
+    assert load_manifest(tmp_path / "streamed") == load_manifest(tmp_path / "regular")
+
+    mtime = (tmp_path / "streamed" / "about.html").stat().st_mtime_ns
+    StaticSiteBuilder(site, build_dir=tmp_path / "streamed", streaming=True, incremental=True).build()
+    assert (tmp_path / "streamed" / "about.html").stat().st_mtime_ns == mtime
+
+
+def test_streaming_build_keeps_page_entries_on_disk(tmp_path):
+    site = make_site(tmp_path)
+    StaticSiteBuilder(site, streaming=True).build()
+    rebuilt = StaticSiteBuilder(site, streaming=True, incremental=True)
+    rebuilt.build()
+    assert rebuilt.skipped_pages == 3
+    assert isinstance(rebuilt.manifest["pages"], PageEntries)
+    assert rebuilt.manifest["pages"]["/about"]["output"] == "about.html"
+    lines = (site / "build" / PAGES_NAME).read_text().splitlines()
+    assert [json.loads(line)[0] for line in lines] == ["/", "/about", "/docs"]
+    assert "pages" not in json.loads((site / "build" / ".neo-manifest.json").read_text())
+
+    (site / "pages" / "docs.md").write_text("# Docs v2\n")
+    edited = StaticSiteBuilder(site, streaming=True, incremental=True)
+    edited.build()
+    assert edited.skipped_pages == 2
+    assert "Docs v2" in (site / "build" / "docs.html").read_text()
+
+
+def test_page_entries_resolve_repeated_paths_to_the_last_record(tmp_path):
+    writer = PageWriter(tmp_path)
+    writer.add("/a", {"output": "a.html"})
+    writer.add("/b", {"output": "b.html"})
+    writer.add("/a", {"output": "a2.html"})
+    pages = writer.commit()
+    assert (len(pages), pages["/a"], "/c" in pages) == (2, {"output": "a2.html"}, False)
+    assert dict(pages.items()) == {"/a": {"output": "a2.html"}, "/b": {"output": "b.html"}}
+    pages.close()
+
+
+def test_indexes_and_broken_links(tmp_path):
+    site = make_site(tmp_path)
+    (site / "pages" / "docs.md").write_text('# Docs\n\nSee <a href="/missing.html">this</a> and <a href="/robots.txt">robots</a>.\n')
+    (site / "site.json").write_text(json.dumps({
+        "title": "Site",
+        "base_url": "https://example.com",
+        "pages": [
+            {"path": "/", "file": "index.md", "title": "Home"},
+            {"path": "/about", "file": "about.md", "title": "About"},
+            {"path": "/docs", "file": "docs.md", "title": "Documentation"},
+        ],
+    }))
+
+    builder = StaticSiteBuilder(site, indexes=True)
+    builder.build()
+
+    sitemap = (site / "build" / "sitemap.xml").read_text()
+    assert "<loc>https://example.com/about.html</loc>" in sitemap
+    index = json.loads((site / "build" / "search-index.json").read_text())
+    assert search_prefix(index, "docu") == [["/docs.html", "Documentation"]]
+    assert [link["href"] for link in builder.broken_links] == ["/missing.html"]
+
+    streamed = StaticSiteBuilder(site, build_dir=tmp_path / "streamed", streaming=True, indexes=True)
+    streamed.build()
+    assert load_manifest(tmp_path / "streamed") == load_manifest(site / "build")
+
+
+def test_incremental_build_removes_pages_dropped_from_the_site(tmp_path):
+    site = make_site(tmp_path)
+    (site / "pages" / "docs.md").write_text('# Docs\n\n<a href="/about.html">about</a>\n')
+    pages = [
+        {"path": "/", "file": "index.md", "title": "Home"},
+        {"path": "/about", "file": "about.md", "title": "About"},
+        {"path": "/docs", "file": "docs.md", "title": "Documentation"},
+    ]
+    (site / "site.json").write_text(json.dumps({"title": "Site", "pages": pages}))
+    StaticSiteBuilder(site, indexes=True, compress=True, compress_min_size=256).build()
+    assert (site / "build" / "about.html.gz").exists()
+
+    (site / "site.json").write_text(json.dumps({"title": "Site", "pages": pages[::2]}))
+    rebuilt = StaticSiteBuilder(site, incremental=True, indexes=True)
+    rebuilt.build()
+    assert not (site / "build" / "about.html").exists()
+    assert not (site / "build" / "about.html.gz").exists()
+    assert {"page": "/docs", "href": "/about.html", "target": "about.html"} in rebuilt.broken_links
+
+
+def test_sitemap_splits_at_url_limit():
+    pages = {f"/p{i}": {"output": f"p{i}.html"} for i in range(5)}
+    files = render_sitemaps(pages, "https://example.com", max_urls=2)
+    assert sorted(files) == ["sitemap-1.xml", "sitemap-2.xml", "sitemap-3.xml", "sitemap.xml"]
+    assert "<sitemapindex" in files["sitemap.xml"]
+
+
+def test_fragment_change_rebuilds_only_dependent_pages(tmp_path):
+    site = make_site(tmp_path)
+    (site / "fragments").mkdir()
+    (site / "fragments" / "note.md").write_text('Note: {% include "sig.md" %}\n')
+    (site / "fragments" / "sig.md").write_text("signed v1\n")
+    (site / "pages" / "about.md").write_text('# About\n\n{% include "note.md" %}\n')
+
+    StaticSiteBuilder(site).build()
+    assert "signed v1" in (site / "build" / "about.html").read_text()
+
+    unchanged = StaticSiteBuilder(site, incremental=True, profiler=BuildProfiler())
+    unchanged.build()
+    assert unchanged.skipped_pages == 3
+    assert "render_page" not in unchanged.profiler.report()["stages"]
+
+    (site / "fragments" / "sig.md").write_text("signed v2\n")
+    profiler = BuildProfiler()
+    rebuilt = StaticSiteBuilder(site, incremental=True, profiler=profiler)
+    rebuilt.build()
+    assert rebuilt.skipped_pages == 2
+    assert [e["args"]["page"] for e in profiler.events if e["name"] == "render_page"] == ["/about"]
+    assert "signed v2" in (site / "build" / "about.html").read_text()
+
+    (site / "site.json").write_text(json.dumps({
+        "title": "UMG NeoCore Site",
+        "nav": [{"href": "/", "label": "Start"}],
+        "pages": [
+            {"path": "/", "file": "index.md", "title": "Home"},
+            {"path": "/about", "file": "about.md", "title": "About"},
+            {"path": "/docs", "file": "docs.md", "title": "Documentation"},
+        ],
+    }))
+    renavved = StaticSiteBuilder(site, incremental=True)
+    renavved.build()
+    assert renavved.skipped_pages == 0
+    assert ">Start</a>" in (site / "build" / "docs.html").read_text()
+
+
+def test_fingerprinted_assets_and_headers(tmp_path):
+    site = make_site(tmp_path)
+    (site / "public" / "app.css").write_text("body { color: red; }\n")
+    (site / "pages" / "index.md").write_text('# Home\n\n<link rel="stylesheet" href="/app.css">\n')
+
+    builder = StaticSiteBuilder(site, fingerprint=True, extract_css=True)
+    builder.build()
+
+    hashed = builder.asset_map["app.css"]
+    assert hashed.startswith("app.") and hashed.endswith(".css") and hashed != "app.css"
+    assert (site / "build" / hashed).read_text() == "body { color: red; }\n"
+    assert f'href="/{hashed}"' in (site / "build" / "index.html").read_text()
+    assert json.loads((site / "build" / "asset-manifest.json").read_text())["/app.css"] == "/" + hashed
+    headers = (site / "build" / "_headers").read_text()
+    assert f"/{hashed}\n  Cache-Control: public, max-age=31536000, immutable" in headers
+    assert builder.stylesheet_href in headers
+    rules = [block.splitlines() for block in headers.strip().split("\n\n")]
+    assert "/*" not in [rule[0] for rule in rules]
+    assert ["/", "  Cache-Control: public, max-age=0, must-revalidate"] in rules
+    assert [f"/{hashed}", "  Cache-Control: public, max-age=31536000, immutable"] in rules
+
+    (site / "public" / "app.css").write_text("body { color: blue; }\n")
+    rebuilt = StaticSiteBuilder(site, fingerprint=True, extract_css=True, incremental=True)
+    rebuilt.build()
+    assert rebuilt.asset_map["app.css"] != hashed
+    assert not (site / "build" / hashed).exists()
+    assert rebuilt.asset_map["app.css"] in (site / "build" / "index.html").read_text()
+
+
+def test_toggling_fingerprint_or_images_rerenders_incremental_builds(tmp_path):
+    site = make_site(tmp_path)
+    (site / "public" / "app.css").write_text("body { color: red; }\n")
+    (site / "pages" / "index.md").write_text('# Home\n\n<link rel="stylesheet" href="/app.css">\n')
+    StaticSiteBuilder(site).build()
+
+    fingerprinted = StaticSiteBuilder(site, incremental=True, fingerprint=True)
+    fingerprinted.build()
+    assert fingerprinted.skipped_pages == 0
+    assert fingerprinted.asset_map["app.css"] in (site / "build" / "index.html").read_text()
+
+    plain = StaticSiteBuilder(site, incremental=True)
+    plain.build()
+    assert plain.skipped_pages == 0
+    assert 'href="/app.css"' in (site / "build" / "index.html").read_text()
+
+    imaged = StaticSiteBuilder(site, incremental=True, optimize_images=True)
+    imaged.build()
+    assert imaged.skipped_pages == 0
+
+
+def test_image_tags_get_lazy_loading_and_srcset(tmp_path):
+    site = make_site(tmp_path)
+    (site / "pages" / "about.md").write_text('# About\n\n<img src="media/pic.png" alt="pic">\n')
+
+    builder = StaticSiteBuilder(site, optimize_images=True)
+    builder.build()
+    assert '<img src="media/pic.png" alt="pic" loading="lazy">' in (site / "build" / "about.html").read_text()
+
+    variants = {"media/pic.png": {"width": 1200, "variants": [[480, "_img/media/pic-480.ab.webp"]]}}
+    html = rewrite_img_tags('<img src="/media/pic.png"/>', "about.html", variants)
+    assert 'srcset="/_img/media/pic-480.ab.webp 480w, /media/pic.png 1200w"' in html
+    assert html.endswith('sizes="(max-width: 800px) 100vw, 800px"/>')
+
+    html = rewrite_img_tags('<img src="/media/pic.png">', "about.html", variants,
+                            assets={"media/pic.png": "media/pic.d97a31ec7c.png"})
+    assert 'srcset="/_img/media/pic-480.ab.webp 480w, /media/pic.d97a31ec7c.png 1200w"' in html
+
+
+def test_image_variants_are_reused_by_a_clean_checkout_sharing_the_cache(tmp_path):
+    image = pytest.importorskip("PIL.Image")
+    builds = []
+    for checkout in ("a", "b"):
+        (tmp_path / checkout).mkdir()
+        site = make_site(tmp_path / checkout)
+        image.new("RGB", (1000, 500), "red").save(site / "public" / "media" / "pic.png")
+        builder = StaticSiteBuilder(site, optimize_images=True, cache_dir=tmp_path / "cache")
+        builder.build()
+        builds.append(builder)
+
+    first, second = (build.image_records["media/pic.png"] for build in builds)
+    assert first["width"] == second["width"] == 1000
+    assert first["variants"] == second["variants"]
+    assert (builds[1].image_stats["processed"], builds[1].image_stats["cached"]) == (0, 1)
+
+
+def test_every_shard_gets_image_srcsets(tmp_path):
+    image = pytest.importorskip("PIL.Image")
+    site = make_site(tmp_path)
+    image.new("RGB", (1000, 500), "red").save(site / "public" / "media" / "pic.png")
+    (site / "pages" / "index.md").write_text('# Page\n\n<img src="/media/pic.png" alt="pic">\n')
+    (site / "site.json").write_text(json.dumps({"title": "Site", "pages": [
+        {"path": f"/p{i}", "file": "index.md", "title": f"Page {i}"} for i in range(8)]}))
+
+    build_sharded(site, 3, optimize_images=True, quiet=True)
+    for i in range(8):
+        assert "srcset=" in (site / "build" / f"p{i}.html").read_text()
+    assert len(list((site / "build" / "_img").rglob("*.*"))) == 2
+    for shard in (1, 2):
+        assert not (site / ".neo_cache" / "shards" / str(shard) / "_img").exists()
+
+
+def test_critical_css_inlines_used_rules_and_defers_stylesheet(tmp_path):
+    site = make_site(tmp_path)
+    (site / "pages" / "docs.md").write_text("Plain text only\n")
+
+    builder = StaticSiteBuilder(site, critical_css=True)
+    builder.build()
+
+    index = (site / "build" / "index.html").read_text()
+    docs = (site / "build" / "docs.html").read_text()
+    assert f'<link rel="preload" href="{builder.stylesheet_href}" as="style"' in index
+    assert f'<noscript><link rel="stylesheet" href="{builder.stylesheet_href}"></noscript>' in index
+    assert "h1, h2, h3 {" in index and "h1, h2, h3 {" not in docs
+    assert "nav a:hover {" in docs and ".footer {" in docs
+    assert builder.critical.stats["templates"] == 1
+    assert builder.critical.stats["pages"] == 3
+
+    with pytest.raises(ValueError):
+        StaticSiteBuilder(site, critical_css=True, streaming=True)
+
+
+def test_render_cache_is_shared_between_clean_builds(tmp_path):
+    site = make_site(tmp_path)
+    cache_dir = tmp_path / "shared-cache"
+
+    first = StaticSiteBuilder(site, cache_dir=cache_dir, render_cache=True, minify=True)
+    first.build()
+    assert first.render_cache.stats["misses"] == 3
+    expected = (site / "build" / "about.html").read_bytes()
+
+    other = StaticSiteBuilder(site, cache_dir=cache_dir, render_cache=True, minify=True,
+                              build_dir=tmp_path / "other-build")
+    other.build()
+    assert other.render_cache.stats["hits"] == 3
+    assert other.render_cache.hit_rate == 1.0
+    assert (tmp_path / "other-build" / "about.html").read_bytes() == expected
+
+    (site / "pages" / "about.md").write_text("# About\n\nRewritten.\n")
+    changed = StaticSiteBuilder(site, cache_dir=cache_dir, render_cache=True, minify=True)
+    changed.build()
+    assert changed.render_cache.stats == {"hits": 2, "misses": 1, "stored": 1, "evicted": 0}
+
+    bounded = StaticSiteBuilder(site, cache_dir=cache_dir, render_cache=True, cache_max_bytes=0)
+    bounded.build()
+    assert bounded.render_cache.stats["evicted"] == 7
+    assert not [p for p in (cache_dir / "render").rglob("*") if p.is_file()]
+
+
+def test_preview_server_serves_from_memory_and_swaps_changes(tmp_path):
+    site = make_site(tmp_path)
+    StaticSiteBuilder(site, quiet=True).build()
+    store = PreviewStore(site / "build")
+    assert store.refresh()["added"] == len(store.entries)
+
+    server = create_server(store, "127.0.0.1", 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        request = urllib.request.Request(base + "/about", headers={"Accept-Encoding": "gzip"})
+        with urllib.request.urlopen(request) as response:
+            assert response.headers["Content-Encoding"] == "gzip"
+            assert b"About" in gzip.decompress(response.read())
+            etag = response.headers["ETag"]
+        request = urllib.request.Request(base + "/about",
+                                         headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+        with pytest.raises(urllib.error.HTTPError) as excinfo:
+            urllib.request.urlopen(request)
+        assert excinfo.value.code == 304
+
+        (site / "pages" / "about.md").write_text("# About\n\nUpdated.\n")
+        StaticSiteBuilder(site, incremental=True, quiet=True).build()
+        stats = store.refresh()
+        assert (stats["updated"], stats["added"], stats["removed"]) == (1, 0, 0)
+        with urllib.request.urlopen(base + "/about.html") as response:
+            assert b"Updated." in response.read()
+            assert response.headers["ETag"] != etag
+    finally:
+        server.shutdown()
+
+
+def test_preview_keeps_last_good_build_when_a_rebuild_fails(tmp_path, capsys):
+    site = make_site(tmp_path)
+    StaticSiteBuilder(site, quiet=True).build()
+    store = PreviewStore(site / "build")
+    store.refresh()
+    entries = dict(store.entries)
+
+    (site / "site.json").write_text('{"title": "Site", "pages": [')
+    assert rebuild_preview(site, site / "build", {}, store) is None
+    assert "Rebuild failed" in capsys.readouterr().out
+    assert store.entries == entries
+
+    (site / "site.json").write_text(json.dumps({"title": "Site", "pages": [
+        {"path": "/", "file": "index.md", "title": "Home"}]}))
+    assert rebuild_preview(site, site / "build", {}, store)["updated"] >= 1
+
+
+def test_locales_share_fragments_and_assets(tmp_path):
+    site = make_site(tmp_path)
+    (site / "fragments" / "de").mkdir(parents=True)
+    (site / "fragments" / "footer.md").write_text("Shared footer\n")
+    (site / "fragments" / "greeting.md").write_text("Hello\n")
+    (site / "fragments" / "de" / "greeting.md").write_text("Hallo\n")
+    (site / "pages" / "de").mkdir()
+    (site / "pages" / "de" / "about.md").write_text('# Über uns\n{% include "greeting.md" %}')
+    (site / "pages" / "about.md").write_text('# About\n{% include "greeting.md" %}{% include "footer.md" %}')
+    (site / "site.json").write_text(json.dumps({
+        "title": "Site",
+        "pages": [
+            {"path": "/", "file": "index.md", "title": "Home"},
+            {"path": "/about", "file": "about.md", "title": "About"},
+        ],
+        "locales": {"en": {}, "de": {"title": "Seite", "titles": {"/about": "Über uns"}}},
+    }))
+
+    profiler = BuildProfiler()
+    builder = StaticSiteBuilder(site, indexes=True, profiler=profiler)
+    builder.build()
+
+    build = site / "build"
+    # Locales render in worker processes whose profiles are merged back
+    renders = [event for event in profiler.events if event["name"] == "render_page"]
+    assert len(renders) == 4 and os.getpid() not in {event["pid"] for event in renders}
+    about_en = (build / "about.html").read_text()
+    about_de = (build / "de" / "about.html").read_text()
+    assert '<html lang="en">' in about_en and "Hello" in about_en and "Shared footer" in about_en
+    assert '<html lang="de">' in about_de and "Hallo" in about_de
+    assert "<title>Über uns - Seite</title>" in about_de
+    assert '<a href="/de/about.html">' in about_de
+    assert (build / "de" / "index.html").exists() and (build / "robots.txt").exists()
+    assert not (build / "de" / "robots.txt").exists()
+    assert set(builder.manifest["pages"]) == {"/", "/about", "/de/", "/de/about"}
+    assert "/de/about.html" in (build / "sitemap.xml").read_text()
+    # Fragment files are read and split once, before the locale workers start
+    assert builder.locale_builders["de"].parsed_fragments == builder.parsed_fragments
+    assert set(builder.parsed_fragments) == {
+        site / "fragments" / "greeting.md", site / "fragments" / "de" / "greeting.md",
+        site / "fragments" / "footer.md",
+    }
+
+    (site / "pages" / "de" / "about.md").write_text("# Über uns\nNeu\n")
+    rebuilt = StaticSiteBuilder(site, incremental=True)
+    rebuilt.build()
+    assert rebuilt.skipped_pages == 3
+    assert "Neu" in (build / "de" / "about.html").read_text()
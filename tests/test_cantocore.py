@@ -0,0 +1,34 @@
+import pytest
+
+from neo_umg.cantocore import (CantocoreSyntaxError, cache_info, compile_cantocore, operation_hint,
+                               parse, tokenize)
+
+
+def test_parses_readme_directives_and_instructions():
+    assert compile_cantocore(["::IF:TRIGGER.ACTIVE", "→ STACK.REWRITE", "::UNLESS:GUARDRAIL.BLOCK"]) == (
+        ("guard", "IF", "TRIGGER.ACTIVE"), ("then", "STACK.REWRITE"), ("guard", "UNLESS", "GUARDRAIL.BLOCK"))
+    assert parse("INSTRUCTION:MODAL_TRIGGER{on_click => open_modal()}") == (
+        ("op", "INSTRUCTION", "MODAL_TRIGGER", (), (("on_click", ("call", "open_modal", ())),)),)
+    assert parse('A:B[1, "x y", c.d(2.5)] -> X.Y') == (
+        ("op", "A", "B", (1, ("str", "x y"), ("call", "c.d", (2.5,))), ()), ("then", "X.Y"))
+    assert operation_hint(compile_cantocore("INSTRUCTION:GA[EVENT]")) == "EVENT"
+    assert [kind for kind, _, _ in tokenize("::IF:A")] == ["directive", "name", ":", "name"]
+
+
+def test_errors_are_cached_as_error_statements():
+    with pytest.raises(CantocoreSyntaxError) as error:
+        parse("::IF TRIGGER")
+    assert error.value.position == 5
+    before = cache_info().hits
+    assert compile_cantocore("::IF TRIGGER")[0][0] == "error"
+    assert compile_cantocore("::IF TRIGGER")[0][0] == "error"
+    assert cache_info().hits == before + 1
+    assert compile_cantocore(None) == ()
+
+
+def test_operation_hint_for_every_argument_kind():
+    assert operation_hint(parse("INSTRUCTION:CACHE[300, GET]")) == "300"
+    assert operation_hint(parse("INSTRUCTION:SCALE[1.5]")) == "1.5"
+    assert operation_hint(parse('INSTRUCTION:LOG["hello world"]')) == "hello world"
+    assert operation_hint(parse("INSTRUCTION:RUN[job.start(1)]")) == "job.start"
+    assert operation_hint(parse("::IF:TRIGGER.ACTIVE")) == ""
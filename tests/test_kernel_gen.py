@@ -0,0 +1,95 @@
+import os
+
+from neo_umg.kernel_gen import KernelGenerator, kernel_path, load_gen_manifest
+
+
+def render(row):
+    return {"name": row, "path": kernel_path(row), "content": f"// {row}\n"}
+
+
+def test_generator_writes_only_changed_files(tmp_path):
+    rows = ["web.html.div", "web.html.span", "io.fs.read.text"]
+    stats = KernelGenerator(tmp_path, "test", init_files=True).run(rows, render)
+    assert (stats["written"], stats["dirs_created"]) == (5, 2)
+    assert (tmp_path / "io" / "fs" / "read_text.mojo").read_text() == "// io.fs.read.text\n"
+    assert (tmp_path / "web" / "html" / "__init__.mojo").exists()
+
+    div = tmp_path / "web" / "html" / "div.mojo"
+    os.utime(div, ns=(1, 1))
+    again = KernelGenerator(tmp_path, "test", init_files=True).run(rows, render)
+    assert (again["written"], again["unchanged"], again["skipped"]) == (0, 5, 0)
+    assert div.stat().st_mtime_ns == 1
+
+    changed = KernelGenerator(tmp_path, "test").run(rows, lambda row: dict(render(row), content="// v2\n"))
+    assert changed["written"] == 3
+    assert div.read_text() == "// v2\n"
+
+
+def test_skip_mode_keeps_existing_files_and_limits_new_ones(tmp_path):
+    (tmp_path / "web" / "html").mkdir(parents=True)
+    (tmp_path / "web" / "html" / "div.mojo").write_text("implemented\n")
+    rows = ["web.html.div", "web.html.span", "web.html.p", "web.html.a", "web.html.span"]
+    generator = KernelGenerator(tmp_path, "test", existing="skip", limit=2)
+    stats = generator.run(rows, render)
+    assert (stats["written"], stats["skipped"], stats["duplicates"]) == (2, 2, 1)
+    assert (tmp_path / "web" / "html" / "div.mojo").read_text() == "implemented\n"
+    assert sorted(p.name for p in (tmp_path / "web" / "html").iterdir()) == ["div.mojo", "p.mojo", "span.mojo"]
+
+
+def test_manifest_check_and_prune(tmp_path):
+    rows = ["web.html.div", "web.html.span", "io.fs.read"]
+    KernelGenerator(tmp_path, "test").run(rows, render)
+    manifest = load_gen_manifest(tmp_path)["generators"]["test"]
+    assert manifest["web.html.div"]["path"] == "web/html/div.mojo"
+    assert manifest["web.html.div"]["template"] == 1
+
+    checker = KernelGenerator(tmp_path, "test", template_version=2)
+    checker.plan(rows[:2] + ["web.html.p"], render)
+    (tmp_path / "web" / "html" / "span.mojo").write_text("// edited by hand\n")
+    report = checker.check()
+    assert report == {"missing": [], "modified": ["web.html.span"], "outdated": ["web.html.div"],
+                      "unrecorded": ["web.html.p"], "orphaned": ["io.fs.read"]}
+
+    pruner = KernelGenerator(tmp_path, "test")
+    pruner.plan(["web.html.div"], render)
+    result = pruner.prune()
+    assert result == {"removed": ["io.fs.read"], "kept": ["web.html.span"]}
+    assert not (tmp_path / "io").exists()
+    assert (tmp_path / "web" / "html" / "span.mojo").exists()
+
+
+def test_prune_keeps_files_found_in_skip_mode(tmp_path):
+    (tmp_path / "web" / "html").mkdir(parents=True)
+    (tmp_path / "web" / "html" / "div.mojo").write_text("implemented by hand\n")
+    rows = ["web.html.div", "web.html.span"]
+    KernelGenerator(tmp_path, "test", existing="skip").run(rows, render)
+    assert load_gen_manifest(tmp_path)["generators"]["test"]["web.html.div"]["hash"] is None
+
+    pruner = KernelGenerator(tmp_path, "test", existing="skip")
+    pruner.run([], render)
+    assert pruner.prune() == {"removed": ["web.html.span"], "kept": ["web.html.div"]}
+    assert (tmp_path / "web" / "html" / "div.mojo").read_text() == "implemented by hand\n"
+
+
+def test_prune_with_generators_sharing_one_tree(tmp_path):
+    rows = ["web.html.div", "web.html.span"]
+    KernelGenerator(tmp_path, "first", existing="skip").run(rows, render)
+    KernelGenerator(tmp_path, "second", existing="skip").run(rows, lambda row: dict(render(row), content="// v2\n"))
+    # Rewrites every kernel it finds, like the integrator
+    KernelGenerator(tmp_path, "updater", claim=False).run(["web.html.span"],
+                                                          lambda row: dict(render(row), content="// updated\n"))
+
+    rows = ["web.html.div"]
+    second = KernelGenerator(tmp_path, "second", existing="skip")
+    second.run(rows, render)
+    assert second.prune() == {"removed": [], "kept": ["web.html.span"]}
+    first = KernelGenerator(tmp_path, "first", existing="skip")
+    first.run(rows, render)
+    assert first.prune() == {"removed": ["web.html.span"], "kept": []}
+    assert not (tmp_path / "web" / "html" / "span.mojo").exists()
+
+    # A generator that still has a live row keeps the file
+    KernelGenerator(tmp_path, "third").run(["web.html.div"], render)
+    pruner = KernelGenerator(tmp_path, "first")
+    pruner.plan([], render)
+    assert pruner.prune() == {"removed": [], "kept": ["web.html.div"]}
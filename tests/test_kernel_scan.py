@@ -0,0 +1,35 @@
+import os
+
+from neo_umg.kernel_scan import SCAN_CACHE_NAME, KernelScanner
+
+
+def test_scan_reports_changes_since_last_scan(tmp_path):
+    (tmp_path / "web" / "html").mkdir(parents=True)
+    (tmp_path / "web" / "html" / "div.mojo").write_text("div\n")
+    (tmp_path / "web" / "html" / "div.json").write_text("{}")
+    (tmp_path / "web" / "html" / "notes.txt").write_text("ignored\n")
+    (tmp_path / "io.mojo").write_text("io\n")
+
+    first = KernelScanner(tmp_path).scan()
+    assert first["added"] == ["io.mojo", "web/html/div.json", "web/html/div.mojo"]
+    assert (tmp_path / SCAN_CACHE_NAME).exists()
+
+    (tmp_path / "web" / "html" / "div.mojo").write_text("div v2\n")
+    os.utime(tmp_path / "io.mojo", ns=(1, 1))
+    (tmp_path / "web" / "html" / "div.json").unlink()
+    (tmp_path / "web" / "html" / "span.mojo").write_text("span\n")
+    scanner = KernelScanner(tmp_path)
+    second = scanner.scan()
+    assert second == {"added": ["web/html/span.mojo"], "modified": ["web/html/div.mojo"],
+                      "removed": ["web/html/div.json"], "unchanged": 1}
+    assert scanner.paths(".mojo", under="web") == [tmp_path / "web" / "html" / "div.mojo",
+                                                   tmp_path / "web" / "html" / "span.mojo"]
+    assert KernelScanner(tmp_path).changed() == []
+
+
+def test_scan_without_persistence_only_stats(tmp_path):
+    (tmp_path / "a.mojo").write_text("a\n")
+    scanner = KernelScanner(tmp_path, persist=False)
+    assert scanner.scan(hash_files=False)["added"] == ["a.mojo"]
+    assert scanner.files["a.mojo"]["hash"] is None
+    assert not (tmp_path / SCAN_CACHE_NAME).exists()
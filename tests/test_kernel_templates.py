@@ -0,0 +1,28 @@
+import json
+
+import pytest
+
+from neo_umg.kernel_templates import KernelTemplate, TemplateRegistry
+
+
+def test_registry_matches_exact_segments_in_rule_order(tmp_path):
+    (tmp_path / "generic.tmpl").write_text("generic {name}\n")
+    (tmp_path / "tag.tmpl").write_text("    <{tag}>{{literal}}</{tag}>\n")
+    (tmp_path / "io.tmpl").write_text("io {name}")
+    (tmp_path / "templates.json").write_text(json.dumps({
+        "default": "generic.tmpl",
+        "rules": [{"segment": "tag", "template": "tag.tmpl"}, {"segment": "io", "template": "io.tmpl"}],
+    }))
+    registry = TemplateRegistry.from_config(tmp_path / "templates.json")
+
+    assert registry.render("web.html.tag.div", {"tag": "div"}) == "<div>{literal}</div>"
+    assert registry.render("io.tag.read", {"tag": "x", "name": "io.tag.read"}) == "<x>{literal}</x>"
+    assert registry.render("io.fs.read", {"name": "io.fs.read"}) == "io io.fs.read"
+    # Substrings of a segment no longer select a template
+    assert registry.match("web.stage.tagline").name == "generic.tmpl"
+
+
+def test_templates_reject_format_specs():
+    with pytest.raises(ValueError):
+        KernelTemplate("{name!r}")
+    assert KernelTemplate("{a}-{b}").fields == {"a", "b"}
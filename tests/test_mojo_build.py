@@ -0,0 +1,70 @@
+import json
+
+from neo_umg.mojo_build import MojoBuilder
+
+
+class StubCompiler:
+    identity = "stub 1.0"
+
+    def __init__(self, fail=()):
+        self.compiled = []
+        self.fail = set(fail)
+
+    def __call__(self, source, output):
+        if source.name in self.fail:
+            raise RuntimeError("syntax error")
+        self.compiled.append(source.name)
+        output.write_bytes(b"wasm:" + source.read_bytes())
+
+
+def write_kernels(root):
+    (root / "web" / "html").mkdir(parents=True)
+    (root / "web" / "html" / "__init__.mojo").write_text("# Package initialization\n")
+    (root / "web" / "html" / "base.mojo").write_text("struct Base:\n    pass\n")
+    (root / "web" / "html" / "div.mojo").write_text("from web.html.base import Base\nfrom python import Python\n")
+    (root / "web" / "html" / "span.mojo").write_text("from .base import Base\n")
+    (root / "io").mkdir()
+    (root / "io" / "read.mojo").write_text("from memory import memcpy\n")
+    (root / "io" / "read.json").write_text(json.dumps({"block_id": "io.read"}, indent=2))
+
+
+def test_builds_only_changed_kernels_and_their_importers(tmp_path):
+    root = tmp_path / "kernels"
+    write_kernels(root)
+    out, cache = tmp_path / "dist", tmp_path / "cache"
+
+    compiler = StubCompiler()
+    stats = MojoBuilder([root], out, cache_dir=cache, compiler=compiler, jobs=2).build()
+    assert (stats["kernels"], stats["compiled"], stats["cached"], stats["sealed"]) == (4, 4, 0, 1)
+    assert (out / "web" / "html" / "div.wasm").read_bytes().startswith(b"wasm:from web.html.base")
+    sealed = (root / "io" / "read.json").read_text()
+    seal = json.loads(sealed)["seal"]
+    assert seal["binary_sha256"] and seal["cache_key"] and seal["target"] == "wasm"
+    assert sealed.endswith("}\n") and not list((root / "io").glob("*.tmp"))
+
+    compiler = StubCompiler()
+    again = MojoBuilder([root], out, cache_dir=cache, compiler=compiler).build()
+    assert (again["compiled"], again["cached"], again["sealed"]) == (0, 4, 0)
+    # Hashes come from the scanner's stat cache and imports from the import cache
+    assert again["read"] == 0
+
+    # Editing an imported module rebuilds the kernels that import it
+    (root / "web" / "html" / "base.mojo").write_text("struct Base:\n    var x: Int\n")
+    compiler = StubCompiler()
+    edited = MojoBuilder([root], out, cache_dir=cache, compiler=compiler).build()
+    assert sorted(compiler.compiled) == ["base.mojo", "div.mojo", "span.mojo"]
+    assert edited["read"] == 1
+
+
+def test_failed_compiles_are_reported_and_not_cached(tmp_path):
+    root = tmp_path / "kernels"
+    write_kernels(root)
+    builder = MojoBuilder([root], tmp_path / "dist", cache_dir=tmp_path / "cache",
+                          compiler=StubCompiler(fail={"read.mojo"}))
+    stats = builder.build()
+    assert (stats["compiled"], stats["failed"], stats["sealed"]) == (3, 1, 0)
+    assert "syntax error" in builder.failures[str(root / "io" / "read.mojo")]
+    assert not (tmp_path / "dist" / "io" / "read.wasm").exists()
+
+    retry = MojoBuilder([root], tmp_path / "dist", cache_dir=tmp_path / "cache", compiler=StubCompiler())
+    assert (retry.build()["compiled"], retry.stats["cached"]) == (1, 3)
@@ -0,0 +1,45 @@
+import json
+
+from neo_umg.template_store import TemplateStore
+
+
+def write_sources(root):
+    (root / "extracted").mkdir()
+    (root / "extracted" / "track.json").write_text(json.dumps({"block_id": "analytics.event.track", "v": "file"}))
+    (root / "extracted" / "view.json").write_text(json.dumps({"block_id": "analytics.page.view"}))
+    bundle = {"analytics.event.track": {"v": "bundle", "description": "Suivi d'événement ✓"},
+              "auth.session.login": {"molt_type": "Instruction", "tags": ["a", "b"]}}
+    (root / "auth_blocks_jsons.json").write_text(json.dumps(bundle, indent=2, ensure_ascii=False), encoding="utf-8")
+
+
+def store(root, **kwargs):
+    return TemplateStore([root / "auth_blocks_jsons.json", root / "missing_blocks_jsons.json"],
+                         [root / "extracted"], root / "cache" / "index.json", **kwargs)
+
+
+def test_templates_load_on_demand_from_indexed_offsets(tmp_path):
+    write_sources(tmp_path)
+    templates = store(tmp_path)
+    assert templates.locations is None
+    # Bundles override per-block files, as dict.update did
+    assert templates.get("analytics.event.track") == {"v": "bundle", "description": "Suivi d'événement ✓"}
+    assert templates["auth.session.login"]["tags"] == ["a", "b"]
+    assert templates.get("analytics.page.view") == {"block_id": "analytics.page.view"}
+    assert templates.get("nope", {}) == {}
+    assert sorted(templates) == ["analytics.event.track", "analytics.page.view", "auth.session.login"]
+    assert templates.stats["indexed_files"] == 3
+
+    again = store(tmp_path, max_templates=1)
+    again.get("auth.session.login")
+    again.get("analytics.page.view")
+    assert (again.stats["indexed_files"], again.stats["reused_files"], again.stats["evicted"]) == (0, 3, 1)
+
+
+def test_changed_bundle_is_reindexed(tmp_path):
+    write_sources(tmp_path)
+    store(tmp_path).keys()
+    (tmp_path / "auth_blocks_jsons.json").write_text(json.dumps({"auth.session.logout": {"v": 2}}))
+    templates = store(tmp_path)
+    assert templates.get("auth.session.logout") == {"v": 2}
+    assert "auth.session.login" not in templates
+    assert (templates.stats["indexed_files"], templates.stats["reused_files"]) == (1, 2)
@@ -0,0 +1,55 @@
+import sys
+import json
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+from umg_mojo_integrator import UMGMojoIntegrator
+
+
+def make_integrator(tmp_path):
+    kernels = tmp_path / "umg" / "neocore" / "src" / "kernels"
+    for name in ["auth.session.login", "auth.session.logout", "cache.memory.get", "web.html.div"]:
+        path = kernels.joinpath(*name.split(".")).with_suffix(".mojo")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f'@compiler.register("{name}")\n')
+    (kernels / "add_one.mojo").write_text("fn add_one(): pass\n")
+    return UMGMojoIntegrator(str(tmp_path / "umg"), str(tmp_path / "wb")), kernels
+
+
+def test_batch_update_dry_run_then_write_only_changes(tmp_path, capsys):
+    integrator, kernels = make_integrator(tmp_path)
+    report = integrator.batch_update_domain(["auth", "cache"], dry_run=True, show_diff=True)
+    assert (report["blocks"], report["files"], report["changed"], report["bytes_written"]) == (3, 6, 6, 0)
+    assert "+++ b/auth/session/login.mojo" in capsys.readouterr().out
+    assert not (kernels / "auth" / "session" / "login.json").exists()
+
+    report = integrator.batch_update_domain(None, dry_run=False)
+    assert (report["blocks"], report["changed"]) == (4, 8)
+    assert report["bytes_written"] > 0 and report["files_per_sec"] > 0
+    assert json.loads((kernels / "cache" / "memory" / "get.json").read_text())["block_id"] == "cache.memory.get"
+    assert (kernels / "add_one.mojo").read_text() == "fn add_one(): pass\n"
+
+    # A seal from the Mojo build survives regeneration
+    sidecar = kernels / "web" / "html" / "div.json"
+    sidecar.write_text(json.dumps(dict(json.loads(sidecar.read_text()), seal={"binary_sha256": "ab"}), indent=2) + "\n")
+    again = integrator.batch_update_domain("web", dry_run=False)
+    assert (again["changed"], again["unchanged"]) == (0, 2)
+
+
+def test_parse_cantocore_falls_back_to_brackets_on_syntax_errors(tmp_path):
+    integrator, _ = make_integrator(tmp_path)
+    assert integrator._parse_cantocore("INSTRUCTION:CACHE[300]") == "300"
+    assert integrator._parse_cantocore("GA event [EVENT] ; legacy") == "EVENT"
+    assert integrator._parse_cantocore(["::IF:TRIGGER.ACTIVE", "bad; [LEGACY]", "INSTRUCTION:GA[EVENT]"]) == "LEGACY"
+    assert integrator._parse_cantocore("::WHEN SESSION") == ""
+
+
+def test_batch_update_renders_each_block_once(tmp_path):
+    integrator, kernels = make_integrator(tmp_path)
+    calls = []
+    render_update = integrator.render_update
+    integrator.render_update = lambda block_name: calls.append(block_name) or render_update(block_name)
+    report = integrator.batch_update_domain(None, dry_run=False)
+    assert (report["blocks"], report["files"]) == (4, 8)
+    assert not (kernels / ".kernel-scan.json").exists()
+    assert sorted(calls) == ["auth.session.login", "auth.session.logout", "cache.memory.get", "web.html.div"]